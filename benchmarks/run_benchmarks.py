@@ -0,0 +1,462 @@
+"""
+Benchmarks the NexusQ simulator and compares the results with a stored baseline.
+
+The suite covers four areas:
+
+* gates: single-qubit (H), controlled (CNOT) and three-qubit (CCX) gates applied
+  by ``QuantumSimulator.execute`` to a prepared state. Each runs at several qubit
+  counts, on low-order, middle and high-order target qubits;
+* measurement: single-shot measurement and collapse, terminal sampling and
+  mid-circuit re-simulation;
+* circuits: end-to-end ``QuantumSimulator.run`` of GHZ, QFT, random layered and
+  QAOA circuits, compilation included;
+* memory: the tracemalloc high-water mark of each benchmark, taken in a separate
+  untimed call, and the peak resident size of the process.
+
+Every circuit and random draw is seeded, and the simulator is pinned to the
+state-vector backend, so runs are comparable across versions. Timings are the
+minimum and median of several repeats; comparisons use the minimum, which is the
+least sensitive to background load.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json --tolerance 0.2
+    python benchmarks/run_benchmarks.py --input results.json --baseline baseline.json
+
+With ``--baseline``, the exit status is 1 if any benchmark got slower than the
+tolerance allows, its memory high-water mark grew, or it is missing from the
+new results, so the suite can gate upgrades. Results recorded with different
+qubit counts (``--quick``), shots or simulator settings are not compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import nexusQ
+from nexusQ.core import QuantumCircuit, QuantumSimulator
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+FORMAT_VERSION: int = 1
+GATES_PER_RUN: int = 16  # Gates per timed call of the gate benchmarks
+
+# Qubit counts of the gate, measurement and circuit benchmarks
+FULL_SIZES = {"gates": (10, 14, 18, 22), "measurement": (10, 16, 20), "circuits": (12, 16, 20)}
+QUICK_SIZES = {"gates": (10, 14), "measurement": (10, 14), "circuits": (10, 14)}
+COMPARED_METADATA = ("quick", "shots", "settings")  # Metadata that must match for results to be compared
+
+
+def ghz_circuit(num_qubits: int) -> QuantumCircuit:
+    """
+    Returns the circuit preparing the GHZ state (|00...0> + |11...1>)/sqrt(2).
+
+    Args:
+        num_qubits (int): The number of qubits.
+
+    Returns:
+        QuantumCircuit: The circuit.
+    """
+    circuit: QuantumCircuit = QuantumCircuit(num_qubits)
+    circuit.h(0)
+    for qubit in range(num_qubits - 1):
+        circuit.cnot(qubit, qubit + 1)
+    return circuit
+
+
+def qft_circuit(num_qubits: int) -> QuantumCircuit:
+    """
+    Returns the quantum Fourier transform, applied to a basis state so the input is nontrivial.
+
+    The controlled phase CP(theta) is built from RZ and RZZ rotations, which
+    equal it up to a global phase.
+
+    Args:
+        num_qubits (int): The number of qubits.
+
+    Returns:
+        QuantumCircuit: The circuit.
+    """
+    circuit: QuantumCircuit = QuantumCircuit(num_qubits)
+    for qubit in range(0, num_qubits, 2):
+        circuit.x(qubit)
+    for target in range(num_qubits):
+        circuit.h(target)
+        for control in range(target + 1, num_qubits):
+            theta: float = np.pi / 2**(control - target)
+            circuit.rz(control, theta / 2)
+            circuit.rz(target, theta / 2)
+            circuit.rzz(control, target, -theta / 2)
+    for qubit in range(num_qubits // 2):
+        circuit.swap(qubit, num_qubits - 1 - qubit)
+    return circuit
+
+
+def random_circuit(num_qubits: int, depth: int, seed: int = 0) -> QuantumCircuit:
+    """
+    Returns a random layered circuit: random single-qubit rotations on every qubit,
+    then CNOTs in a brickwork pattern, ``depth`` times.
+
+    Args:
+        num_qubits (int): The number of qubits.
+        depth (int): The number of layers.
+        seed (int): The seed of the random angles and rotation axes.
+
+    Returns:
+        QuantumCircuit: The circuit.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    circuit: QuantumCircuit = QuantumCircuit(num_qubits)
+    rotations: tuple = (circuit.rx, circuit.ry, circuit.rz)
+    for layer in range(depth):
+        for qubit in range(num_qubits):
+            rotations[rng.integers(3)](qubit, float(rng.uniform(0, 2 * np.pi)))
+        for qubit in range(layer % 2, num_qubits - 1, 2):
+            circuit.cnot(qubit, qubit + 1)
+    return circuit
+
+
+def qaoa_circuit(num_qubits: int, layers: int, seed: int = 0) -> QuantumCircuit:
+    """
+    Returns a QAOA circuit for MaxCut on a ring, with random angles.
+
+    Args:
+        num_qubits (int): The number of qubits (ring vertices).
+        layers (int): The number of cost and mixer layers.
+        seed (int): The seed of the angles.
+
+    Returns:
+        QuantumCircuit: The circuit.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    circuit: QuantumCircuit = QuantumCircuit(num_qubits)
+    for qubit in range(num_qubits):
+        circuit.h(qubit)
+    for _ in range(layers):
+        gamma, beta = rng.uniform(0, np.pi, size=2)
+        for qubit in range(num_qubits):
+            circuit.rzz(qubit, (qubit + 1) % num_qubits, float(gamma))
+        for qubit in range(num_qubits):
+            circuit.rx(qubit, float(2 * beta))
+    return circuit
+
+
+def gate_benchmarks(sizes, settings: dict):
+    """
+    Yields the (name, parameters, setup) triples of the gate benchmarks.
+
+    Each setup returns the function timed: ``GATES_PER_RUN`` copies of a gate
+    applied by :meth:`QuantumSimulator.execute` to a prepared state.
+
+    Args:
+        sizes (sequence of int): The qubit counts.
+        settings (dict): The keyword arguments of the QuantumSimulator.
+
+    Yields:
+        str, dict, callable: The benchmark name, its parameters and its setup.
+    """
+    for num_qubits in sizes:
+        for position, target in (("low", num_qubits - 1), ("mid", num_qubits // 2), ("high", 0)):
+            for gate, qubits in (("h", (target,)),
+                                 ("cnot", ((target + 1) % num_qubits, target)),
+                                 ("ccx", ((target + 1) % num_qubits, (target + 2) % num_qubits, target))):
+                parameters: dict = {"gate": gate, "num_qubits": num_qubits, "target": position,
+                                    "gates_per_run": GATES_PER_RUN}
+                yield f"gates/{gate}/n={num_qubits}/{position}", parameters, _gate_setup(gate, qubits, num_qubits, settings)
+
+
+def measurement_benchmarks(sizes, settings: dict, shots: int):
+    """
+    Yields the (name, parameters, setup) triples of the measurement and sampling benchmarks.
+
+    Args:
+        sizes (sequence of int): The qubit counts.
+        settings (dict): The keyword arguments of the QuantumSimulator.
+        shots (int): The number of shots of the sampling benchmarks.
+
+    Yields:
+        str, dict, callable: The benchmark name, its parameters and its setup.
+    """
+    for num_qubits in sizes:
+        prepared: QuantumCircuit = random_circuit(num_qubits, 2, seed=num_qubits)
+
+        def collapse_setup(num_qubits=num_qubits, prepared=prepared):
+            simulator: QuantumSimulator = QuantumSimulator(seed=0, **settings)
+            circuit: QuantumCircuit = QuantumCircuit(num_qubits)
+            for qubit in range(num_qubits):
+                circuit.measure(qubit)
+            program = simulator.compile(circuit)
+            state: np.ndarray = simulator.run(prepared)[0]
+            return lambda: simulator.execute(program, state.copy(), {})
+
+        def terminal_setup(prepared=prepared):
+            simulator: QuantumSimulator = QuantumSimulator(seed=0, **settings)
+            circuit: QuantumCircuit = _with_gates(prepared)
+            circuit.measure_all()
+            simulator.compile(circuit)
+            return lambda: simulator.sample(circuit, shots)
+
+        def midcircuit_setup(num_qubits=num_qubits, prepared=prepared):
+            simulator: QuantumSimulator = QuantumSimulator(seed=0, **settings)
+            circuit: QuantumCircuit = _with_gates(prepared)
+            circuit.measure(0)
+            circuit.cnot(0, num_qubits - 1)
+            circuit.measure_all()
+            simulator.compile(circuit)
+            return lambda: simulator.sample(circuit, max(1, shots // 256))
+
+        yield f"measurement/collapse/n={num_qubits}", {"num_qubits": num_qubits}, collapse_setup
+        yield (f"measurement/sample/n={num_qubits}", {"num_qubits": num_qubits, "shots": shots}, terminal_setup)
+        yield (f"measurement/midcircuit/n={num_qubits}", {"num_qubits": num_qubits, "shots": max(1, shots // 256)},
+               midcircuit_setup)
+
+
+def circuit_benchmarks(sizes, settings: dict):
+    """
+    Yields the (name, parameters, setup) triples of the end-to-end circuit benchmarks.
+
+    Each timed call runs a fresh simulator, so compilation is included.
+
+    Args:
+        sizes (sequence of int): The qubit counts.
+        settings (dict): The keyword arguments of the QuantumSimulator.
+
+    Yields:
+        str, dict, callable: The benchmark name, its parameters and its setup.
+    """
+    for num_qubits in sizes:
+        circuits: dict = {"ghz": ghz_circuit(num_qubits), "qft": qft_circuit(num_qubits),
+                          "random": random_circuit(num_qubits, 10), "qaoa": qaoa_circuit(num_qubits, 3)}
+        for name, circuit in circuits.items():
+            def setup(circuit=circuit):
+                return lambda: QuantumSimulator(seed=0, **settings).run(circuit)
+
+            parameters: dict = {"circuit": name, "num_qubits": num_qubits, "num_gates": len(circuit.get_gates())}
+            yield f"circuits/{name}/n={num_qubits}", parameters, setup
+
+
+def measure(setup, repeats: int, trace_memory: bool = True) -> dict:
+    """
+    Times a benchmark and records its memory high-water mark.
+
+    Args:
+        setup (callable): Returns the function to time; its own cost is not measured.
+        repeats (int): The number of timed calls.
+        trace_memory (bool): Whether to make one more, untimed call under tracemalloc.
+
+    Returns:
+        dict: The minimum, median and mean seconds, the repeats and the peak bytes
+        allocated during one call (None without tracing).
+    """
+    function = setup()
+    function()  # Warm-up: caches, lazy imports and page faults
+    timings: list = []
+    for _ in range(repeats):
+        started: float = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    peak: int = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"min": min(timings), "median": float(np.median(timings)), "mean": float(np.mean(timings)),
+            "repeats": repeats, "peak_bytes": peak}
+
+
+def run_suite(quick: bool = False, repeats: int = 5, shots: int = 4096, pattern: str = None,
+              settings: dict = None, trace_memory: bool = True, log=print) -> dict:
+    """
+    Runs the benchmark suite.
+
+    Args:
+        quick (bool): Whether to use the small qubit counts, e.g. for smoke tests.
+        repeats (int): The number of timed calls of each benchmark.
+        shots (int): The number of shots of the sampling benchmarks.
+        pattern (str, optional): Only benchmarks whose name contains this string run.
+        settings (dict, optional): The keyword arguments of the QuantumSimulator; the
+            backend is always "statevector".
+        trace_memory (bool): Whether to record the memory high-water marks.
+        log (callable): Called with a progress line per benchmark.
+
+    Returns:
+        dict: The results, in the JSON format of this script.
+    """
+    settings = dict(settings or {}, backend="statevector")
+    sizes: dict = QUICK_SIZES if quick else FULL_SIZES
+    suites: list = [gate_benchmarks(sizes["gates"], settings),
+                    measurement_benchmarks(sizes["measurement"], settings, shots),
+                    circuit_benchmarks(sizes["circuits"], settings)]
+    results: dict = {}
+    for suite in suites:
+        for name, parameters, setup in suite:
+            if pattern is not None and pattern not in name:
+                continue
+            result: dict = dict(measure(setup, repeats, trace_memory), parameters=parameters)
+            results[name] = result
+            log(f"{name:<40}{_format_seconds(result['min']):>12}{_format_bytes(result['peak_bytes']):>12}")
+    return {"format": FORMAT_VERSION, "metadata": _metadata(quick, repeats, shots, pattern, settings), "results": results}
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2, memory_tolerance: float = 0.1) -> tuple[list, list]:
+    """
+    Compares results with a baseline.
+
+    A baseline benchmark missing from the current results counts as a regression,
+    unless the current run was filtered to exclude it. A ValueError is raised if
+    the runs differ in any of ``COMPARED_METADATA`` or have no benchmark in common.
+
+    Args:
+        current (dict): The new results.
+        baseline (dict): The stored results.
+        tolerance (float): The allowed relative slowdown of the minimum time.
+        memory_tolerance (float): The allowed relative growth of the memory high-water mark.
+
+    Returns:
+        list, list: One report line per benchmark, and the names of the regressed benchmarks.
+    """
+    for key in COMPARED_METADATA:
+        if current["metadata"].get(key) != baseline["metadata"].get(key):
+            raise ValueError(f"The baseline was recorded with {key}={baseline['metadata'].get(key)!r}, "
+                             f"the results with {key}={current['metadata'].get(key)!r}")
+    pattern: str = current["metadata"].get("filter")
+    expected: set = {name for name in baseline["results"] if pattern is None or pattern in name}
+    if not expected & set(current["results"]):
+        raise ValueError("The results and the baseline have no benchmark in common")
+    lines: list = [f"{'benchmark':<40}{'baseline':>12}{'current':>12}{'ratio':>8}{'memory':>8}"]
+    regressions: list = []
+    for name in sorted(expected | set(current["results"])):
+        new, old = current["results"].get(name), baseline["results"].get(name)
+        if new is None:
+            regressions.append(name)
+            lines.append(f"{name:<40}{'missing in current':>40}  REGRESSION")
+            continue
+        if old is None:
+            lines.append(f"{name:<40}{'missing in baseline':>40}")
+            continue
+        ratio: float = new["min"] / old["min"]
+        memory: float = None
+        if new.get("peak_bytes") is not None and old.get("peak_bytes"):
+            memory = new["peak_bytes"] / old["peak_bytes"]
+        regressed: bool = ratio > 1 + tolerance or (memory is not None and memory > 1 + memory_tolerance)
+        if regressed:
+            regressions.append(name)
+        lines.append(f"{name:<40}{_format_seconds(old['min']):>12}{_format_seconds(new['min']):>12}{ratio:>8.2f}"
+                     f"{'-' if memory is None else format(memory, '.2f'):>8}{'  REGRESSION' if regressed else ''}")
+    return lines, regressions
+
+
+def main(argv=None) -> int:
+    """
+    Runs the command line interface.
+
+    Args:
+        argv (list of str, optional): The arguments; None reads sys.argv.
+
+    Returns:
+        int: The exit status: 1 if a benchmark regressed against the baseline, else 0.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the NexusQ simulator.")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument("--input", help="compare these stored results instead of running the suite")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown (default 0.2)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.1, help="allowed relative memory growth (default 0.1)")
+    parser.add_argument("--quick", action="store_true", help="use small qubit counts")
+    parser.add_argument("--repeats", type=int, default=5, help="timed calls per benchmark (default 5)")
+    parser.add_argument("--shots", type=int, default=4096, help="shots of the sampling benchmarks (default 4096)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--precision", choices=("double", "single"), default="double")
+    parser.add_argument("--threads", type=int, default=1, help="threads of the simulator (default 1)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc high-water marks")
+    arguments = parser.parse_args(argv)
+    if arguments.input is not None:
+        with open(arguments.input, "r", encoding="utf-8") as file:
+            results: dict = json.load(file)
+    else:
+        settings: dict = {"precision": arguments.precision, "num_threads": arguments.threads}
+        results: dict = run_suite(arguments.quick, arguments.repeats, arguments.shots, arguments.filter,
+                                  settings, not arguments.no_memory)
+    if arguments.output is not None:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    if arguments.baseline is None:
+        return 0
+    with open(arguments.baseline, "r", encoding="utf-8") as file:
+        baseline: dict = json.load(file)
+    if baseline.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported benchmark format {baseline.get('format')} in {arguments.baseline}")
+    lines, regressions = compare(results, baseline, arguments.tolerance, arguments.memory_tolerance)
+    print("\n".join(lines))
+    print(f"{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+def _gate_setup(gate: str, qubits: tuple, num_qubits: int, settings: dict):
+    """Returns the setup of a gate benchmark: a compiled run of the gate and a random state."""
+    def setup():
+        simulator: QuantumSimulator = QuantumSimulator(seed=0, **settings)
+        circuit: QuantumCircuit = QuantumCircuit(num_qubits)
+        for _ in range(GATES_PER_RUN):
+            getattr(circuit, gate)(*qubits)
+        program = simulator.compile(circuit)
+        rng: np.random.Generator = np.random.default_rng(num_qubits)
+        state: np.ndarray = (rng.normal(size=2**num_qubits) + 1j * rng.normal(size=2**num_qubits)).astype(simulator.dtype)
+        state /= np.linalg.norm(state)
+        return lambda: simulator.execute(program, state, {})
+    return setup
+
+
+def _with_gates(circuit: QuantumCircuit) -> QuantumCircuit:
+    """Returns a new circuit with the gates of another."""
+    copy: QuantumCircuit = QuantumCircuit(circuit.get_num_qubits())
+    copy.gates += circuit.get_gates()
+    return copy
+
+
+def _metadata(quick: bool, repeats: int, shots: int, pattern: str, settings: dict) -> dict:
+    """Returns the environment and settings of a run."""
+    metadata: dict = {"nexusq": nexusQ.__version__, "numpy": np.__version__, "python": platform.python_version(),
+                      "platform": platform.platform(), "processor": platform.processor(), "cpu_count": os.cpu_count(),
+                      "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "quick": quick, "repeats": repeats,
+                      "shots": shots, "filter": pattern, "settings": settings}
+    if resource is not None:
+        scale: int = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS, KiB on Linux
+        metadata["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return metadata
+
+
+def _format_seconds(seconds: float) -> str:
+    """Returns a duration with a readable unit."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def _format_bytes(size: int) -> str:
+    """Returns a byte count with a readable unit, or "-" if unknown."""
+    if size is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,16 @@ Core functionality for NexusQ, including quantum circuit manipulation and simula
 """
 
 from .quantum_circuit import QuantumCircuit
+from .parameters import Parameter, ParameterExpression
 from .quantum_simulator import QuantumSimulator
-# from .quantum_device import QuantumDevice
+from .compiler import Program, compile_circuit
+from .optimizer import optimize
+from .observables import PauliSum
+from .stabilizer import StabilizerTableau
+from .mps import MatrixProductState
+from .sparse import SparseState
+from .decomposition import ProductState
+from .noise import NoiseModel
+from .profiling import Profiler
+from .quantum_device import QuantumDevice
 # from .hybrid_algorithms import HybridAlgorithm
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Defines the process-pool batch runner, which simulates many independent circuits in parallel.
+
+Circuits are sent to the worker processes in their compact binary encoding
+(:meth:`QuantumCircuit.to_bytes`): a few flat arrays of gate codes, qubits,
+angles and matrix entries instead of a pickled list of Python tuples. Large
+state vectors come back through shared memory, so only their name and shape
+cross the pipe. Results are yielded as soon as each circuit completes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from .quantum_circuit import QuantumCircuit
+
+_SHARED_BYTES: int = 1 << 16  # States at least this large are returned through shared memory
+
+_worker = None  # The QuantumSimulator of a worker process
+
+
+def run_batch(settings: dict, circuits, shots: int = None, parameter_values: dict = None,
+              max_workers: int = None, return_states: bool = True, seeds=None):
+    """
+    Simulates independent circuits on a process pool, yielding the results as they complete.
+
+    Args:
+        settings (dict): The keyword arguments of the QuantumSimulator of each worker.
+        circuits (iterable): The circuits (QuantumCircuit or Program).
+        shots (int, optional): The number of shots of every run (see :meth:`QuantumSimulator.run`).
+        parameter_values (dict, optional): The value of each symbolic Parameter of the circuits.
+        max_workers (int, optional): The number of worker processes; None uses every core.
+        return_states (bool): Whether the final states are sent back; without them only
+            the measurements cross process boundaries.
+        seeds (sequence of int, optional): The measurement seed of each circuit.
+
+    Yields:
+        int, state, dict: The index of a circuit in ``circuits`` and the result of
+        :meth:`QuantumSimulator.run` on it, in completion order.
+    """
+    circuits = list(circuits)
+    seeds = [None] * len(circuits) if seeds is None else list(seeds)
+    pending: dict = {}
+    with ProcessPoolExecutor(max_workers, initializer=start_worker, initargs=(settings,)) as executor:
+        try:
+            for index, (circuit, seed) in enumerate(zip(circuits, seeds)):
+                circuit, values = encode(circuit, parameter_values)
+                pending[executor.submit(run_task, circuit, shots, values, seed, return_states)] = index
+            for future in as_completed(pending):
+                state, handle, measurements = future.result()
+                index: int = pending.pop(future)
+                yield index, (state if handle is None else unshare(handle)), measurements
+        finally:
+            for future in pending:
+                future.cancel()
+            for future in pending:
+                if not future.cancelled() and future.exception() is None and future.result()[1] is not None:
+                    unshare(future.result()[1])
+
+
+def encode(circuit, parameter_values: dict = None) -> tuple:
+    """
+    Returns a circuit in the form sent to a worker process, and the parameter values still to bind.
+
+    Args:
+        circuit (QuantumCircuit or Program): The circuit.
+        parameter_values (dict, optional): The value of each symbolic Parameter.
+
+    Returns:
+        bytes or Program, dict: The binary encoding of a QuantumCircuit, bound first,
+        with None; or a Program unchanged, with ``parameter_values``.
+    """
+    if not isinstance(circuit, QuantumCircuit):
+        return circuit, parameter_values
+    if parameter_values is not None and circuit.get_parameters():
+        circuit = circuit.bind_parameters(parameter_values)
+    return circuit.to_bytes(), None
+
+
+def unshare(handle: tuple) -> np.ndarray:
+    """
+    Copies an array out of the shared memory block of a handle and frees the block.
+
+    Args:
+        handle (tuple): The (name, shape, dtype) handle returned by a worker process.
+
+    Returns:
+        np.ndarray: The array.
+    """
+    name, shape, dtype = handle
+    block = shared_memory.SharedMemory(name=name)
+    view: np.ndarray = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    array: np.ndarray = view.copy()
+    del view
+    block.close()
+    block.unlink()
+    return array
+
+
+def start_worker(settings: dict) -> None:
+    """
+    Creates the QuantumSimulator of a worker process (the initializer of its pool).
+
+    Args:
+        settings (dict): The keyword arguments of the QuantumSimulator.
+    """
+    global _worker
+    from .quantum_simulator import QuantumSimulator
+    _worker = QuantumSimulator(**settings)
+
+
+def run_task(circuit, shots: int, parameter_values: dict, seed, return_states: bool) -> tuple:
+    """
+    Runs one circuit in a worker process started by :func:`start_worker`.
+
+    Args:
+        circuit (bytes or Program): The circuit, as returned by :func:`encode`.
+        shots (int): The number of shots (see :meth:`QuantumSimulator.run`).
+        parameter_values (dict): The value of each symbolic Parameter of a Program.
+        seed (int): The measurement seed.
+        return_states (bool): Whether the final state is returned.
+
+    Returns:
+        tuple: The state (or None), the handle of a state returned through shared
+        memory (or None; see :func:`unshare`), and the measurements.
+    """
+    if isinstance(circuit, bytes):
+        circuit = QuantumCircuit.from_bytes(circuit)
+    _worker.reseed(seed)
+    state, measurements = _worker.run(circuit, shots, parameter_values, return_state=return_states)
+    if not return_states:
+        return None, None, measurements
+    if isinstance(state, np.ndarray) and state.nbytes >= _SHARED_BYTES:
+        return None, _share(state), measurements
+    return state, None, measurements
+
+
+def _share(array: np.ndarray) -> tuple:
+    """Copies an array into a new shared memory block and returns its (name, shape, dtype) handle."""
+    block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+    view: np.ndarray = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    del view
+    block.close()
+    resource_tracker.unregister(block._name, "shared_memory")  # The receiving process frees the block
+    return block.name, array.shape, array.dtype.str
+
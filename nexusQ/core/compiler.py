@@ -0,0 +1,242 @@
+"""
+Defines the compilation of a QuantumCircuit into an immutable Program for the QuantumSimulator.
+"""
+
+from dataclasses import dataclass, replace
+import numpy as np
+from .quantum_circuit import QuantumCircuit, PARAMETRIC_GATES, gate_qubits
+from .gates import GATE_KINDS, gate_matrix, gate_diagonal, target_matrix, is_diagonal, rotation_operands
+from .parameters import ParameterExpression
+from .optimizer import optimize
+from . import kernels
+
+# Opcodes of the compiled instructions, one per kernel
+OP_MATRIX = 0       # operand: matrix on all qubits
+OP_DIAGONAL = 1     # operand: diagonal entries on all qubits
+OP_PHASES = 2       # operand: kernels.PhaseAccumulator of a run of diagonal gates
+OP_FLIP = 3         # qubits: controls..., target
+OP_SWAP = 4         # qubits: controls..., qubit1, qubit2
+OP_CONTROLLED = 5   # qubits: controls..., target; operand: target matrix
+OP_MEASURE = 6
+OP_RESET = 7
+
+MAX_PHASE_QUBITS: int = 10  # Qubits a folded run of diagonal gates may span, so its phases stay 2^10 entries
+
+_KIND_OPCODES = {
+    "matrix": OP_MATRIX,
+    "diagonal": OP_DIAGONAL,
+    "flip": OP_FLIP,
+    "swap": OP_SWAP,
+    "controlled": OP_CONTROLLED,
+    "measure": OP_MEASURE,
+    "reset": OP_RESET,
+}
+
+
+@dataclass(frozen=True)
+class Program:
+    """
+    Represents a compiled quantum circuit.
+
+    Attributes:
+        num_qubits (int): The number of qubits.
+        opcodes (np.ndarray): The (read-only) opcode of each instruction.
+        qubits (tuple): The qubit operands of each instruction.
+        operands (tuple): The pre-built matrix, diagonal or phases of each instruction, or None.
+        measured (tuple): The measured qubits in ascending order (all qubits if none are measured).
+        split (int): The index of the first instruction from which sampling must be
+            re-simulated per shot, or None if all measurements are terminal.
+        parameters (tuple): The unbound symbolic parameters, in order of first use.
+        parametric (tuple): The indices of the instructions whose operand is still a
+            (gate type, ParameterExpression) pair, resolved by :meth:`bind`.
+        dtype (np.dtype): The complex dtype of the operands, which should match the state's.
+    """
+    num_qubits: int
+    opcodes: np.ndarray
+    qubits: tuple
+    operands: tuple
+    measured: tuple
+    split: int
+    parameters: tuple = ()
+    parametric: tuple = ()
+    dtype: np.dtype = np.dtype(complex)
+
+    def __len__(self) -> int:
+        """Returns the number of instructions."""
+        return len(self.opcodes)
+
+    def bind(self, values: dict) -> "Program":
+        """
+        Returns the program with its symbolic parameters bound to values.
+
+        Only the parametric instructions are rebuilt; everything else is shared.
+
+        Args:
+            values (dict): The value of each Parameter. Values may be arrays of
+                equal length to bind a whole parameter sweep: the operands of the
+                affected instructions then carry a leading batch axis.
+
+        Returns:
+            Program: The bound program.
+        """
+        if not self.parametric:
+            return self
+        operands: list = list(self.operands)
+        for index in self.parametric:
+            gate_type, expression = operands[index]
+            theta = expression.bind(values)
+            if np.ndim(theta):
+                operands[index] = rotation_operands(gate_type, theta)
+            elif self.opcodes[index] == OP_DIAGONAL:
+                operands[index] = gate_diagonal(gate_type, float(theta))
+            else:
+                operands[index] = gate_matrix(gate_type, float(theta))
+            operands[index] = _cast_operand(operands[index], self.dtype)
+        return replace(self, operands=tuple(operands), parameters=(), parametric=())
+
+    def astype(self, dtype) -> "Program":
+        """
+        Returns the program with its operands converted to another complex dtype.
+
+        Args:
+            dtype: The dtype of the state vectors the program will be applied to,
+                e.g. np.complex64 for single-precision simulation.
+
+        Returns:
+            Program: The converted program (this program if the dtype is unchanged).
+        """
+        dtype = np.dtype(dtype)
+        if dtype == self.dtype:
+            return self
+        operands: tuple = tuple(operand if index in self.parametric else _cast_operand(operand, dtype)
+                                for index, operand in enumerate(self.operands))
+        return replace(self, operands=operands, dtype=dtype)
+
+
+def compile_circuit(circuit: QuantumCircuit, optimization_level: int = 0, dtype=complex) -> Program:
+    """
+    Compiles a quantum circuit into a Program.
+
+    Every gate is resolved to an opcode and a cached matrix once, and consecutive
+    diagonal gates are folded into phase instructions spanning at most
+    ``MAX_PHASE_QUBITS`` qubits each, so a program stays proportional to its gates.
+
+    Args:
+        circuit (QuantumCircuit): The quantum circuit to compile.
+        optimization_level (int): The aggressiveness of the gate-fusion pass run
+            first (see :func:`optimizer.optimize`); 0 disables it.
+        dtype: The complex dtype of the state vectors the program will be applied to.
+
+    Returns:
+        Program: The compiled program.
+    """
+    if optimization_level:
+        circuit = optimize(circuit, optimization_level)
+    num_qubits: int = circuit.get_num_qubits()
+    opcodes, qubits, operands = [], [], []
+    parametric = []  # Indices of the instructions with symbolic parameters
+    diagonal_run = []  # (diagonal, qubits) of consecutive diagonal gates
+    run_qubits = set()  # Qubits spanned by the diagonal run
+
+    def add_diagonal(diagonal: np.ndarray, gate_operands: tuple) -> None:
+        if len(run_qubits.union(gate_operands)) > MAX_PHASE_QUBITS:
+            flush_diagonal_run()
+        diagonal_run.append((diagonal, gate_operands))
+        run_qubits.update(gate_operands)
+
+    def flush_diagonal_run() -> None:
+        if len(diagonal_run) == 1:
+            opcodes.append(OP_DIAGONAL)
+            qubits.append(diagonal_run[0][1])
+            operands.append(diagonal_run[0][0])
+        elif diagonal_run:
+            phases = kernels.PhaseAccumulator(num_qubits)
+            for diagonal, gate_operands in diagonal_run:
+                phases.add(diagonal, gate_operands)
+            opcodes.append(OP_PHASES)
+            qubits.append(tuple(sorted(run_qubits)))
+            operands.append(phases)
+        diagonal_run.clear()
+        run_qubits.clear()
+
+    for gate in circuit.get_gates():
+        gate_type: str = gate[0]
+        if gate_type not in GATE_KINDS:
+            raise ValueError(f"Unknown gate type: {gate_type}")
+        kind: str = GATE_KINDS[gate_type][0]
+        if kind == "noise":
+            raise ValueError(f"{gate_type} channels cannot be compiled; noisy circuits are sampled with QuantumSimulator.run or sample")
+        gate_operands: tuple = tuple(gate_qubits(gate))
+        theta = gate[-1] if gate_type in PARAMETRIC_GATES else None
+        if gate_type == "Unitary":
+            matrix: np.ndarray = np.asarray(gate[-1], dtype=complex)
+            if is_diagonal(matrix):
+                add_diagonal(np.diag(matrix), gate_operands)
+                continue
+            flush_diagonal_run()
+            opcodes.append(OP_MATRIX)
+            qubits.append(gate_operands)
+            operands.append(matrix)
+            continue
+        if isinstance(theta, ParameterExpression):
+            flush_diagonal_run()
+            parametric.append(len(opcodes))
+            opcodes.append(_KIND_OPCODES[kind])
+            qubits.append(gate_operands)
+            operands.append((gate_type, theta))
+            continue
+        if kind == "diagonal":
+            add_diagonal(gate_diagonal(gate_type, theta), gate_operands)
+            continue
+        flush_diagonal_run()
+        opcodes.append(_KIND_OPCODES[kind])
+        qubits.append(gate_operands)
+        if kind == "matrix":
+            operands.append(gate_matrix(gate_type, theta))
+        elif kind == "controlled":
+            operands.append(target_matrix(gate_type, theta))
+        else:
+            operands.append(None)
+    flush_diagonal_run()
+
+    opcode_array: np.ndarray = np.array(opcodes, dtype=np.int8)
+    opcode_array.flags.writeable = False
+    measured, split = _measurement_layout(opcodes, qubits, num_qubits)
+    program: Program = Program(num_qubits, opcode_array, tuple(qubits), tuple(operands), measured, split,
+                               tuple(circuit.get_parameters()), tuple(parametric))
+    return program.astype(dtype)
+
+
+def _cast_operand(operand, dtype: np.dtype):
+    """Returns an instruction operand converted to a complex dtype, so kernels never mix precisions."""
+    if isinstance(operand, np.ndarray):
+        return operand.astype(dtype, copy=False)
+    if isinstance(operand, kernels.PhaseAccumulator):
+        phases = kernels.PhaseAccumulator(operand.num_qubits)
+        phases.phases = None if operand.phases is None else operand.phases.astype(dtype)
+        return phases
+    return operand
+
+
+def _measurement_layout(opcodes: list, qubits: list, num_qubits: int) -> tuple[tuple, int]:
+    """
+    Returns the measured qubits (ascending) and the index of the first measurement
+    or reset if the program has a reset or a mid-circuit measurement, or None if
+    all measurements are terminal.
+    """
+    measured: set = set()
+    first_nonunitary: int = None
+    mid_circuit: bool = False
+    for index, (opcode, operands) in enumerate(zip(opcodes, qubits)):
+        if opcode in (OP_MEASURE, OP_RESET):
+            if first_nonunitary is None:
+                first_nonunitary = index
+            if opcode == OP_RESET:
+                mid_circuit = True
+            else:
+                measured.update(operands)
+        elif measured.intersection(operands):
+            mid_circuit = True
+    if not measured:
+        measured = range(num_qubits)
+    return tuple(sorted(measured)), first_nonunitary if mid_circuit else None
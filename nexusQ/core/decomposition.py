@@ -0,0 +1,169 @@
+"""
+Defines the subsystem decomposition of circuits whose qubits form independent groups.
+
+Two qubits interact if some multi-qubit gate acts on both of them. The
+connected components of this interaction graph never become entangled with
+each other, so each one can be simulated as its own small state: the memory
+and time of a run then grow with 2^k of the largest component instead of 2^n.
+"""
+
+import numpy as np
+from .quantum_circuit import QuantumCircuit, gate_qubits
+from .observables import PauliSum, expectation_value
+
+
+def connected_components(circuit: QuantumCircuit) -> list:
+    """
+    Returns the groups of qubits that interact with each other.
+
+    Measurements are local to each qubit, so a joint "Measure" gate does not
+    connect its qubits.
+
+    Args:
+        circuit (QuantumCircuit): The quantum circuit.
+
+    Returns:
+        list: The components as ascending tuples of qubits, ordered by their smallest qubit.
+    """
+    parent: list = list(range(circuit.get_num_qubits()))
+
+    def find(qubit: int) -> int:
+        while parent[qubit] != qubit:
+            parent[qubit] = parent[parent[qubit]]
+            qubit = parent[qubit]
+        return qubit
+
+    for gate in circuit.get_gates():
+        if gate[0] == "Measure":
+            continue
+        qubits: tuple = gate_qubits(gate)
+        root: int = find(qubits[0])
+        for qubit in qubits[1:]:
+            parent[find(qubit)] = root
+    components = {}
+    for qubit in range(circuit.get_num_qubits()):
+        components.setdefault(find(qubit), []).append(qubit)
+    return [tuple(qubits) for qubits in components.values()]
+
+
+def split_circuit(circuit: QuantumCircuit) -> list:
+    """
+    Splits a circuit into one circuit per connected component.
+
+    Args:
+        circuit (QuantumCircuit): The quantum circuit.
+
+    Returns:
+        list: (qubits, circuit) pairs, where qubit q of a component's circuit is
+        ``qubits[q]`` of the original circuit.
+    """
+    components: list = connected_components(circuit)
+    owner = {}  # Maps each qubit to its component and its index there
+    parts: list = []
+    for index, qubits in enumerate(components):
+        parts.append((qubits, QuantumCircuit(len(qubits))))
+        for local, qubit in enumerate(qubits):
+            owner[qubit] = (index, local)
+    for gate in circuit.get_gates():
+        qubits: tuple = gate_qubits(gate)
+        if gate[0] == "Measure":
+            for index in dict.fromkeys(owner[qubit][0] for qubit in qubits):
+                parts[index][1].gates.append(("Measure",) + tuple(owner[qubit][1] for qubit in qubits if owner[qubit][0] == index))
+            continue
+        index: int = owner[qubits[0]][0]
+        parts[index][1].gates.append((gate[0],) + tuple(owner[qubit][1] for qubit in qubits) + gate[1 + len(qubits):])
+    return parts
+
+
+class ProductState:
+    """
+    Represents the state of a decomposed circuit as a tensor product of component states.
+
+    The full 2^n state vector is only built by :meth:`to_statevector` (or by
+    ``np.asarray``), so a run with many idle qubits or independent registers
+    (``QuantumSimulator.run(..., factored=True)``) never allocates it unless it
+    is asked for.
+
+    Attributes:
+        num_qubits (int): The total number of qubits.
+        factors (list): (qubits, state vector) pairs, one per component.
+    """
+    def __init__(self, num_qubits: int, factors: list) -> None:
+        """
+        Initializes a product state.
+
+        Args:
+            num_qubits (int): The total number of qubits.
+            factors (list): (qubits, state vector) pairs whose qubits partition
+                range(num_qubits); each vector has the first of its qubits as the
+                most significant bit.
+        """
+        self.num_qubits = num_qubits
+        self.factors = factors
+
+    def to_statevector(self) -> np.ndarray:
+        """
+        Returns the full state vector.
+
+        Returns:
+            np.ndarray: The 2^n amplitudes, qubit 0 being the most significant bit.
+        """
+        tensor: np.ndarray = np.ones((), dtype=np.result_type(np.complex64, *(state for _, state in self.factors)))
+        order: list = []
+        for qubits, state in self.factors:
+            tensor = np.multiply.outer(tensor, state.reshape((2,) * len(qubits)))
+            order.extend(qubits)
+        return tensor.transpose(np.argsort(order)).reshape(-1)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Returns the full state vector, e.g. for ``np.asarray(state)``."""
+        state: np.ndarray = self.to_statevector()
+        return state if dtype is None else state.astype(dtype)
+
+    def amplitude(self, bits) -> complex:
+        """
+        Returns the amplitude of a computational basis state.
+
+        Args:
+            bits (str or sequence of int): The bit of each qubit, qubit 0 first (e.g. "0110").
+
+        Returns:
+            complex: The amplitude, the product of one amplitude per component.
+        """
+        amplitude: complex = 1.0
+        for qubits, state in self.factors:
+            amplitude *= state[int("".join(str(int(bits[qubit])) for qubit in qubits), 2)]
+        return complex(amplitude)
+
+    def expectation(self, observable) -> float:
+        """
+        Returns the expectation value of an observable.
+
+        A Pauli term factorizes over the components, so it is evaluated as the
+        product of its restrictions to each component's state; any other
+        observable needs the full state vector.
+
+        Args:
+            observable: A PauliSum, a list of (coefficient, pauli) terms, a Hermitian
+                matrix or a diagonal (see :func:`observables.expectation_value`).
+
+        Returns:
+            float: The expectation value.
+        """
+        if isinstance(observable, list):
+            observable = PauliSum(observable)
+        if not isinstance(observable, PauliSum):
+            return expectation_value(observable, self.to_statevector(), self.num_qubits)
+        owner = {qubit: (index, local) for index, (qubits, _) in enumerate(self.factors) for local, qubit in enumerate(qubits)}
+        value: float = 0.0
+        for coefficient, pauli in observable.terms:
+            term = coefficient
+            for index, (qubits, state) in enumerate(self.factors):
+                restricted: dict = {owner[qubit][1]: letter for qubit, letter in pauli.items() if owner[qubit][0] == index}
+                if restricted:
+                    term *= PauliSum([(1.0, restricted)]).expectation(state, len(qubits))
+            value += term
+        return float(np.real(value))
+
+    def __repr__(self) -> str:
+        return f"ProductState(num_qubits={self.num_qubits}, components={[qubits for qubits, _ in self.factors]})"
@@ -0,0 +1,371 @@
+"""
+Defines the array-backed storage of a circuit's gates and its binary file format.
+
+A GateStore keeps the gates in four parallel columns, so a gate costs a few
+dozen bytes instead of a tuple of Python objects:
+
+* a gate code (uint8), an index into ``GATE_NAMES``;
+* the offset of its qubits in the operand column (int64);
+* the qubits of all gates, back to back (int32);
+* the angle of each parametric gate, or the probability of each noise
+  channel (float64; NaN for other gates).
+
+Symbolic angles (ParameterExpression) and "Unitary" matrices are kept in a side
+table keyed by gate index. Gate tuples such as ``("CNOT", 0, 1)`` are only
+rebuilt when the store is indexed or iterated, so numeric angles come back as
+floats: ``("RX", 0, 1)`` is read as ``("RX", 0, 1.0)``. The list mutators
+(item assignment, ``del``, ``insert``, ``pop``, ``remove``, ``clear``) rebuild
+the columns from the first gate they change, in O(n) time like a list's.
+
+The binary format (see :func:`dumps` and :func:`loads`) is a fixed header
+followed by the columns, 8-byte aligned and little-endian, and then the
+entries of the "Unitary" matrices (complex128). A loaded store reads its
+columns straight out of the buffer, e.g. a memory-mapped file. Its columns are
+copied only on the first append.
+"""
+
+import array
+import hashlib
+import operator
+import struct
+import numpy as np
+
+PARAMETRIC_GATES = ("RX", "RY", "RZ", "Rxx", "Ryy", "Rzz")
+MATRIX_GATES = ("Unitary",)  # Gates whose last tuple entry is their matrix
+NOISE_GATES = ("Depolarizing", "AmplitudeDamping", "ReadoutError")  # Channels whose last tuple entry is their probability
+
+# The gate codes are part of the file format: new gate types go at the end
+GATE_NAMES = ("I", "H", "X", "Y", "Z", "S", "T", "RX", "RY", "RZ", "CNOT", "CZ", "SWAP", "CCX",
+              "CY", "CH", "CS", "CSWAP", "Rxx", "Ryy", "Rzz", "Unitary", "Measure", "Reset",
+              "Depolarizing", "AmplitudeDamping", "ReadoutError")
+FORMAT_VERSION: int = 1
+
+_CODES: dict = {name: code for code, name in enumerate(GATE_NAMES)}
+_OPERAND_GATES: frozenset = frozenset(PARAMETRIC_GATES + MATRIX_GATES + NOISE_GATES)
+_MAGIC: bytes = b"NXQC"
+# magic, version, flags, number of qubits, of gates, of operand entries, of matrix entries
+_HEADER = struct.Struct("<4sHHqqqq")
+# Typecode and file dtype of the columns: codes, starts, operands, params
+_COLUMNS = (("B", "<u1"), ("q", "<i8"), ("i", "<i4"), ("d", "<f8"))
+
+
+class GateStore:
+    """
+    Stores the gates of a circuit in compact columns, behaving as a list of gate tuples.
+    """
+    def __init__(self, gates=()) -> None:
+        """
+        Initializes a store.
+
+        Args:
+            gates (iterable of tuple, optional): The initial gates.
+        """
+        self._codes = array.array("B")
+        self._starts = array.array("q", [0])  # Gate i's qubits are operands[starts[i]:starts[i + 1]]
+        self._operands = array.array("i")
+        self._params = array.array("d")
+        self._objects = {}  # Gate index -> ParameterExpression or matrix
+        self.extend(gates)
+
+    def append(self, gate: tuple) -> None:
+        """
+        Appends a gate tuple in amortized O(1) time.
+
+        Args:
+            gate (tuple): The gate, e.g. ("CNOT", 0, 1) or ("RX", 0, 0.5).
+        """
+        code: int = _CODES.get(gate[0])
+        if code is None:
+            raise ValueError(f"Unknown gate type: {gate[0]}")
+        if not isinstance(self._codes, array.array):
+            self._thaw()
+        if gate[0] in _OPERAND_GATES:
+            self._operands.extend(gate[1:-1])
+            operand = gate[-1]
+            if gate[0] not in MATRIX_GATES and isinstance(operand, (int, float, np.integer, np.floating)):
+                self._params.append(float(operand))
+            else:
+                self._params.append(np.nan)
+                self._objects[len(self._codes)] = operand
+        else:
+            self._operands.extend(gate[1:])
+            self._params.append(np.nan)
+        self._codes.append(code)
+        self._starts.append(len(self._operands))
+
+    def extend(self, gates) -> None:
+        """
+        Appends several gate tuples.
+
+        Args:
+            gates (iterable of tuple): The gates.
+        """
+        for gate in gates:
+            self.append(gate)
+
+    def __iadd__(self, gates) -> "GateStore":
+        """Appends several gate tuples, as ``list +=`` does."""
+        self.extend(gates)
+        return self
+
+    def insert(self, index: int, gate: tuple) -> None:
+        """
+        Inserts a gate tuple before an index, as ``list.insert`` does.
+
+        Args:
+            index (int): The position of the new gate.
+            gate (tuple): The gate.
+        """
+        start: int = slice(index, None).indices(len(self))[0]
+        self._splice(start, start, [gate])
+
+    def pop(self, index: int = -1) -> tuple:
+        """
+        Removes the gate at an index.
+
+        Args:
+            index (int): The position of the gate, the last one by default.
+
+        Returns:
+            tuple: The removed gate.
+        """
+        gate: tuple = self[index]
+        del self[index]
+        return gate
+
+    def remove(self, gate: tuple) -> None:
+        """
+        Removes the first occurrence of a gate, matrices comparing by their entries.
+
+        Args:
+            gate (tuple): The gate.
+        """
+        target: GateStore = GateStore([gate])
+        for index, existing in enumerate(self):
+            if GateStore([existing]) == target:
+                del self[index]
+                return
+        raise ValueError("GateStore.remove(x): x not in store")
+
+    def clear(self) -> None:
+        """Removes every gate."""
+        self._splice(0, len(self), [])
+
+    def copy(self) -> "GateStore":
+        """
+        Returns an independent copy of the store.
+
+        Returns:
+            GateStore: The copy.
+        """
+        store: GateStore = GateStore.__new__(GateStore)
+        store._codes, store._starts, store._operands, store._params = (
+            _to_array(typecode, column) for (typecode, _), column in zip(_COLUMNS, self._columns()))
+        store._objects = dict(self._objects)
+        return store
+
+    def __len__(self) -> int:
+        """Returns the number of gates."""
+        return len(self._codes)
+
+    def __getitem__(self, index):
+        """Returns the gate tuple at an index, or a list of gate tuples for a slice."""
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        index = self._position(index)
+        start, stop = int(self._starts[index]), int(self._starts[index + 1])
+        return self._gate(index, int(self._codes[index]), self._operands[start:stop].tolist(), float(self._params[index]))
+
+    def __setitem__(self, index, gate) -> None:
+        """Replaces the gate at an index, or the gates of a slice by an iterable of gate tuples."""
+        if isinstance(index, slice):
+            gates: list = self[:]
+            gates[index] = gate
+            self._splice(0, len(self), gates)
+        else:
+            index = self._position(index)
+            self._splice(index, index + 1, [gate])
+
+    def __delitem__(self, index) -> None:
+        """Removes the gate at an index, or the gates of a slice."""
+        if isinstance(index, slice):
+            gates: list = self[:]
+            del gates[index]
+            self._splice(0, len(self), gates)
+        else:
+            index = self._position(index)
+            self._splice(index, index + 1, [])
+
+    def __iter__(self):
+        """Yields the gate tuples in order."""
+        codes: list = self._codes.tolist()
+        starts: list = self._starts.tolist()
+        operands: list = self._operands.tolist()
+        params: list = self._params.tolist()
+        for index, code in enumerate(codes):
+            yield self._gate(index, code, operands[starts[index]:starts[index + 1]], params[index])
+
+    def __reversed__(self):
+        """Yields the gate tuples in reverse order."""
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def __eq__(self, other) -> bool:
+        """Compares the gates with those of another store or sequence, matrices by their entries."""
+        if isinstance(other, (list, tuple)):
+            try:
+                other = GateStore(other)
+            except (ValueError, TypeError, IndexError):
+                return False
+        if not isinstance(other, GateStore):
+            return NotImplemented
+        if len(self) != len(other) or self._objects.keys() != other._objects.keys():
+            return False
+        for column, other_column in zip(self._columns(), other._columns()):
+            if not np.array_equal(np.asarray(column), np.asarray(other_column), equal_nan=True):
+                return False
+        for index, operand in self._objects.items():
+            other_operand = other._objects[index]
+            if GATE_NAMES[self._codes[index]] in MATRIX_GATES:
+                if not np.array_equal(operand, other_operand):
+                    return False
+            elif operand is not other_operand:
+                return False
+        return True
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def nbytes(self) -> int:
+        """
+        Returns the memory held by the columns.
+
+        Returns:
+            int: The number of bytes, excluding the side table of symbolic angles and matrices.
+        """
+        return sum(np.asarray(column).nbytes for column in self._columns())
+
+    def digest(self) -> tuple:
+        """
+        Returns a key identifying the gates, computed from the columns without rebuilding gate tuples.
+
+        Returns:
+            tuple: A hash of the columns and matrix entries, followed by the symbolic
+            angles, which compare by identity.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for column in self._columns():
+            digest.update(np.asarray(column).tobytes())
+        symbols: list = []
+        for index, operand in sorted(self._objects.items()):
+            if GATE_NAMES[self._codes[index]] in MATRIX_GATES:
+                digest.update(np.ascontiguousarray(operand, dtype=np.complex128).tobytes())
+            else:
+                symbols.append(operand)
+        return (digest.digest(), *symbols)
+
+    def _gate(self, index: int, code: int, qubits: list, param: float) -> tuple:
+        """Rebuilds the tuple of a gate from its columns."""
+        name: str = GATE_NAMES[code]
+        if name in PARAMETRIC_GATES or name in NOISE_GATES:
+            return (name, *qubits, self._objects.get(index, param))
+        if name in MATRIX_GATES:
+            return (name, *qubits, self._objects[index])
+        return (name, *qubits)
+
+    def _position(self, index: int) -> int:
+        """Returns a gate index with negative indices counted from the end, checking its range."""
+        index = operator.index(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("gate index out of range")
+        return index
+
+    def _splice(self, start: int, stop: int, gates) -> None:
+        """Replaces the gates at indices start to stop by other gate tuples, rebuilding the columns from start."""
+        replacement: GateStore = GateStore(gates)  # Checks the new gates before anything changes
+        tail: list = self[stop:]
+        if not isinstance(self._codes, array.array):
+            self._thaw()
+        del self._codes[start:]
+        del self._starts[start + 1:]
+        del self._operands[self._starts[start]:]
+        del self._params[start:]
+        self._objects = {index: operand for index, operand in self._objects.items() if index < start}
+        self.extend(replacement)
+        self.extend(tail)
+
+    def _columns(self) -> tuple:
+        """Returns the codes, starts, operands and params columns."""
+        return self._codes, self._starts, self._operands, self._params
+
+    def _thaw(self) -> None:
+        """Copies columns read from a buffer into growable arrays."""
+        self._codes, self._starts, self._operands, self._params = (
+            _to_array(typecode, column) for (typecode, _), column in zip(_COLUMNS, self._columns()))
+
+
+def dumps(num_qubits: int, store: GateStore) -> bytes:
+    """
+    Serializes the gates of a circuit in the binary format.
+
+    Args:
+        num_qubits (int): The number of qubits of the circuit.
+        store (GateStore): The gates, whose parameters must be bound.
+
+    Returns:
+        bytes: The encoded circuit (see :func:`loads`).
+    """
+    matrices: list = []
+    for index, operand in sorted(store._objects.items()):
+        if GATE_NAMES[store._codes[index]] in PARAMETRIC_GATES:
+            raise ValueError("Circuits with unbound parameters cannot be serialized; bind them first")
+        matrices.append(np.asarray(operand, dtype="<c16").ravel())
+    entries: np.ndarray = np.concatenate(matrices) if matrices else np.zeros(0, dtype="<c16")
+    header: bytes = _HEADER.pack(_MAGIC, FORMAT_VERSION, 0, num_qubits, len(store), len(store._operands), len(entries))
+    sections: list = [header]
+    for (_, dtype), column in zip(_COLUMNS, store._columns()):
+        sections.append(np.asarray(column).astype(dtype, copy=False).tobytes())
+        sections.append(bytes(-len(sections[-1]) % 8))
+    sections.append(entries.tobytes())
+    return b"".join(sections)
+
+
+def loads(buffer) -> tuple[int, GateStore]:
+    """
+    Deserializes a circuit from the binary format without copying its columns.
+
+    Args:
+        buffer (bytes-like): The encoded circuit, e.g. a memory-mapped file; it
+            must stay alive and unchanged while the store is in use.
+
+    Returns:
+        int, GateStore: The number of qubits and the gates.
+    """
+    magic, version, _, num_qubits, num_gates, num_operands, num_entries = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise ValueError("Not a NexusQ circuit file")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported circuit format version {version} (this version reads up to {FORMAT_VERSION})")
+    offset: int = _HEADER.size
+    columns: list = []
+    for (_, dtype), count in zip(_COLUMNS, (num_gates, num_gates + 1, num_operands, num_gates)):
+        columns.append(np.frombuffer(buffer, dtype=dtype, count=count, offset=offset))
+        offset += columns[-1].nbytes + (-columns[-1].nbytes % 8)
+    entries: np.ndarray = np.frombuffer(buffer, dtype="<c16", count=num_entries, offset=offset)
+    store: GateStore = GateStore.__new__(GateStore)
+    store._codes, store._starts, store._operands, store._params = columns
+    store._objects = {}
+    codes, starts = columns[0], columns[1]
+    start: int = 0
+    for index in np.flatnonzero(codes == _CODES["Unitary"]).tolist():
+        size: int = 2**int(starts[index + 1] - starts[index])
+        store._objects[index] = entries[start:start + size * size].reshape(size, size)
+        start += size * size
+    return num_qubits, store
+
+
+def _to_array(typecode: str, column) -> array.array:
+    """Returns a growable copy of a column."""
+    return array.array(typecode, np.asarray(column).astype(np.dtype(typecode), copy=False).tobytes())
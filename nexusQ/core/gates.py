@@ -0,0 +1,215 @@
+"""
+Defines the gate set of NexusQ: the matrix of every gate and how the simulator applies it.
+"""
+
+import functools
+import numpy as np
+from .quantum_circuit import PARAMETRIC_GATES
+
+# How each gate type is applied, and how many of its leading qubits are controls:
+#   "matrix"     - a dense matrix on all its qubits
+#   "diagonal"   - an elementwise phase multiplication
+#   "flip"       - a (multi-)controlled bit flip
+#   "swap"       - a (controlled) exchange of two qubits
+#   "controlled" - a matrix on the target, applied where the controls are |1>
+#   "measure", "reset" - non-unitary operations
+#   "noise"      - noise channels, only simulated by trajectories (see noise.py)
+GATE_KINDS = {
+    "I": ("diagonal", 0),
+    "H": ("matrix", 0),
+    "X": ("flip", 0),
+    "Y": ("matrix", 0),
+    "Z": ("diagonal", 0),
+    "S": ("diagonal", 0),
+    "T": ("diagonal", 0),
+    "RX": ("matrix", 0),
+    "RY": ("matrix", 0),
+    "RZ": ("diagonal", 0),
+    "CNOT": ("flip", 1),
+    "CZ": ("diagonal", 0),
+    "SWAP": ("swap", 0),
+    "CCX": ("flip", 2),
+    "CY": ("controlled", 1),
+    "CH": ("controlled", 1),
+    "CS": ("diagonal", 0),
+    "CSWAP": ("swap", 1),
+    "Rxx": ("matrix", 0),
+    "Ryy": ("matrix", 0),
+    "Rzz": ("diagonal", 0),
+    "Unitary": ("matrix", 0),
+    "Measure": ("measure", 0),
+    "Reset": ("reset", 0),
+    "Depolarizing": ("noise", 0),
+    "AmplitudeDamping": ("noise", 0),
+    "ReadoutError": ("noise", 0),
+}
+
+_SQRT1_2: float = 1 / np.sqrt(2)
+
+_FIXED_MATRICES = {
+    "I": [[1, 0], [0, 1]],
+    "H": [[_SQRT1_2, _SQRT1_2], [_SQRT1_2, -_SQRT1_2]],
+    "X": [[0, 1], [1, 0]],
+    "Y": [[0, -1j], [1j, 0]],
+    "Z": [[1, 0], [0, -1]],
+    "S": [[1, 0], [0, 1j]],
+    "T": [[1, 0], [0, np.exp(1j * np.pi / 4)]],
+    "SWAP": [[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]],
+}
+
+# Gates that are a fixed single-qubit matrix controlled on their leading qubits
+_CONTROLLED_BASES = {"CNOT": "X", "CZ": "Z", "CCX": "X", "CY": "Y", "CH": "H", "CS": "S", "CSWAP": "SWAP"}
+
+
+def _frozen(matrix) -> np.ndarray:
+    """Returns the matrix as a read-only complex array, safe to share between callers."""
+    array: np.ndarray = np.array(matrix, dtype=complex)
+    array.flags.writeable = False
+    return array
+
+
+@functools.lru_cache(maxsize=4096)
+def gate_matrix(gate_type: str, theta: float = None) -> np.ndarray:
+    """
+    Returns the unitary matrix of a gate on all of its qubits.
+
+    Matrices are cached per gate type and per distinct angle, and are read-only.
+
+    Args:
+        gate_type (str): The gate type, as stored in QuantumCircuit.gates.
+        theta (float, optional): The rotation angle of a parametric gate.
+
+    Returns:
+        np.ndarray: The 2^k x 2^k matrix, the first qubit operand being the most
+        significant bit.
+    """
+    if gate_type in _FIXED_MATRICES:
+        return _frozen(_FIXED_MATRICES[gate_type])
+    if gate_type in _CONTROLLED_BASES:
+        return _frozen(controlled_matrix(gate_matrix(_CONTROLLED_BASES[gate_type]), GATE_KINDS[gate_type][1] or 1))
+    cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+    if gate_type == "RX":
+        return _frozen([[cos, -1j * sin], [-1j * sin, cos]])
+    if gate_type == "RY":
+        return _frozen([[cos, -sin], [sin, cos]])
+    if gate_type in ("RZ", "Rzz"):
+        return _frozen(np.diag(gate_diagonal(gate_type, theta)))
+    if gate_type == "Rxx":
+        return _frozen([[cos, 0, 0, -1j * sin],
+                        [0, cos, -1j * sin, 0],
+                        [0, -1j * sin, cos, 0],
+                        [-1j * sin, 0, 0, cos]])
+    if gate_type == "Ryy":
+        return _frozen([[cos, 0, 0, 1j * sin],
+                        [0, cos, -1j * sin, 0],
+                        [0, -1j * sin, cos, 0],
+                        [1j * sin, 0, 0, cos]])
+    raise ValueError(f"Unknown gate type: {gate_type}")
+
+
+@functools.lru_cache(maxsize=4096)
+def gate_diagonal(gate_type: str, theta: float = None) -> np.ndarray:
+    """
+    Returns the diagonal entries of a diagonal gate.
+
+    Args:
+        gate_type (str): The gate type (one whose kind is "diagonal").
+        theta (float, optional): The rotation angle of RZ/Rzz.
+
+    Returns:
+        np.ndarray: The 2^k diagonal entries (read-only).
+    """
+    if gate_type == "RZ":
+        return _frozen([np.exp(-1j * theta / 2), np.exp(1j * theta / 2)])
+    if gate_type == "Rzz":
+        return _frozen([np.exp(-1j * theta / 2), np.exp(1j * theta / 2), np.exp(1j * theta / 2), np.exp(-1j * theta / 2)])
+    if GATE_KINDS.get(gate_type, (None,))[0] != "diagonal":
+        raise ValueError(f"{gate_type} is not a diagonal gate")
+    return _frozen(np.diag(gate_matrix(gate_type)))
+
+
+def target_matrix(gate_type: str, theta: float = None) -> np.ndarray:
+    """
+    Returns the matrix a gate applies to its target qubits, leaving out its controls.
+
+    Args:
+        gate_type (str): The gate type.
+        theta (float, optional): The rotation angle of a parametric gate.
+
+    Returns:
+        np.ndarray: The matrix on the non-control qubits.
+    """
+    if gate_type in _CONTROLLED_BASES:
+        return gate_matrix(_CONTROLLED_BASES[gate_type])
+    return gate_matrix(gate_type, theta)
+
+
+def controlled_matrix(matrix: np.ndarray, num_controls: int = 1) -> np.ndarray:
+    """
+    Returns the matrix of a gate controlled on ``num_controls`` leading qubits.
+
+    Args:
+        matrix (np.ndarray): The matrix on the target qubits.
+        num_controls (int): The number of control qubits.
+
+    Returns:
+        np.ndarray: The controlled matrix.
+    """
+    size: int = len(matrix) << num_controls
+    controlled: np.ndarray = np.eye(size, dtype=complex)
+    controlled[size - len(matrix):, size - len(matrix):] = matrix
+    return controlled
+
+
+# Rotation gates are exp(-i theta / 2 * P) for these Pauli generators P
+ROTATION_GENERATORS = {
+    "RX": gate_matrix("X"),
+    "RY": gate_matrix("Y"),
+    "RZ": gate_matrix("Z"),
+    "Rxx": _frozen(np.kron(gate_matrix("X"), gate_matrix("X"))),
+    "Ryy": _frozen(np.kron(gate_matrix("Y"), gate_matrix("Y"))),
+    "Rzz": _frozen(np.kron(gate_matrix("Z"), gate_matrix("Z"))),
+}
+
+
+def rotation_operands(gate_type: str, thetas: np.ndarray) -> np.ndarray:
+    """
+    Returns the matrices of a rotation gate for a whole array of angles at once.
+
+    Args:
+        gate_type (str): The rotation gate type (RX, RY, RZ, Rxx, Ryy or Rzz).
+        thetas (np.ndarray): The angles, of shape (batch,).
+
+    Returns:
+        np.ndarray: The (batch, 2^k, 2^k) matrices, or the (batch, 2^k) diagonals
+        for the diagonal gates RZ and Rzz.
+    """
+    thetas: np.ndarray = np.asarray(thetas, dtype=float)
+    generator: np.ndarray = ROTATION_GENERATORS[gate_type]
+    cos, sin = np.cos(thetas / 2), np.sin(thetas / 2)
+    if GATE_KINDS[gate_type][0] == "diagonal":
+        return cos[:, None] - 1j * sin[:, None] * np.diag(generator)
+    return cos[:, None, None] * np.eye(len(generator)) - 1j * sin[:, None, None] * generator
+
+
+def gate_unitary(gate: tuple) -> np.ndarray:
+    """
+    Returns the unitary matrix of a gate tuple on all of its qubits.
+
+    Args:
+        gate (tuple): A gate as stored in QuantumCircuit.gates.
+
+    Returns:
+        np.ndarray: The 2^k x 2^k matrix, the first qubit operand being the most
+        significant bit.
+    """
+    if gate[0] == "Unitary":
+        return np.asarray(gate[-1], dtype=complex)
+    if gate[0] in PARAMETRIC_GATES:
+        return gate_matrix(gate[0], gate[-1])
+    return gate_matrix(gate[0])
+
+
+def is_diagonal(matrix: np.ndarray) -> bool:
+    """Returns whether a matrix has no off-diagonal entries."""
+    return not np.any(matrix[~np.eye(len(matrix), dtype=bool)])
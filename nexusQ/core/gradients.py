@@ -0,0 +1,76 @@
+"""
+Defines adjoint-method gradients of expectation values of parameterized circuits.
+"""
+
+import numpy as np
+from .gates import ROTATION_GENERATORS, is_diagonal
+from .compiler import Program, OP_MATRIX, OP_DIAGONAL, OP_PHASES, OP_FLIP, OP_SWAP, OP_CONTROLLED, OP_MEASURE
+from .observables import apply_observable
+from . import kernels
+
+
+def adjoint_gradient(simulator, program: Program, observable, parameter_values: dict) -> tuple[float, dict]:
+    """
+    Computes an expectation value and its gradient with respect to every circuit parameter.
+
+    The adjoint (reverse-mode) method walks the gate list backwards once, keeping
+    only three state vectors, so all P partial derivatives cost about three
+    state-vector passes instead of the 2P circuit runs of parameter shift.
+
+    Args:
+        simulator (QuantumSimulator): The simulator used for the forward pass.
+        program (Program): The compiled, unbound program.
+        observable: The observable (see :func:`observables.apply_observable`).
+        parameter_values (dict): The value of each Parameter.
+
+    Returns:
+        float, dict: The expectation value and the derivative with respect to each Parameter.
+    """
+    if program.split is not None:
+        raise ValueError("Gradients do not support mid-circuit measurements or resets")
+    bound: Program = program.bind(parameter_values)
+    num_qubits: int = program.num_qubits
+    state: np.ndarray = np.zeros(2**num_qubits, dtype=program.dtype)
+    state[0] = 1  # Initialize to |00...0>
+    simulator.execute(bound, state, {}, skip_measurements=True)
+
+    adjoint: np.ndarray = apply_observable(observable, state, num_qubits)
+    value: float = np.vdot(state, adjoint).real
+    gradient: dict = dict.fromkeys(program.parameters, 0.0)
+    parametric: set = set(program.parametric)
+    for index in range(len(program) - 1, -1, -1):
+        opcode: int = int(bound.opcodes[index])
+        qubits: tuple = bound.qubits[index]
+        if index in parametric:
+            # d/dtheta exp(-i theta/2 P) = -i/2 P exp(-i theta/2 P)
+            gate_type, expression = program.operands[index]
+            generated: np.ndarray = state.copy()
+            generator: np.ndarray = ROTATION_GENERATORS[gate_type].astype(state.dtype, copy=False)
+            if is_diagonal(generator):
+                kernels.apply_diagonal(generated, np.diag(generator), qubits, num_qubits)
+            else:
+                kernels.apply_matrix(generated, generator, qubits, num_qubits)
+            derivative: float = np.vdot(adjoint, generated).imag
+            for parameter, coefficient in expression.terms.items():
+                gradient[parameter] += coefficient * derivative
+        _apply_inverse(opcode, qubits, bound.operands[index], state, num_qubits)
+        _apply_inverse(opcode, qubits, bound.operands[index], adjoint, num_qubits)
+    return value, gradient
+
+
+def _apply_inverse(opcode: int, qubits: tuple, operand, state: np.ndarray, num_qubits: int) -> None:
+    """Applies the inverse of a compiled instruction to a state vector in place."""
+    if opcode == OP_MATRIX:
+        kernels.apply_matrix(state, operand.conj().T, qubits, num_qubits)
+    elif opcode == OP_DIAGONAL:
+        kernels.apply_diagonal(state, np.conj(operand), qubits, num_qubits)
+    elif opcode == OP_PHASES:
+        operand.apply(state, inverse=True)
+    elif opcode == OP_FLIP:
+        kernels.apply_controlled_x(state, qubits[:-1], qubits[-1], num_qubits)
+    elif opcode == OP_SWAP:
+        kernels.apply_swap(state, qubits[-2], qubits[-1], num_qubits, controls=qubits[:-2])
+    elif opcode == OP_CONTROLLED:
+        kernels.apply_controlled(state, operand.conj().T, qubits[:-1], qubits[-1:], num_qubits)
+    elif opcode != OP_MEASURE:
+        raise ValueError(f"Instruction with opcode {opcode} has no inverse")
@@ -0,0 +1,359 @@
+"""
+Defines the state-vector kernels used by the QuantumSimulator.
+
+The state vector of an n-qubit register is viewed as a rank-n tensor with one
+axis of length 2 per qubit. Qubit 0 is the most significant bit of a basis
+index, so axis ``q`` of the tensor is qubit ``q``. Every kernel works in place
+on the state and needs O(2^n) time and at most O(2^n) temporary memory.
+
+The unitary kernels also accept a batch of states of shape (batch, 2^n): qubit
+axes are addressed from the right, so leading batch axes are carried along, and
+matrices or diagonals may carry the same leading batch axis to apply a
+different gate to each state.
+"""
+
+import numpy as np
+
+
+def as_tensor(state: np.ndarray, num_qubits: int) -> np.ndarray:
+    """
+    Returns a rank-n tensor view of the given state vector.
+
+    Args:
+        state (np.ndarray): The (contiguous) state vector, or batch of state vectors.
+        num_qubits (int): The number of qubits of the state.
+
+    Returns:
+        np.ndarray: A view of the state with shape (2,) * num_qubits, after any batch axes.
+    """
+    return state.reshape(state.shape[:-1] + (2,) * num_qubits)
+
+
+def apply_single_qubit(state: np.ndarray, matrix: np.ndarray, qubit: int, num_qubits: int) -> None:
+    """
+    Applies a 2x2 matrix to one qubit of the state vector in place.
+
+    Args:
+        state (np.ndarray): The state vector.
+        matrix (np.ndarray): The 2x2 gate matrix.
+        qubit (int): The index of the qubit.
+        num_qubits (int): The number of qubits of the state.
+    """
+    view: np.ndarray = state.reshape(state.shape[:-1] + (2**qubit, 2, -1))
+    _apply_pair(view[..., 0, :], view[..., 1, :], matrix)
+
+
+def apply_matrix(state: np.ndarray, matrix: np.ndarray, qubits, num_qubits: int) -> None:
+    """
+    Applies a k-qubit matrix to the given qubits of the state vector in place.
+
+    The rows and columns of the matrix are ordered with ``qubits[0]`` as the
+    most significant bit.
+
+    Args:
+        state (np.ndarray): The state vector.
+        matrix (np.ndarray): The 2^k x 2^k gate matrix.
+        qubits (sequence of int): The indices of the qubits the matrix acts on.
+        num_qubits (int): The number of qubits of the state.
+    """
+    if len(qubits) == 1:
+        apply_single_qubit(state, matrix, qubits[0], num_qubits)
+    else:
+        apply_tensor(as_tensor(state, num_qubits), matrix, [qubit - num_qubits for qubit in qubits])
+
+
+def apply_tensor(psi: np.ndarray, matrix: np.ndarray, axes) -> None:
+    """
+    Applies a k-qubit matrix to the given axes of a state tensor in place.
+
+    The tensor may be a (non-contiguous) view, e.g. the control-satisfied
+    slice of a larger state, in which case the update is written through.
+
+    Args:
+        psi (np.ndarray): The state tensor, one axis of length 2 per qubit after any batch axes.
+        matrix (np.ndarray): The 2^k x 2^k gate matrix, or a (batch, 2^k, 2^k) stack.
+        axes (sequence of int): The (negative) axes of the tensor the matrix acts on.
+    """
+    k: int = len(axes)
+    if k == 1:
+        _apply_pair(psi[_select(axes[0], 0)], psi[_select(axes[0], 1)], matrix)
+        return
+    batch: int = matrix.ndim - 2
+    sub: np.ndarray = np.moveaxis(psi, list(axes), list(range(batch, batch + k)))
+    updated: np.ndarray = matrix @ sub.reshape(sub.shape[:batch] + (2**k, -1))
+    sub[...] = updated.reshape(sub.shape)
+
+
+def controlled_view(state: np.ndarray, controls, num_qubits: int) -> np.ndarray:
+    """
+    Returns the slice of the state tensor on which all control qubits are |1>.
+
+    The slice is a view, so writing to it updates the state. It has one axis
+    per non-control qubit (after any batch axes); use :func:`view_axis` to
+    locate a qubit in it.
+
+    Args:
+        state (np.ndarray): The state vector.
+        controls (sequence of int): The indices of the control qubits.
+        num_qubits (int): The number of qubits of the state.
+
+    Returns:
+        np.ndarray: The control-satisfied view (1/2^c of the amplitudes).
+    """
+    index: list = [slice(None)] * num_qubits
+    for control in controls:
+        index[control] = 1
+    return as_tensor(state, num_qubits)[(...,) + tuple(index)]
+
+
+def view_axis(qubit: int, controls, num_qubits: int) -> int:
+    """Returns the (negative) axis of a qubit inside a :func:`controlled_view`."""
+    return qubit - num_qubits + sum(1 for control in controls if control > qubit)
+
+
+def apply_controlled(state: np.ndarray, matrix: np.ndarray, controls, targets, num_qubits: int) -> None:
+    """
+    Applies a matrix to the target qubits wherever all controls are |1>.
+
+    Only the control-satisfied half, quarter or eighth of the amplitudes is
+    touched, in a single vectorized step.
+
+    Args:
+        state (np.ndarray): The state vector.
+        matrix (np.ndarray): The 2^k x 2^k matrix acting on the targets.
+        controls (sequence of int): The indices of the control qubits.
+        targets (sequence of int): The indices of the target qubits.
+        num_qubits (int): The number of qubits of the state.
+    """
+    if not controls:
+        apply_matrix(state, matrix, targets, num_qubits)
+        return
+    view: np.ndarray = controlled_view(state, controls, num_qubits)
+    apply_tensor(view, matrix, [view_axis(target, controls, num_qubits) for target in targets])
+
+
+def apply_controlled_x(state: np.ndarray, controls, target: int, num_qubits: int) -> None:
+    """
+    Flips the target qubit wherever all controls are |1> (X, CNOT, CCX).
+
+    Args:
+        state (np.ndarray): The state vector.
+        controls (sequence of int): The indices of the control qubits.
+        target (int): The index of the target qubit.
+        num_qubits (int): The number of qubits of the state.
+    """
+    view: np.ndarray = controlled_view(state, controls, num_qubits)
+    axis: int = view_axis(target, controls, num_qubits)
+    _swap_slices(view[_select(axis, 0)], view[_select(axis, 1)])
+
+
+def apply_swap(state: np.ndarray, qubit1: int, qubit2: int, num_qubits: int, controls=()) -> None:
+    """
+    Swaps two qubits wherever all controls are |1> (SWAP, CSWAP).
+
+    Args:
+        state (np.ndarray): The state vector.
+        qubit1 (int): The index of the first qubit.
+        qubit2 (int): The index of the second qubit.
+        num_qubits (int): The number of qubits of the state.
+        controls (sequence of int): The indices of the control qubits.
+    """
+    view: np.ndarray = controlled_view(state, controls, num_qubits)
+    axis1: int = view_axis(qubit1, controls, num_qubits)
+    axis2: int = view_axis(qubit2, controls, num_qubits)
+    index01: list = [slice(None)] * (num_qubits - len(controls))
+    index10: list = [slice(None)] * (num_qubits - len(controls))
+    index01[axis1], index01[axis2] = 0, 1
+    index10[axis1], index10[axis2] = 1, 0
+    _swap_slices(view[(...,) + tuple(index01)], view[(...,) + tuple(index10)])
+
+
+def diagonal_factor(diagonal: np.ndarray, qubits, num_qubits: int) -> np.ndarray:
+    """
+    Returns a diagonal as a tensor that broadcasts against the state tensor.
+
+    Args:
+        diagonal (np.ndarray): The 2^k diagonal entries, ``qubits[0]`` being
+            the most significant bit, optionally after a batch axis.
+        qubits (sequence of int): The indices of the qubits the diagonal acts on.
+        num_qubits (int): The number of qubits of the state.
+
+    Returns:
+        np.ndarray: A tensor with length-2 axes at ``qubits`` and length-1 axes
+        everywhere else.
+    """
+    diagonal: np.ndarray = np.asarray(diagonal)
+    batch: tuple = diagonal.shape[:-1]
+    order: list = sorted(range(len(qubits)), key=lambda position: qubits[position])
+    factor: np.ndarray = diagonal.reshape(batch + (2,) * len(qubits))
+    factor = factor.transpose(list(range(len(batch))) + [len(batch) + position for position in order])
+    shape: list = [1] * num_qubits
+    for qubit in qubits:
+        shape[qubit] = 2
+    return factor.reshape(batch + tuple(shape))
+
+
+def apply_diagonal(state: np.ndarray, diagonal: np.ndarray, qubits, num_qubits: int) -> None:
+    """
+    Multiplies the state vector in place by a diagonal gate.
+
+    Args:
+        state (np.ndarray): The state vector.
+        diagonal (np.ndarray): The 2^k diagonal entries, ``qubits[0]`` being
+            the most significant bit.
+        qubits (sequence of int): The indices of the qubits the diagonal acts on.
+        num_qubits (int): The number of qubits of the state.
+    """
+    if len(qubits) == 1:
+        diagonal: np.ndarray = np.asarray(diagonal)
+        view: np.ndarray = state.reshape(state.shape[:-1] + (2**qubits[0], 2, -1))
+        view *= diagonal.reshape(diagonal.shape[:-1] + (1, 2, 1))
+    else:
+        as_tensor(state, num_qubits)[...] *= diagonal_factor(diagonal, qubits, num_qubits)
+
+
+class PhaseAccumulator:
+    """
+    Collects a run of consecutive diagonal gates into one phase tensor.
+
+    The accumulated tensor only spans the qubits the gates act on, so a layer
+    of RZ/Rzz gates is folded into a single elementwise multiply of the state.
+    """
+    def __init__(self, num_qubits: int) -> None:
+        """
+        Initializes an empty accumulator.
+
+        Args:
+            num_qubits (int): The number of qubits of the state.
+        """
+        self.num_qubits = num_qubits
+        self.phases = None
+
+    def add(self, diagonal: np.ndarray, qubits) -> None:
+        """
+        Folds a diagonal gate into the accumulated phases.
+
+        Args:
+            diagonal (np.ndarray): The 2^k diagonal entries of the gate.
+            qubits (sequence of int): The indices of the qubits the gate acts on.
+        """
+        factor: np.ndarray = diagonal_factor(diagonal, qubits, self.num_qubits)
+        self.phases = factor if self.phases is None else self.phases * factor
+
+    def apply(self, state: np.ndarray, inverse: bool = False) -> None:
+        """
+        Multiplies the state vector by the accumulated phases in one pass.
+
+        Args:
+            state (np.ndarray): The state vector.
+            inverse (bool): Whether to apply the inverse (conjugate) phases instead.
+        """
+        if self.phases is not None:
+            as_tensor(state, self.num_qubits)[...] *= np.conj(self.phases) if inverse else self.phases
+
+    def clear(self) -> None:
+        """Discards the accumulated phases."""
+        self.phases = None
+
+
+def marginal_probabilities(state: np.ndarray, qubits, num_qubits: int) -> np.ndarray:
+    """
+    Returns the (unnormalized) outcome probabilities of a set of qubits.
+
+    Args:
+        state (np.ndarray): The state vector.
+        qubits (sequence of int): The indices of the qubits, ``qubits[0]`` being
+            the most significant bit of the outcome index.
+        num_qubits (int): The number of qubits of the state.
+
+    Returns:
+        np.ndarray: The 2^k probabilities, summed over all other qubits.
+    """
+    probabilities: np.ndarray = as_tensor(np.abs(state)**2, num_qubits)
+    others: tuple = tuple(q - num_qubits for q in range(num_qubits) if q not in qubits)
+    marginal: np.ndarray = probabilities.sum(axis=others)
+    batch: int = marginal.ndim - len(qubits)
+    order: list = sorted(qubits)
+    marginal = marginal.transpose(list(range(batch)) + [batch + order.index(qubit) for qubit in qubits])
+    return marginal.reshape(marginal.shape[:batch] + (-1,))
+
+
+def measure(state: np.ndarray, qubits, num_qubits: int, rng: np.random.Generator) -> tuple:
+    """
+    Jointly measures a set of qubits and collapses the state in place.
+
+    Args:
+        state (np.ndarray): The state vector.
+        qubits (sequence of int): The indices of the qubits to measure.
+        num_qubits (int): The number of qubits of the state.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        tuple: The outcome bit of each qubit, in the order of ``qubits``.
+    """
+    probabilities: np.ndarray = marginal_probabilities(state, qubits, num_qubits).astype(float)
+    total: float = probabilities.sum()
+    outcome: int = int(rng.choice(len(probabilities), p=probabilities / total))
+    bits: tuple = tuple((outcome >> (len(qubits) - 1 - position)) & 1 for position in range(len(qubits)))
+    collapse(state, qubits, bits, num_qubits, probabilities[outcome] / total)
+    return bits
+
+
+def collapse(state: np.ndarray, qubits, outcomes, num_qubits: int, probability: float = None) -> None:
+    """
+    Projects the state in place onto the given outcomes and renormalizes it.
+
+    Args:
+        state (np.ndarray): The state vector.
+        qubits (sequence of int): The indices of the measured qubits.
+        outcomes (sequence of int): The outcome bit of each qubit.
+        num_qubits (int): The number of qubits of the state.
+        probability (float, optional): The probability of the outcomes, if known.
+    """
+    index: list = [slice(None)] * num_qubits
+    for qubit, outcome in zip(qubits, outcomes):
+        index[qubit] = outcome
+    index: tuple = tuple(index) + (...,)
+    psi: np.ndarray = as_tensor(state, num_qubits)
+    kept: np.ndarray = psi[index].copy()
+    if probability is None:
+        probability = np.vdot(kept, kept).real
+    state.fill(0)
+    if probability > 0:
+        psi[index] = kept / np.sqrt(probability)
+
+
+def renormalize(state: np.ndarray) -> None:
+    """
+    Rescales the state vector (or each state of a batch) in place to unit norm.
+
+    Args:
+        state (np.ndarray): The state vector, or batch of state vectors.
+    """
+    norms: np.ndarray = np.linalg.norm(state, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    state /= norms
+
+
+def _select(axis: int, value: int) -> tuple:
+    """Returns the index selecting ``value`` along a (negative) axis."""
+    return (..., value) + (slice(None),) * (-axis - 1)
+
+
+def _swap_slices(amp0: np.ndarray, amp1: np.ndarray) -> None:
+    """Exchanges the contents of two equally shaped views in place."""
+    old0: np.ndarray = amp0.copy()
+    amp0[...] = amp1
+    amp1[...] = old0
+
+
+def _apply_pair(amp0: np.ndarray, amp1: np.ndarray, matrix: np.ndarray) -> None:
+    """Applies a 2x2 matrix (or a batch of them) to the amplitude pairs (amp0, amp1) in place."""
+    trailing: tuple = (1,) * (amp0.ndim - (matrix.ndim - 2))
+    m00, m01 = matrix[..., 0, 0].reshape(matrix.shape[:-2] + trailing), matrix[..., 0, 1].reshape(matrix.shape[:-2] + trailing)
+    m10, m11 = matrix[..., 1, 0].reshape(matrix.shape[:-2] + trailing), matrix[..., 1, 1].reshape(matrix.shape[:-2] + trailing)
+    old0: np.ndarray = amp0.copy()
+    amp0 *= m00
+    amp0 += m01 * amp1
+    amp1 *= m11
+    amp1 += m10 * old0
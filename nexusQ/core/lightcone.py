@@ -0,0 +1,51 @@
+"""
+Defines the light-cone pruning pass, which drops the gates that cannot affect the requested outputs.
+
+Walking the gate list backwards from the outputs, a gate matters only if it
+acts on a qubit that is still relevant, and then all of its qubits become
+relevant. Every other gate, measurements and resets included, acts on qubits
+that never again interact with the outputs, so removing it leaves the
+statistics of the outputs unchanged. Qubits that no kept gate touches are
+trimmed from the circuit altogether.
+"""
+
+from .quantum_circuit import QuantumCircuit, gate_qubits
+
+
+def light_cone(circuit: QuantumCircuit, qubits=(), measurements: bool = True) -> tuple[QuantumCircuit, tuple]:
+    """
+    Returns the part of a circuit inside the backward light cone of its outputs.
+
+    Args:
+        circuit (QuantumCircuit): The quantum circuit.
+        qubits (sequence of int): The qubits whose final state is needed, e.g. the
+            support of an observable.
+        measurements (bool): Whether the measurement outcomes are outputs too. If
+            not, a measurement is only kept on the qubits inside the light cone.
+
+    Returns:
+        QuantumCircuit, tuple: The pruned circuit and its qubits, qubit q of the
+        pruned circuit being qubit ``qubits[q]`` of the original circuit. The
+        qubits are in ascending order.
+    """
+    relevant: set = set(qubits)
+    kept: list = []
+    for gate in reversed(circuit.get_gates()):
+        operands: tuple = gate_qubits(gate)
+        if gate[0] == "Measure":
+            if not measurements:
+                operands = tuple(qubit for qubit in operands if qubit in relevant)
+                gate = ("Measure",) + operands
+            if operands:
+                relevant.update(operands)
+                kept.append(gate)
+        elif relevant.intersection(operands):
+            relevant.update(operands)
+            kept.append(gate)
+    active: tuple = tuple(sorted(relevant))
+    index: dict = {qubit: position for position, qubit in enumerate(active)}
+    pruned: QuantumCircuit = QuantumCircuit(len(active))
+    for gate in reversed(kept):
+        operands: tuple = gate_qubits(gate)
+        pruned.gates.append((gate[0],) + tuple(index[qubit] for qubit in operands) + gate[1 + len(operands):])
+    return pruned, active
@@ -0,0 +1,261 @@
+"""
+Defines the matrix-product-state backend, which simulates low-entanglement circuits on long qubit chains.
+
+The state is stored as one rank-3 tensor per qubit, of shape (left bond, 2,
+right bond), so memory grows with the entanglement across each cut instead of
+with 2^n. Multi-qubit gates are applied to contiguous sites and split back with
+truncated SVDs. The state is kept in mixed canonical form around one site, the
+orthogonality center, so every truncation discards the least weight possible.
+"""
+
+import numpy as np
+from .quantum_circuit import gate_qubits
+from .gates import gate_unitary, gate_matrix
+from .observables import PauliSum
+
+_PAULI_MATRICES = {letter: gate_matrix(letter) for letter in ("X", "Y", "Z")}
+
+
+class MatrixProductState:
+    """
+    Represents an n-qubit state as a chain of tensors, qubit 0 first.
+    """
+    def __init__(self, num_qubits: int, max_bond_dimension: int = None, truncation_error: float = 1e-12) -> None:
+        """
+        Initializes the matrix product state of |00...0>.
+
+        Args:
+            num_qubits (int): The number of qubits.
+            max_bond_dimension (int, optional): The largest bond dimension kept by a
+                truncation; None leaves it unbounded.
+            truncation_error (float): The largest discarded weight (sum of squared
+                singular values) allowed per truncation.
+        """
+        self.num_qubits = num_qubits
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_error = truncation_error
+        self.discarded_weight = 0.0  # Total weight discarded by all truncations so far
+        self.tensors = [np.array([1, 0], dtype=complex).reshape(1, 2, 1) for _ in range(num_qubits)]
+        self.center = 0  # Sites left of it are left-canonical, sites right of it right-canonical
+
+    def copy(self) -> "MatrixProductState":
+        """
+        Returns an independent copy of the state.
+
+        Returns:
+            MatrixProductState: The copy.
+        """
+        state: MatrixProductState = MatrixProductState(0, self.max_bond_dimension, self.truncation_error)
+        state.num_qubits = self.num_qubits
+        state.discarded_weight = self.discarded_weight
+        state.tensors = list(self.tensors)  # Tensors are replaced, never modified in place
+        state.center = self.center
+        return state
+
+    def bond_dimensions(self) -> list:
+        """
+        Returns the dimension of every bond of the chain.
+
+        Returns:
+            list: The n - 1 bond dimensions, between qubits q and q + 1 at index q.
+        """
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def apply(self, gate: tuple, measurements: dict, rng: np.random.Generator) -> None:
+        """
+        Applies a gate tuple, as stored in QuantumCircuit.gates.
+
+        Args:
+            gate (tuple): The gate; symbolic parameters must be bound.
+            measurements (dict): Receives the measurement outcomes, keyed by qubit.
+            rng (np.random.Generator): The source of measurement randomness.
+        """
+        if gate[0] == "Measure":
+            for qubit in gate[1:]:
+                measurements[qubit] = self.measure(qubit, rng)
+        elif gate[0] == "Reset":
+            if self.measure(gate[1], rng):
+                self.apply_matrix(gate_matrix("X"), (gate[1],))
+        elif gate[0] != "I":
+            self.apply_matrix(gate_unitary(gate), tuple(gate_qubits(gate)))
+
+    def apply_matrix(self, matrix: np.ndarray, qubits: tuple) -> None:
+        """
+        Applies a k-qubit matrix to the given qubits.
+
+        A single-qubit gate only touches its own tensor. Otherwise the qubits are
+        brought next to each other by a network of adjacent swaps, the gate is
+        applied to the contiguous block, and the swaps are undone.
+
+        Args:
+            matrix (np.ndarray): The 2^k x 2^k gate matrix, ``qubits[0]`` being the
+                most significant bit.
+            qubits (tuple): The indices of the qubits.
+        """
+        if len(qubits) == 1:
+            self.tensors[qubits[0]] = np.einsum("ij,ajb->aib", matrix, self.tensors[qubits[0]])
+            return
+        # Reorder the matrix to act on the qubits in ascending order
+        order: np.ndarray = np.argsort(qubits)
+        k: int = len(qubits)
+        matrix = np.asarray(matrix).reshape((2,) * 2 * k).transpose(tuple(order) + tuple(k + order)).reshape(2**k, 2**k)
+        sites: list = sorted(qubits)
+        swaps = []  # Left sites of the adjacent swaps gathering the qubits after sites[0]
+        for index, site in enumerate(sites[1:], start=1):
+            for position in range(site - 1, sites[0] + index - 1, -1):
+                self._apply_block(gate_matrix("SWAP"), position, 2)
+                swaps.append(position)
+        self._apply_block(matrix, sites[0], k)
+        for position in reversed(swaps):
+            self._apply_block(gate_matrix("SWAP"), position, 2)
+
+    def _apply_block(self, matrix: np.ndarray, start: int, k: int) -> None:
+        """Applies a 2^k x 2^k matrix to the k contiguous sites from ``start`` and splits the block back into sites."""
+        self._move_center(start)
+        block: np.ndarray = self.tensors[start]
+        for site in range(start + 1, start + k):
+            block = np.tensordot(block, self.tensors[site], axes=(-1, 0))
+        left, right = block.shape[0], block.shape[-1]
+        block = np.einsum("ij,ajb->aib", matrix, block.reshape(left, 2**k, right))
+        for site in range(start, start + k - 1):
+            block = block.reshape(left * 2, -1)
+            u, s, vh = np.linalg.svd(block, full_matrices=False)
+            s, rank = self._truncate(s)
+            self.tensors[site] = u[:, :rank].reshape(left, 2, rank)
+            block = s[:, None] * vh[:rank]
+            left = rank
+        self.tensors[start + k - 1] = block.reshape(left, 2, right)
+        self.center = start + k - 1
+
+    def _truncate(self, singular_values: np.ndarray) -> tuple[np.ndarray, int]:
+        """Returns the kept (renormalized) singular values and their number, within the error and bond caps."""
+        weights: np.ndarray = singular_values**2
+        total: float = weights.sum()
+        # discarded[i] is the weight dropped when keeping the first i + 1 values
+        discarded: np.ndarray = total - np.cumsum(weights)
+        rank: int = int(np.searchsorted(-discarded, -self.truncation_error * total)) + 1
+        if self.max_bond_dimension is not None:
+            rank = min(rank, self.max_bond_dimension)
+        rank = min(rank, len(singular_values))
+        kept: np.ndarray = singular_values[:rank]
+        self.discarded_weight += float(total - np.sum(kept**2)) / total
+        return kept / np.linalg.norm(kept), rank
+
+    def _move_center(self, site: int) -> None:
+        """Moves the orthogonality center to a site with QR decompositions."""
+        while self.center < site:
+            tensor: np.ndarray = self.tensors[self.center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left * 2, right))
+            self.tensors[self.center] = q.reshape(left, 2, -1)
+            self.tensors[self.center + 1] = np.tensordot(r, self.tensors[self.center + 1], axes=(1, 0))
+            self.center += 1
+        while self.center > site:
+            tensor: np.ndarray = self.tensors[self.center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left, 2 * right).T)
+            self.tensors[self.center] = q.T.reshape(-1, 2, right)
+            self.tensors[self.center - 1] = np.tensordot(self.tensors[self.center - 1], r.T, axes=(-1, 0))
+            self.center -= 1
+
+    def measure(self, qubit: int, rng: np.random.Generator) -> int:
+        """
+        Measures a qubit in the computational basis and collapses the state.
+
+        Args:
+            qubit (int): The index of the qubit.
+            rng (np.random.Generator): The source of randomness.
+
+        Returns:
+            int: The outcome bit.
+        """
+        self._move_center(qubit)
+        tensor: np.ndarray = self.tensors[qubit]
+        probability_one: float = float(np.sum(np.abs(tensor[:, 1, :])**2))
+        outcome: int = int(rng.random() < probability_one)
+        probability: float = probability_one if outcome else 1 - probability_one
+        collapsed: np.ndarray = np.zeros_like(tensor)
+        collapsed[:, outcome, :] = tensor[:, outcome, :] / np.sqrt(probability)
+        self.tensors[qubit] = collapsed
+        return outcome
+
+    def sample(self, qubits, shots: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Samples terminal measurements of the given qubits without collapsing the state.
+
+        All shots are drawn together, qubit by qubit from the left: with the center
+        on qubit 0 the rest of the chain is right-canonical, so each conditional
+        probability only needs the shot's left environment and the site tensor.
+
+        Args:
+            qubits (sequence of int): The measured qubits, one column each.
+            shots (int): The number of shots.
+            rng (np.random.Generator): The source of randomness.
+
+        Returns:
+            np.ndarray: An array of shape (shots, len(qubits)) with the outcome bits.
+        """
+        self._move_center(0)
+        last: int = max(qubits, default=-1)
+        bits: np.ndarray = np.zeros((shots, last + 1), dtype=np.uint8)
+        environment: np.ndarray = np.ones((shots, 1), dtype=complex)
+        for site in range(last + 1):
+            amplitudes: np.ndarray = np.einsum("sa,aib->sib", environment, self.tensors[site])
+            weights: np.ndarray = np.sum(np.abs(amplitudes)**2, axis=2)
+            bits[:, site] = rng.random(shots) * weights.sum(axis=1) < weights[:, 1]
+            environment = amplitudes[np.arange(shots), bits[:, site]]
+            environment /= np.linalg.norm(environment, axis=1, keepdims=True)
+        return bits[:, list(qubits)]
+
+    def amplitude(self, bits) -> complex:
+        """
+        Returns the amplitude of a computational basis state.
+
+        Args:
+            bits (str or sequence of int): The bit of each qubit, qubit 0 first (e.g. "0110").
+
+        Returns:
+            complex: The amplitude.
+        """
+        vector: np.ndarray = np.ones(1, dtype=complex)
+        for tensor, bit in zip(self.tensors, bits):
+            vector = vector @ tensor[:, int(bit), :]
+        return complex(vector[0])
+
+    def expectation(self, observable) -> float:
+        """
+        Returns the expectation value of a Pauli-sum observable.
+
+        Each term is contracted from qubit 0, the orthogonality center, to its last
+        non-identity qubit; the right-canonical rest of the chain contributes 1.
+
+        Args:
+            observable (PauliSum or list): The observable, or its (coefficient, pauli) terms.
+
+        Returns:
+            float: The expectation value.
+        """
+        if not isinstance(observable, PauliSum):
+            observable = PauliSum(observable)
+        self._move_center(0)
+        value: complex = 0.0
+        for coefficient, pauli in observable.terms:
+            environment: np.ndarray = np.ones((1, 1), dtype=complex)
+            for site in range(max(pauli, default=-1) + 1):
+                tensor: np.ndarray = self.tensors[site]
+                operated: np.ndarray = np.einsum("ij,ajb->aib", _PAULI_MATRICES[pauli[site]], tensor) if site in pauli else tensor
+                environment = np.einsum("ac,aib,cid->bd", environment, tensor.conj(), operated)
+            value += coefficient * np.trace(environment)
+        return float(np.real(value))
+
+    def to_statevector(self) -> np.ndarray:
+        """
+        Returns the dense state vector; only feasible for few qubits.
+
+        Returns:
+            np.ndarray: The 2^n amplitudes, qubit 0 being the most significant bit.
+        """
+        vector: np.ndarray = np.ones((1, 1), dtype=complex)
+        for tensor in self.tensors:
+            vector = np.tensordot(vector, tensor, axes=(-1, 0)).reshape(-1, tensor.shape[2])
+        return vector[:, 0]
@@ -0,0 +1,311 @@
+"""
+Defines noise channels and their simulation by batched Monte-Carlo trajectories.
+
+A noisy circuit contains channel entries ("Depolarizing", "AmplitudeDamping",
+"ReadoutError") between its gates, added with the QuantumCircuit methods of the
+same names or by a :class:`NoiseModel`. Instead of evolving a 4^n density
+matrix, each shot follows one trajectory: a pure state on which every channel
+applies one of its Kraus operators, drawn with the probability it has on that
+state. Averaged over trajectories this reproduces the density-matrix
+statistics exactly.
+
+Many trajectories are evolved together as a (trajectories, 2^n) array. The
+noiseless stretches between channels are compiled once and applied to the
+whole batch by the simulator's kernels. Each channel draws its branches for
+all trajectories at once, so memory stays O(batch x 2^n).
+"""
+
+import numpy as np
+from .quantum_circuit import QuantumCircuit, NOISE_GATES, gate_qubits
+
+_CHANNELS: dict = {"depolarizing": "Depolarizing", "amplitude_damping": "AmplitudeDamping"}
+_WORKSPACE: int = 3  # Peak bytes per byte of a batch's states, counting kernel and sampling temporaries
+
+
+def is_noisy(circuit) -> bool:
+    """
+    Returns whether a circuit contains noise channels.
+
+    Args:
+        circuit (QuantumCircuit): The quantum circuit.
+
+    Returns:
+        bool: True if any gate is in NOISE_GATES.
+    """
+    return isinstance(circuit, QuantumCircuit) and any(gate[0] in NOISE_GATES for gate in circuit.get_gates())
+
+
+class NoiseModel:
+    """
+    Describes the noise of a device, attached to gate types and to qubits.
+
+    Example:
+        model = NoiseModel()
+        model.add_gate_noise("CNOT", "depolarizing", 0.01)
+        model.add_qubit_noise(0, "amplitude_damping", 0.002)
+        model.add_readout_error(0, 0.02)
+        noisy = model.apply(circuit)
+    """
+    def __init__(self) -> None:
+        """
+        Initializes a noiseless model.
+        """
+        self.gate_noise = {}  # Gate type -> [(channel gate, parameter)], applied after each such gate
+        self.qubit_noise = {}  # Qubit -> [(channel gate, parameter)], applied after each gate on the qubit
+        self.readout_errors = {}  # Qubit -> flip probability of its measurements
+
+    def add_gate_noise(self, gate_type: str, channel: str, parameter: float) -> None:
+        """
+        Adds a channel after every gate of a type, on the gate's qubits.
+
+        A depolarizing channel acts jointly on all the qubits of the gate; amplitude
+        damping acts on each of them.
+
+        Args:
+            gate_type (str): The gate type, e.g. "CNOT".
+            channel (str): "depolarizing" or "amplitude_damping".
+            parameter (float): The depolarizing probability or the damping gamma.
+        """
+        self.gate_noise.setdefault(gate_type, []).append((_channel_gate(channel), parameter))
+
+    def add_qubit_noise(self, qubit: int, channel: str, parameter: float) -> None:
+        """
+        Adds a channel on a qubit after every gate acting on it.
+
+        Args:
+            qubit (int): The index of the qubit.
+            channel (str): "depolarizing" or "amplitude_damping".
+            parameter (float): The depolarizing probability or the damping gamma.
+        """
+        self.qubit_noise.setdefault(qubit, []).append((_channel_gate(channel), parameter))
+
+    def add_readout_error(self, qubit: int, probability: float) -> None:
+        """
+        Makes the measurements of a qubit report the wrong bit with the given probability.
+
+        Args:
+            qubit (int): The index of the qubit.
+            probability (float): The flip probability.
+        """
+        self.readout_errors[qubit] = probability
+
+    def apply(self, circuit: QuantumCircuit) -> QuantumCircuit:
+        """
+        Returns a copy of a circuit with the model's channels inserted.
+
+        Args:
+            circuit (QuantumCircuit): The noiseless circuit.
+
+        Returns:
+            QuantumCircuit: The noisy circuit, to be sampled with QuantumSimulator.run or sample.
+        """
+        noisy: QuantumCircuit = QuantumCircuit(circuit.get_num_qubits())
+        for qubit, probability in sorted(self.readout_errors.items()):
+            noisy.readout_error(qubit, probability)
+        for gate in circuit.get_gates():
+            noisy.gates.append(gate)
+            if gate[0] in ("Measure", "Reset", "I") or gate[0] in NOISE_GATES:
+                continue
+            qubits: tuple = tuple(gate_qubits(gate))
+            for channel, parameter in self.gate_noise.get(gate[0], ()):
+                if channel == "Depolarizing":
+                    noisy.depolarizing(qubits, parameter)
+                else:
+                    for qubit in qubits:
+                        noisy.amplitude_damping(qubit, parameter)
+            for qubit in qubits:
+                for channel, parameter in self.qubit_noise.get(qubit, ()):
+                    if channel == "Depolarizing":
+                        noisy.depolarizing(qubit, parameter)
+                    else:
+                        noisy.amplitude_damping(qubit, parameter)
+        return noisy
+
+
+def sample_trajectories(simulator, gates: list, num_qubits: int, shots: int) -> tuple[tuple, np.ndarray]:
+    """
+    Samples a noisy circuit with one trajectory per shot, in batches.
+
+    Args:
+        simulator (QuantumSimulator): The simulator whose compiler, kernels, dtype,
+            random generator and ``trajectory_memory`` are used.
+        gates (list): The gate tuples of the circuit, with bound parameters.
+        num_qubits (int): The number of qubits.
+        shots (int): The number of shots.
+
+    Returns:
+        tuple, np.ndarray: The measured qubits in ascending order (all qubits if the
+        circuit has no measurement) and the (shots, measured) outcome bits.
+    """
+    steps: list = []  # Compiled noiseless stretches and non-unitary gate tuples, in order
+    stretch: QuantumCircuit = QuantumCircuit(num_qubits)
+    for gate in gates:
+        if gate[0] in NOISE_GATES or gate[0] in ("Measure", "Reset"):
+            if len(stretch.gates):
+                steps.append(simulator.compile(stretch))
+                stretch = QuantumCircuit(num_qubits)
+            steps.append(gate)
+        else:
+            stretch.gates.append(gate)
+    if len(stretch.gates):
+        steps.append(simulator.compile(stretch))
+    measured: tuple = tuple(sorted({qubit for gate in gates if gate[0] == "Measure" for qubit in gate[1:]}))
+    rng: np.random.Generator = simulator.rng
+    batch_size: int = max(1, min(shots, simulator.trajectory_memory // (_WORKSPACE * 2**num_qubits * simulator.dtype.itemsize)))
+    outcomes: np.ndarray = np.zeros((shots, len(measured) if measured else num_qubits), dtype=np.uint8)
+    for start in range(0, shots, batch_size):
+        size: int = min(batch_size, shots - start)
+        states: np.ndarray = np.zeros((size, 2**num_qubits), dtype=simulator.dtype)
+        states[:, 0] = 1  # Initialize every trajectory to |00...0>
+        bits: np.ndarray = np.zeros((size, num_qubits), dtype=np.uint8)
+        readout: dict = {}  # Qubit -> flip probability of its later measurements
+        for step in steps:
+            if not isinstance(step, tuple):
+                simulator.execute(step, states, {}, skip_measurements=True)
+            elif step[0] == "Measure":
+                for qubit in step[1:]:
+                    bits[:, qubit] = measure(states, qubit, num_qubits, rng)
+                    if readout.get(qubit):
+                        bits[:, qubit] ^= rng.random(size) < readout[qubit]
+            elif step[0] == "Reset":
+                reset(states, step[1], num_qubits, rng)
+            elif step[0] == "Depolarizing":
+                depolarize(states, step[1:-1], step[-1], num_qubits, rng)
+            elif step[0] == "AmplitudeDamping":
+                damp(states, step[1], step[-1], num_qubits, rng)
+            else:
+                readout[step[1]] = step[-1]
+        if not measured:
+            bits = _sample_rows(states, num_qubits, rng)
+            for qubit, probability in readout.items():
+                bits[:, qubit] ^= rng.random(size) < probability
+            outcomes[start:start + size] = bits
+        else:
+            outcomes[start:start + size] = bits[:, list(measured)]
+    return measured or tuple(range(num_qubits)), outcomes
+
+
+def measure(states: np.ndarray, qubit: int, num_qubits: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Measures a qubit of every state of a batch, collapsing each state in place.
+
+    Args:
+        states (np.ndarray): The (batch, 2^n) states.
+        qubit (int): The index of the qubit.
+        num_qubits (int): The number of qubits.
+        rng (np.random.Generator): The source of randomness.
+
+    Returns:
+        np.ndarray: The outcome bit of each state.
+    """
+    view: np.ndarray = _pair_view(states, qubit)
+    probability_one: np.ndarray = np.sum(np.abs(view[:, :, 1, :])**2, axis=(1, 2))
+    total: np.ndarray = probability_one + np.sum(np.abs(view[:, :, 0, :])**2, axis=(1, 2))
+    ones: np.ndarray = rng.random(len(states)) * total < probability_one
+    view[ones, :, 0, :] = 0
+    view[~ones, :, 1, :] = 0
+    _rescale(states, total, np.where(ones, probability_one, total - probability_one))
+    return ones.astype(np.uint8)
+
+
+def reset(states: np.ndarray, qubit: int, num_qubits: int, rng: np.random.Generator) -> None:
+    """
+    Resets a qubit of every state of a batch to |0>, by measuring it and flipping it back.
+
+    Args:
+        states (np.ndarray): The (batch, 2^n) states.
+        qubit (int): The index of the qubit.
+        num_qubits (int): The number of qubits.
+        rng (np.random.Generator): The source of randomness.
+    """
+    ones: np.ndarray = measure(states, qubit, num_qubits, rng).astype(bool)
+    view: np.ndarray = _pair_view(states, qubit)
+    view[ones, :, 0, :] = view[ones, :, 1, :]
+    view[ones, :, 1, :] = 0
+
+
+def depolarize(states: np.ndarray, qubits, probability: float, num_qubits: int, rng: np.random.Generator) -> None:
+    """
+    Applies a k-qubit depolarizing channel to every state of a batch.
+
+    Each trajectory is hit with the given probability by one of the 4^k - 1
+    non-identity Pauli products, chosen uniformly.
+
+    Args:
+        states (np.ndarray): The (batch, 2^n) states.
+        qubits (sequence of int): The indices of the qubits.
+        probability (float): The error probability.
+        num_qubits (int): The number of qubits.
+        rng (np.random.Generator): The source of randomness.
+    """
+    hit: np.ndarray = rng.random(len(states)) < probability
+    if not hit.any():
+        return
+    paulis: np.ndarray = rng.integers(1, 4**len(qubits), size=len(states))
+    for position, qubit in enumerate(qubits):
+        letters: np.ndarray = (paulis >> (2 * (len(qubits) - 1 - position))) & 3  # 1: X, 2: Y, 3: Z
+        view: np.ndarray = _pair_view(states, qubit)
+        rows: np.ndarray = np.flatnonzero(hit & (letters == 1))
+        view[rows] = view[rows][:, :, ::-1, :]
+        rows = np.flatnonzero(hit & (letters == 2))
+        selected: np.ndarray = view[rows]
+        view[rows, :, 0, :] = -1j * selected[:, :, 1, :]
+        view[rows, :, 1, :] = 1j * selected[:, :, 0, :]
+        rows = np.flatnonzero(hit & (letters == 3))
+        view[rows, :, 1, :] *= -1
+
+
+def damp(states: np.ndarray, qubit: int, gamma: float, num_qubits: int, rng: np.random.Generator) -> None:
+    """
+    Applies an amplitude damping channel to a qubit of every state of a batch.
+
+    A trajectory jumps (|1> decays to |0>) with probability gamma times the
+    population of |1>; otherwise the |1> amplitudes shrink by sqrt(1 - gamma).
+    Both branches are renormalized.
+
+    Args:
+        states (np.ndarray): The (batch, 2^n) states.
+        qubit (int): The index of the qubit.
+        gamma (float): The decay probability.
+        num_qubits (int): The number of qubits.
+        rng (np.random.Generator): The source of randomness.
+    """
+    view: np.ndarray = _pair_view(states, qubit)
+    population: np.ndarray = np.sum(np.abs(view[:, :, 1, :])**2, axis=(1, 2))
+    total: np.ndarray = population + np.sum(np.abs(view[:, :, 0, :])**2, axis=(1, 2))
+    jumps: np.ndarray = rng.random(len(states)) * total < gamma * population
+    view[jumps, :, 0, :] = view[jumps, :, 1, :]
+    view[jumps, :, 1, :] = 0
+    view[~jumps, :, 1, :] *= np.sqrt(1 - gamma)
+    _rescale(states, total, np.where(jumps, population, total - gamma * population))
+
+
+def _pair_view(states: np.ndarray, qubit: int) -> np.ndarray:
+    """Returns a (batch, 2^qubit, 2, rest) view of a batch of states, the qubit on axis 2."""
+    return states.reshape(len(states), 2**qubit, 2, -1)
+
+
+def _rescale(states: np.ndarray, norms: np.ndarray, kept: np.ndarray) -> None:
+    """Restores the norms of a batch of states after a branch kept the given squared norm of each."""
+    factors: np.ndarray = np.sqrt(norms / np.where(kept > 0, kept, norms))
+    states *= factors.astype(states.real.dtype)[:, None]
+
+
+def _sample_rows(states: np.ndarray, num_qubits: int, rng: np.random.Generator) -> np.ndarray:
+    """Measures every qubit of every state of a batch, returning the (batch, n) outcome bits."""
+    cumulative: np.ndarray = np.abs(states, out=np.empty(states.shape, dtype=states.real.dtype))
+    np.square(cumulative, out=cumulative)
+    np.cumsum(cumulative, axis=1, out=cumulative)
+    thresholds: np.ndarray = rng.random(len(states)) * cumulative[:, -1]
+    indices: np.ndarray = np.array([np.searchsorted(row, threshold) for row, threshold in zip(cumulative, thresholds)],
+                                   dtype=np.int64)
+    np.minimum(indices, states.shape[1] - 1, out=indices)
+    shifts: np.ndarray = np.arange(num_qubits - 1, -1, -1)
+    return ((indices[:, None] >> shifts) & 1).astype(np.uint8)
+
+
+def _channel_gate(channel: str) -> str:
+    """Returns the gate name of a channel name."""
+    if channel not in _CHANNELS:
+        raise ValueError(f"Unknown noise channel: {channel}")
+    return _CHANNELS[channel]
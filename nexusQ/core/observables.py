@@ -0,0 +1,182 @@
+"""
+Defines Pauli-sum observables and their exact evaluation on state vectors.
+"""
+
+import numpy as np
+from . import kernels
+
+_PAULI_LETTERS = ("I", "X", "Y", "Z")
+
+
+class PauliSum:
+    """
+    Represents a weighted sum of Pauli strings, e.g. 0.5 * Z0 Z1 - 0.2 * X0 Y2.
+
+    Terms are grouped by the qubits their X/Y letters flip. A group is evaluated
+    in a single scan of the state: its diagonal part (all I/Z strings) only needs
+    the probabilities, and every other group needs one pass that pairs each
+    amplitude with its bit-flipped partner. Large groups are then resolved for
+    all of their terms at once with a Walsh-Hadamard transform.
+    """
+    def __init__(self, terms) -> None:
+        """
+        Initializes a Pauli sum.
+
+        Args:
+            terms (iterable): (coefficient, pauli) pairs. A pauli is either a string
+                with one letter of I/X/Y/Z per qubit, qubit 0 first (e.g. "XIZ"), or
+                a dict mapping qubit indices to letters (e.g. {0: "X", 2: "Z"}).
+        """
+        self.terms = []  # (coefficient, {qubit: letter}) pairs
+        for coefficient, pauli in terms:
+            if isinstance(pauli, str):
+                pauli = dict(enumerate(pauli))
+            pauli = {int(qubit): letter.upper() for qubit, letter in pauli.items() if letter.upper() != "I"}
+            for letter in pauli.values():
+                if letter not in _PAULI_LETTERS:
+                    raise ValueError(f"Unknown Pauli letter: {letter}")
+            self.terms.append((coefficient, pauli))
+        self.groups = self._group_terms()
+
+    def _group_terms(self) -> dict:
+        """
+        Groups the terms by flipped qubits.
+
+        Returns:
+            dict: Maps the sorted tuple of X/Y qubits to (weight, sign qubits) pairs, where
+            the term acts as ``weight * (-1)^parity(sign qubits)`` times the bit flip.
+        """
+        groups = {}
+        for coefficient, pauli in self.terms:
+            flips: tuple = tuple(sorted(qubit for qubit, letter in pauli.items() if letter in ("X", "Y")))
+            signs: tuple = tuple(sorted(qubit for qubit, letter in pauli.items() if letter in ("Y", "Z")))
+            weight: complex = coefficient * 1j**sum(letter == "Y" for letter in pauli.values())
+            groups.setdefault(flips, []).append((weight, signs))
+        return groups
+
+    def expectation(self, state: np.ndarray, num_qubits: int) -> float:
+        """
+        Returns the exact expectation value of the observable on a state vector.
+
+        The state is only read, never copied or modified.
+
+        Args:
+            state (np.ndarray): The state vector.
+            num_qubits (int): The number of qubits of the state.
+
+        Returns:
+            float: The expectation value.
+        """
+        psi: np.ndarray = kernels.as_tensor(state, num_qubits)
+        value: complex = 0.0
+        for flips, terms in self.groups.items():
+            # overlap[j] = conj(psi[j ^ flips]) * psi[j], then <P> = sum_j overlap[j] * sign(j)
+            if flips:
+                overlap: np.ndarray = np.conj(np.flip(psi, axis=[flip - num_qubits for flip in flips])) * psi
+            else:
+                overlap: np.ndarray = np.abs(psi)**2
+            value += _signed_sums(overlap, terms, num_qubits)
+        return float(np.real(value))
+
+    def apply(self, state: np.ndarray, num_qubits: int) -> np.ndarray:
+        """
+        Returns the observable applied to a state vector, leaving the state unchanged.
+
+        Args:
+            state (np.ndarray): The state vector.
+            num_qubits (int): The number of qubits of the state.
+
+        Returns:
+            np.ndarray: The new vector H|state>.
+        """
+        psi: np.ndarray = kernels.as_tensor(state, num_qubits)
+        result: np.ndarray = np.zeros_like(psi)
+        for flips, terms in self.groups.items():
+            diagonal = 0.0
+            for weight, signs in terms:
+                diagonal = diagonal + weight * _parity_tensor(signs, num_qubits)
+            result += np.flip(diagonal * psi, axis=[flip - num_qubits for flip in flips])
+        return result.reshape(state.shape)
+
+
+def _parity_tensor(qubits: tuple, num_qubits: int) -> np.ndarray:
+    """Returns (-1)^(parity of the given qubits) as a tensor that broadcasts against the state tensor."""
+    parity: np.ndarray = np.ones((1,) * num_qubits)
+    for qubit in qubits:
+        parity = parity * kernels.diagonal_factor(np.array([1.0, -1.0]), (qubit,), num_qubits)
+    return parity
+
+
+def _signed_sums(overlap: np.ndarray, terms: list, num_qubits: int) -> complex:
+    """Returns sum over terms of weight * sum_j overlap[j] * (-1)^parity(j & sign qubits)."""
+    if len(terms) > num_qubits:
+        # One Walsh-Hadamard transform yields every parity sum of the group at once
+        transformed: np.ndarray = _walsh_hadamard(overlap, num_qubits)
+        return sum(weight * transformed[tuple(1 if q in signs else 0 for q in range(num_qubits))] for weight, signs in terms)
+    total: complex = 0.0
+    for weight, signs in terms:
+        others: tuple = tuple(q for q in range(num_qubits) if q not in signs)
+        marginal: np.ndarray = overlap.sum(axis=others)
+        total += weight * np.sum(marginal * _parity_tensor(tuple(range(len(signs))), len(signs)))
+    return total
+
+
+def _walsh_hadamard(tensor: np.ndarray, num_qubits: int) -> np.ndarray:
+    """Returns the Walsh-Hadamard transform of a state-shaped tensor (a copy)."""
+    transformed: np.ndarray = np.array(tensor, dtype=complex)
+    for axis in range(num_qubits):
+        index: tuple = (slice(None),) * axis
+        upper: np.ndarray = transformed[index + (0, ...)]
+        lower: np.ndarray = transformed[index + (1, ...)]
+        difference: np.ndarray = upper - lower
+        upper += lower
+        lower[...] = difference
+    return transformed
+
+
+def apply_observable(observable, state: np.ndarray, num_qubits: int) -> np.ndarray:
+    """
+    Returns the observable applied to a state vector, leaving the state unchanged.
+
+    Args:
+        observable: A PauliSum, a list of (coefficient, pauli) terms, a 2^n x 2^n
+            Hermitian matrix, the 2^n entries of a diagonal observable, or an object
+            with an ``apply(state, num_qubits)`` method.
+        state (np.ndarray): The state vector.
+        num_qubits (int): The number of qubits of the state.
+
+    Returns:
+        np.ndarray: The new vector H|state>.
+    """
+    if isinstance(observable, list):
+        observable = PauliSum(observable)
+    if hasattr(observable, "apply"):
+        return observable.apply(state, num_qubits)
+    observable = np.asarray(observable)
+    if observable.ndim == 1:
+        return observable * state
+    return observable @ state
+
+
+def expectation_value(observable, state: np.ndarray, num_qubits: int) -> float:
+    """
+    Returns the expectation value of an observable on a state vector.
+
+    Args:
+        observable: A PauliSum, a list of (coefficient, pauli) terms, a 2^n x 2^n
+            Hermitian matrix, the 2^n entries of a diagonal observable, or an object
+            with an ``expectation(state, num_qubits)`` method.
+        state (np.ndarray): The state vector.
+        num_qubits (int): The number of qubits of the state.
+
+    Returns:
+        float: The expectation value.
+    """
+    if isinstance(observable, list):
+        observable = PauliSum(observable)
+    if hasattr(observable, "expectation"):
+        return observable.expectation(state, num_qubits)
+    observable = np.asarray(observable)
+    if observable.ndim == 1:
+        return float(np.dot(np.abs(state)**2, observable.real))
+    return float(np.vdot(state, observable @ state).real)
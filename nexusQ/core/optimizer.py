@@ -0,0 +1,156 @@
+"""
+Defines the gate-fusion optimizer, which shortens QuantumCircuit gate lists before simulation.
+"""
+
+import numpy as np
+from .quantum_circuit import QuantumCircuit, PARAMETRIC_GATES, NOISE_GATES, gate_qubits
+from .gates import gate_matrix, gate_unitary
+from .parameters import ParameterExpression
+
+SELF_INVERSE_GATES = ("H", "X", "Y", "Z", "CNOT", "CZ", "SWAP", "CCX", "CY", "CH", "CSWAP")
+_SYMMETRIC_GATES = ("CZ", "CS", "SWAP", "Rxx", "Ryy", "Rzz")  # Gates invariant under reordering their qubits
+_BARRIER_GATES = ("Measure", "Reset") + NOISE_GATES
+
+
+class _Entry:
+    """A gate of the optimized circuit, either an original gate tuple or a fused matrix."""
+    __slots__ = ("qubits", "gate", "matrix")
+
+    def __init__(self, qubits: tuple, gate: tuple = None, matrix: np.ndarray = None) -> None:
+        self.qubits = qubits
+        self.gate = gate
+        self.matrix = matrix
+
+    def unitary(self) -> np.ndarray:
+        """Returns the matrix of the entry on its qubits."""
+        return self.matrix if self.matrix is not None else gate_unitary(self.gate)
+
+    def fuse(self, matrix: np.ndarray) -> None:
+        """Replaces the entry by its fused matrix."""
+        self.gate = None
+        self.matrix = matrix
+
+    def fusable(self) -> bool:
+        """Returns whether the entry can absorb neighbouring gates."""
+        return len(self.qubits) <= 2 and (self.gate is None or _fusable(self.gate))
+
+
+def optimize(circuit: QuantumCircuit, level: int = 2) -> QuantumCircuit:
+    """
+    Returns an equivalent circuit with fewer gates.
+
+    Args:
+        circuit (QuantumCircuit): The quantum circuit to optimize.
+        level (int): The aggressiveness of the pass:
+            1 - drop identities, cancel adjacent inverse pairs (H·H, CNOT·CNOT, ...)
+                and merge adjacent rotations of the same kind;
+            2 - also fuse runs of single-qubit gates on a wire into one 2x2 matrix;
+            3 - also absorb single-qubit gates into neighbouring two-qubit gates and
+                fuse consecutive two-qubit gates on the same pair into one 4x4 matrix.
+
+    Returns:
+        QuantumCircuit: The optimized circuit; fused gates are stored as "Unitary" gates.
+    """
+    num_qubits: int = circuit.get_num_qubits()
+    entries = []  # Entries of the optimized circuit, None once removed
+    wires = [[] for _ in range(num_qubits)]  # Indices of the entries on each wire, in order
+
+    def top(qubit: int) -> _Entry:
+        return entries[wires[qubit][-1]] if wires[qubit] else None
+
+    def remove(entry: _Entry) -> None:
+        for qubit in entry.qubits:
+            entries[wires[qubit].pop()] = None
+
+    def push(entry: _Entry) -> None:
+        for qubit in entry.qubits:
+            wires[qubit].append(len(entries))
+        entries.append(entry)
+
+    for gate in circuit.get_gates():
+        gate_type: str = gate[0]
+        qubits: tuple = tuple(gate_qubits(gate))
+        if level >= 1 and gate_type == "I":
+            continue
+        previous: _Entry = top(qubits[0])
+        if previous is not None and (any(top(qubit) is not previous for qubit in qubits) or set(previous.qubits) != set(qubits)):
+            previous = None  # The last gate on these wires does not act on exactly the same qubits
+
+        if level >= 1 and previous is not None and previous.gate is not None and previous.gate[0] == gate_type:
+            if _canonical_qubits(previous.gate) == _canonical_qubits(gate):
+                if gate_type in SELF_INVERSE_GATES:
+                    remove(previous)
+                    continue
+                if gate_type in PARAMETRIC_GATES:
+                    theta = previous.gate[-1] + gate[-1]
+                    if not isinstance(theta, ParameterExpression) and np.isclose(np.remainder(theta + 2 * np.pi, 4 * np.pi), 2 * np.pi):
+                        remove(previous)  # A rotation by a multiple of 4 pi is the identity
+                    else:
+                        previous.gate = previous.gate[:-1] + (theta,)
+                    continue
+
+        if level < 2 or not _fusable(gate) or len(qubits) > 2 or (level < 3 and len(qubits) > 1):
+            push(_Entry(qubits, gate=gate))
+            continue
+
+        matrix: np.ndarray = gate_unitary(gate)
+        if len(qubits) == 1:
+            neighbour: _Entry = top(qubits[0])
+            if previous is not None and previous.fusable():
+                previous.fuse(matrix @ previous.unitary())
+            elif level >= 3 and neighbour is not None and neighbour.fusable():
+                neighbour.fuse(_embed(matrix, qubits, neighbour.qubits) @ neighbour.unitary())
+            else:
+                push(_Entry(qubits, gate=gate))
+            continue
+
+        if previous is not None and previous.fusable():
+            previous.fuse(_embed(matrix, qubits, previous.qubits) @ previous.unitary())
+            continue
+        absorbed: bool = False
+        for qubit in qubits:
+            neighbour: _Entry = top(qubit)
+            if neighbour is not None and neighbour.qubits == (qubit,) and neighbour.fusable():
+                matrix = matrix @ _embed(neighbour.unitary(), (qubit,), qubits)
+                remove(neighbour)
+                absorbed = True
+        push(_Entry(qubits, gate=None if absorbed else gate, matrix=matrix if absorbed else None))
+
+    optimized: QuantumCircuit = QuantumCircuit(num_qubits)
+    for entry in entries:
+        if entry is None:
+            continue
+        if entry.gate is not None:
+            optimized.gates.append(entry.gate)
+        elif not np.allclose(entry.matrix, np.eye(len(entry.matrix))):
+            optimized.unitary(entry.matrix, *entry.qubits)
+    return optimized
+
+
+def _fusable(gate: tuple) -> bool:
+    """Returns whether a gate has a concrete matrix that can be fused with others."""
+    return gate[0] not in _BARRIER_GATES and not isinstance(gate[-1], ParameterExpression)
+
+
+def _canonical_qubits(gate: tuple) -> tuple:
+    """Returns the qubits of a gate in an order that is equal for equivalent gates."""
+    qubits: tuple = tuple(gate_qubits(gate))
+    if gate[0] in _SYMMETRIC_GATES:
+        return tuple(sorted(qubits))
+    if gate[0] == "CCX":
+        return tuple(sorted(qubits[:2])) + qubits[2:]
+    if gate[0] == "CSWAP":
+        return qubits[:1] + tuple(sorted(qubits[1:]))
+    return qubits
+
+
+def _embed(matrix: np.ndarray, qubits: tuple, block_qubits: tuple) -> np.ndarray:
+    """Returns a one- or two-qubit matrix on ``qubits`` as a matrix on the two ``block_qubits``."""
+    if len(qubits) == 2:
+        if qubits == block_qubits:
+            return matrix
+        swap: np.ndarray = gate_matrix("SWAP")
+        return swap @ matrix @ swap
+    if qubits[0] == block_qubits[0]:
+        return np.kron(matrix, np.eye(2))
+    return np.kron(np.eye(2), matrix)
@@ -0,0 +1,283 @@
+"""
+Defines the out-of-core execution of programs on state vectors stored in memory-mapped files.
+
+A state too large for RAM lives in an ``np.memmap`` file and is processed one
+block at a time. A block is the set of amplitudes with fixed values on some
+qubits. The other 2^c "free" qubits include every qubit of the gates being
+applied. Each block is read into a small contiguous buffer, the ordinary
+kernels run on it as a c-qubit state, and it is written back.
+
+The free qubits are the gate qubits plus the lowest-order qubits, so a block is
+made of a few long contiguous runs of the file:
+
+* Consecutive gates on low-order qubits share one sequential pass over the
+  file, each chunk being loaded once for the whole run of gates.
+* A gate on a high-order qubit q still uses long runs. Its block is two runs of
+  2^(c-1) amplitudes, one with q = 0 and one with q = 1, so the pass reads two
+  sequential streams instead of seeking for every amplitude.
+
+Up to ``_MAX_HIGH_QUBITS`` high-order qubits are grouped into one pass.
+Diagonal instructions never mix amplitudes, so they do not widen a block: each
+block is multiplied by the diagonal restricted to its fixed qubit values, and
+a phase layer over every qubit streams through the file like any other pass.
+Measurements and sampling read the file in contiguous chunks instead of blocks,
+so measuring every qubit never loads more than one chunk (see :func:`sample`).
+A measurement takes three passes: it draws the outcome, sums the probability
+of that outcome, and then collapses the state.
+"""
+
+import os
+import tempfile
+import numpy as np
+from .compiler import Program, OP_DIAGONAL, OP_PHASES, OP_MEASURE, OP_RESET, OP_FLIP
+from . import kernels
+
+_MAX_HIGH_QUBITS: int = 4  # High-order qubits per pass, i.e. at most 2^4 sequential streams
+
+
+def create_state(num_qubits: int, dtype, directory: str = None) -> np.memmap:
+    """
+    Returns a zeroed state vector backed by a temporary file.
+
+    The file is unlinked right away where the platform allows it, so it is
+    reclaimed as soon as the array is garbage collected.
+
+    Args:
+        num_qubits (int): The number of qubits.
+        dtype: The complex dtype of the amplitudes.
+        directory (str, optional): The directory of the file, ideally on a local
+            SSD; None uses the system's temporary directory.
+
+    Returns:
+        np.memmap: The 2^n zero amplitudes.
+    """
+    handle, path = tempfile.mkstemp(suffix=".state", dir=directory)
+    os.close(handle)
+    state: np.memmap = np.memmap(path, dtype=dtype, mode="w+", shape=(2**num_qubits,))
+    try:
+        os.unlink(path)
+    except OSError:  # Files cannot be removed while mapped on Windows
+        pass
+    return state
+
+
+def copy_state(state: np.ndarray, chunk_qubits: int, directory: str = None) -> np.memmap:
+    """
+    Returns a copy of a state vector in a new temporary file, copied chunk by chunk.
+
+    Args:
+        state (np.ndarray): The state vector.
+        chunk_qubits (int): The base-2 logarithm of the chunk length.
+        directory (str, optional): The directory of the new file.
+
+    Returns:
+        np.memmap: The copy.
+    """
+    copy: np.memmap = create_state(len(state).bit_length() - 1, state.dtype, directory)
+    for start in range(0, len(state), 1 << chunk_qubits):
+        copy[start:start + (1 << chunk_qubits)] = state[start:start + (1 << chunk_qubits)]
+    return copy
+
+
+def execute(simulator, program: Program, state: np.ndarray, measurements: dict, start: int = 0, stop: int = None,
+            skip_measurements: bool = False) -> None:
+    """
+    Applies the instructions of a program to a memory-mapped state in blocked passes.
+
+    Args:
+        simulator (QuantumSimulator): The simulator whose instruction handlers,
+            random generator and ``chunk_qubits`` are used.
+        program (Program): The compiled program.
+        state (np.ndarray): The state vector.
+        measurements (dict): Receives the measurement outcomes, keyed by qubit.
+        start (int): The index of the first instruction to apply.
+        stop (int, optional): The index after the last instruction to apply.
+        skip_measurements (bool): Whether to leave out the measurement instructions.
+    """
+    num_qubits: int = program.num_qubits
+    chunk_qubits: int = simulator.chunk_qubits
+    stop = len(program) if stop is None else stop
+    group: list = []  # (opcode, qubits, operand) of the unitary instructions sharing the next pass
+    support: set = set()
+    since_normalized: int = 0
+    for opcode, qubits, operand in zip(program.opcodes[start:stop].tolist(), program.qubits[start:stop], program.operands[start:stop]):
+        if opcode in (OP_MEASURE, OP_RESET):
+            if skip_measurements and opcode == OP_MEASURE:
+                continue
+            _apply_group(simulator, state, group, support, num_qubits, measurements)
+            group, support = [], set()
+            bits: tuple = _measure(state, qubits, num_qubits, chunk_qubits, simulator.rng)
+            if opcode == OP_MEASURE:
+                measurements.update(zip(qubits, bits))
+            elif bits[0]:
+                _apply_group(simulator, state, [(OP_FLIP, qubits, None)], set(qubits), num_qubits, measurements)
+            continue
+        if opcode in (OP_DIAGONAL, OP_PHASES):  # Restricted to each block, so any block will do
+            group.append((OP_PHASES, qubits, _phases(operand, qubits, opcode, num_qubits)))
+        else:
+            merged: set = support.union(qubits)
+            if group and not _fits(merged, num_qubits, chunk_qubits):
+                _apply_group(simulator, state, group, support, num_qubits, measurements)
+                group, merged = [], set(qubits)
+            group.append((opcode, qubits, operand))
+            support = merged
+        since_normalized += 1
+        if state.dtype == np.complex64 and since_normalized >= simulator.renormalize_interval:
+            _apply_group(simulator, state, group, support, num_qubits, measurements)
+            group, support = [], set()
+            renormalize(state, chunk_qubits)
+            since_normalized = 0
+    _apply_group(simulator, state, group, support, num_qubits, measurements)
+
+
+def sample(state: np.ndarray, qubits, num_qubits: int, chunk_qubits: int, shots: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Draws joint outcomes of a set of qubits in two sequential passes, one chunk in memory at a time.
+
+    The first pass sums |amplitude|^2 over each contiguous chunk and splits the
+    shots between the chunks. The second revisits the chunks that got shots and
+    draws their outcomes from the chunk's own marginal on the measured low-order
+    qubits. The measured high-order qubits are fixed within a chunk. Memory stays
+    O(2^chunk_qubits + 2^(n - chunk_qubits)) even when every qubit is measured.
+
+    Args:
+        state (np.ndarray): The state vector.
+        qubits (sequence of int): The indices of the qubits, ``qubits[0]`` being
+            the most significant bit of the outcome index.
+        num_qubits (int): The number of qubits of the state.
+        chunk_qubits (int): The base-2 logarithm of the chunk length.
+        shots (int): The number of outcomes to draw.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        np.ndarray, np.ndarray: The distinct outcome indices drawn, in ascending
+        order, and the number of times each was drawn.
+    """
+    chunk_qubits = min(chunk_qubits, num_qubits)
+    high: int = num_qubits - chunk_qubits  # Qubits fixed within a chunk
+    size: int = 1 << chunk_qubits
+    weights: np.ndarray = np.array([float(np.vdot(state[start:start + size], state[start:start + size]).real)
+                                    for start in range(0, len(state), size)])
+    low: list = [(position, qubit - high) for position, qubit in enumerate(qubits) if qubit >= high]
+    offsets: np.ndarray = np.zeros(2**len(low), dtype=np.int64)  # Outcome bits of each local outcome
+    for bit, (position, _) in enumerate(low):
+        offsets |= ((np.arange(len(offsets)) >> (len(low) - 1 - bit)) & 1) << (len(qubits) - 1 - position)
+    counts: dict = {}
+    for chunk, chunk_shots in enumerate(rng.multinomial(shots, weights / weights.sum()).tolist()):
+        if not chunk_shots:
+            continue
+        base: int = sum(((chunk >> (high - 1 - qubit)) & 1) << (len(qubits) - 1 - position)
+                        for position, qubit in enumerate(qubits) if qubit < high)
+        local: np.ndarray = kernels.marginal_probabilities(np.asarray(state[chunk * size:(chunk + 1) * size]),
+                                                           [qubit for _, qubit in low], chunk_qubits).astype(float)
+        drawn: np.ndarray = rng.multinomial(chunk_shots, local / local.sum())
+        for index in np.flatnonzero(drawn).tolist():
+            outcome: int = base | int(offsets[index])
+            counts[outcome] = counts.get(outcome, 0) + int(drawn[index])
+    outcomes: np.ndarray = np.array(sorted(counts), dtype=np.int64)
+    return outcomes, np.array([counts[outcome] for outcome in outcomes.tolist()], dtype=np.int64)
+
+
+def renormalize(state: np.ndarray, chunk_qubits: int) -> None:
+    """
+    Rescales a state vector to unit norm in two sequential passes.
+
+    Args:
+        state (np.ndarray): The state vector.
+        chunk_qubits (int): The base-2 logarithm of the chunk length.
+    """
+    size: int = 1 << chunk_qubits
+    norm_squared: float = sum(float(np.vdot(state[start:start + size], state[start:start + size]).real)
+                              for start in range(0, len(state), size))
+    if norm_squared > 0:
+        for start in range(0, len(state), size):
+            state[start:start + size] *= 1 / np.sqrt(norm_squared)
+
+
+def _fits(qubits: set, num_qubits: int, chunk_qubits: int) -> bool:
+    """Returns whether gates on these qubits can share one pass over blocks of 2^chunk_qubits amplitudes."""
+    high: int = sum(1 for qubit in qubits if qubit < num_qubits - chunk_qubits)
+    return len(qubits) <= chunk_qubits and high <= _MAX_HIGH_QUBITS
+
+
+def _free_qubits(qubits, num_qubits: int, chunk_qubits: int) -> tuple:
+    """Returns the free qubits of the blocks for gates on the given qubits: those qubits and the lowest-order others."""
+    free: set = set(qubits)
+    for qubit in range(num_qubits - 1, -1, -1):
+        if len(free) >= chunk_qubits:
+            break
+        free.add(qubit)
+    return tuple(sorted(free))
+
+
+def _blocks(state: np.ndarray, free: tuple, num_qubits: int):
+    """Yields the tensor view of each block, in file order, and the values of its fixed qubits."""
+    tensor: np.ndarray = state.reshape((2,) * num_qubits)
+    fixed: list = [qubit for qubit in range(num_qubits) if qubit not in free]
+    for block in range(1 << len(fixed)):
+        bits: dict = {qubit: (block >> (len(fixed) - 1 - position)) & 1 for position, qubit in enumerate(fixed)}
+        yield tensor[tuple(bits.get(qubit, slice(None)) for qubit in range(num_qubits))], bits
+
+
+def _apply_group(simulator, state: np.ndarray, group: list, support: set, num_qubits: int, measurements: dict) -> None:
+    """Applies a run of unitary instructions to every block of the state in one pass."""
+    if not group:
+        return
+    free: tuple = _free_qubits(support, num_qubits, simulator.chunk_qubits)
+    position: dict = {qubit: index for index, qubit in enumerate(free)}
+    dispatch: tuple = simulator._dispatch
+    for view, bits in _blocks(state, free, num_qubits):
+        buffer: np.ndarray = np.array(view).reshape(-1)
+        for opcode, qubits, operand in group:
+            if opcode == OP_PHASES:
+                qubits, operand = (), _block_phases(operand, bits, len(free))
+            dispatch[opcode](buffer, tuple(position[qubit] for qubit in qubits), operand, len(free), measurements)
+        view[...] = buffer.reshape(view.shape)
+
+
+def _phases(operand, qubits: tuple, opcode: int, num_qubits: int) -> kernels.PhaseAccumulator:
+    """Returns the operand of a diagonal or phases instruction as phases over the whole state."""
+    if opcode == OP_PHASES:
+        return operand
+    phases: kernels.PhaseAccumulator = kernels.PhaseAccumulator(num_qubits)
+    phases.add(operand, qubits)
+    return phases
+
+
+def _block_phases(phases: kernels.PhaseAccumulator, bits: dict, num_free: int) -> kernels.PhaseAccumulator:
+    """Returns the restriction of accumulated phases to the block with the given fixed qubit values."""
+    block: kernels.PhaseAccumulator = kernels.PhaseAccumulator(num_free)
+    if phases.phases is not None:
+        block.phases = phases.phases[tuple((bits[qubit] if length == 2 else 0) if qubit in bits else slice(None)
+                                           for qubit, length in enumerate(phases.phases.shape))]
+    return block
+
+
+def _measure(state: np.ndarray, qubits: tuple, num_qubits: int, chunk_qubits: int, rng: np.random.Generator) -> tuple:
+    """Jointly measures qubits of a memory-mapped state, collapsing it chunk by chunk, and returns the outcome bits."""
+    outcome: int = int(sample(state, qubits, num_qubits, chunk_qubits, 1, rng)[0][0])
+    bits: tuple = tuple((outcome >> (len(qubits) - 1 - position)) & 1 for position in range(len(qubits)))
+    chunk_qubits = min(chunk_qubits, num_qubits)
+    high: int = num_qubits - chunk_qubits
+    size: int = 1 << chunk_qubits
+    local: list = [qubit - high for qubit in qubits if qubit >= high]
+    local_bits: list = [bit for qubit, bit in zip(qubits, bits) if qubit >= high]
+    matching: list = [chunk for chunk in range(len(state) >> chunk_qubits)
+                      if all((chunk >> (high - 1 - qubit)) & 1 == bit for qubit, bit in zip(qubits, bits) if qubit < high)]
+    index: list = [slice(None)] * chunk_qubits
+    for qubit, bit in zip(local, local_bits):
+        index[qubit] = bit
+    index: tuple = tuple(index)
+    probability: float = 0.0
+    for chunk in matching:
+        kept: np.ndarray = kernels.as_tensor(np.asarray(state[chunk * size:(chunk + 1) * size]), chunk_qubits)[index]
+        probability += float(np.vdot(kept, kept).real)
+    matching: set = set(matching)
+    for chunk in range(len(state) >> chunk_qubits):
+        if chunk not in matching:
+            state[chunk * size:(chunk + 1) * size] = 0
+            continue
+        buffer: np.ndarray = np.array(state[chunk * size:(chunk + 1) * size])
+        kernels.collapse(buffer, local, local_bits, chunk_qubits, probability)
+        state[chunk * size:(chunk + 1) * size] = buffer
+    return bits
@@ -0,0 +1,80 @@
+"""
+Defines the block decomposition used to apply state-vector kernels on several threads.
+
+A gate leaves every qubit it does not act on untouched, so the state can be cut
+along those qubits into independent blocks. The blocks are views of the state,
+passed to the unchanged kernels of :mod:`kernels` as batches of smaller states:
+
+* If the gate's qubits are all low-order, the leading (high-order) qubits are
+  free. The state is viewed as a (2^m, 2^(n-m)) matrix and cut into ranges of
+  rows. Each block is contiguous, a batch of states on the low qubits.
+* If the gate touches a high-order qubit, the blocks of a row cut would
+  interleave. The trailing (low-order) qubits are free instead. The state is
+  viewed as a (2^p, 2^(n-p)) matrix and cut into ranges of columns. Each
+  block, transposed, is a batch of states on the high qubits, whose amplitudes
+  are strided but whose batch entries are contiguous.
+
+Gates spanning both the highest and the lowest qubits have no free qubits on
+either side and run on one thread. NumPy releases the GIL inside its
+elementwise loops and matrix products, so the blocks run truly in parallel.
+"""
+
+import numpy as np
+
+
+def split_blocks(state: np.ndarray, qubits, num_qubits: int, num_blocks: int) -> list:
+    """
+    Returns independent blocks of a state vector for a gate on the given qubits.
+
+    Args:
+        state (np.ndarray): The (contiguous, one-dimensional) state vector.
+        qubits (sequence of int): All qubits the gate acts on, controls included.
+        num_qubits (int): The number of qubits of the state.
+        num_blocks (int): The desired number of blocks.
+
+    Returns:
+        list: (block, local qubits, local number of qubits) triples, where the block
+        is a batched view of the state and the local qubits are ``qubits`` renumbered
+        within it; or None if the gate cannot be split.
+    """
+    leading: int = min(qubits)  # Free high-order qubits
+    trailing: int = num_qubits - 1 - max(qubits)  # Free low-order qubits
+    if max(leading, trailing) < 1:
+        return None
+    if leading >= trailing:
+        rows: np.ndarray = state.reshape(1 << leading, -1)
+        local: tuple = tuple(qubit - leading for qubit in qubits)
+        return [(rows[start:stop], local, num_qubits - leading) for start, stop in _ranges(len(rows), num_blocks)]
+    high: int = num_qubits - trailing
+    columns: np.ndarray = state.reshape(1 << high, -1)
+    return [(columns[:, start:stop].T, tuple(qubits), high) for start, stop in _ranges(columns.shape[1], num_blocks)]
+
+
+def split_phases(state: np.ndarray, phases: np.ndarray, num_qubits: int, num_blocks: int) -> list:
+    """
+    Returns independent blocks of a state tensor and of the phases multiplying it.
+
+    An elementwise product can always be cut along the leading qubits, whatever
+    qubits the phases span.
+
+    Args:
+        state (np.ndarray): The (contiguous, one-dimensional) state vector.
+        phases (np.ndarray): A phase tensor broadcasting against the state tensor,
+            as built by :class:`kernels.PhaseAccumulator`.
+        num_qubits (int): The number of qubits of the state.
+        num_blocks (int): The desired number of blocks.
+
+    Returns:
+        list: (state block, phase block) pairs of broadcast-compatible views.
+    """
+    leading: int = min(num_qubits, max(1, (num_blocks - 1).bit_length()))
+    rows: np.ndarray = state.reshape((1 << leading,) + (2,) * (num_qubits - leading))
+    expanded: np.ndarray = np.broadcast_to(phases, (2,) * leading + phases.shape[leading:])
+    expanded = expanded.reshape((1 << leading,) + phases.shape[leading:])
+    return [(rows[start:stop], expanded[start:stop]) for start, stop in _ranges(1 << leading, num_blocks)]
+
+
+def _ranges(length: int, num_blocks: int) -> list:
+    """Returns up to ``num_blocks`` consecutive (start, stop) ranges covering range(length) evenly."""
+    bounds: np.ndarray = np.linspace(0, length, min(num_blocks, length) + 1).astype(int)
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
@@ -0,0 +1,103 @@
+"""
+Defines symbolic circuit parameters, bound to values when a circuit is run.
+"""
+
+import numbers
+
+
+class ParameterExpression:
+    """
+    Represents a linear expression of parameters, such as ``2 * gamma + 0.5``.
+    """
+    def __init__(self, terms: dict, constant: float = 0.0) -> None:
+        """
+        Initializes a parameter expression.
+
+        Args:
+            terms (dict): The coefficient of each Parameter in the expression.
+            constant (float): The constant offset of the expression.
+        """
+        self.terms = terms
+        self.constant = constant
+
+    def get_parameters(self) -> list:
+        """
+        Returns the parameters the expression depends on.
+
+        Returns:
+            list: The parameters.
+        """
+        return list(self.terms)
+
+    def bind(self, values: dict):
+        """
+        Evaluates the expression.
+
+        Args:
+            values (dict): The value of each parameter; values may be NumPy arrays
+                to evaluate a whole sweep at once.
+
+        Returns:
+            float or np.ndarray: The value of the expression.
+        """
+        result = self.constant
+        for parameter, coefficient in self.terms.items():
+            if parameter not in values:
+                raise ValueError(f"No value bound for parameter {parameter.name!r}")
+            result = result + coefficient * values[parameter]
+        return result
+
+    def __add__(self, other):
+        if isinstance(other, ParameterExpression):
+            terms: dict = dict(self.terms)
+            for parameter, coefficient in other.terms.items():
+                terms[parameter] = terms.get(parameter, 0.0) + coefficient
+            return ParameterExpression(terms, self.constant + other.constant)
+        if isinstance(other, numbers.Real):
+            return ParameterExpression(dict(self.terms), self.constant + other)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        if isinstance(other, numbers.Real):
+            return ParameterExpression({parameter: coefficient * other for parameter, coefficient in self.terms.items()}, self.constant * other)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return self * -1
+
+    def __sub__(self, other):
+        return self + -other
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __truediv__(self, other):
+        if isinstance(other, numbers.Real):
+            return self * (1 / other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        terms: str = " + ".join(f"{coefficient}*{parameter.name}" for parameter, coefficient in self.terms.items())
+        return f"ParameterExpression({terms} + {self.constant})"
+
+
+class Parameter(ParameterExpression):
+    """
+    Represents a named symbolic parameter, e.g. a rotation angle of a variational circuit.
+    """
+    def __init__(self, name: str) -> None:
+        """
+        Initializes a parameter.
+
+        Args:
+            name (str): The name of the parameter.
+        """
+        self.name = name
+        super().__init__({self: 1.0})
+
+    def __repr__(self) -> str:
+        return f"Parameter({self.name!r})"
@@ -0,0 +1,301 @@
+"""
+Defines the opt-in instrumentation of state-vector simulation.
+
+A :class:`Profiler` passed to ``QuantumSimulator(profiler=...)`` times every
+compiled instruction the simulator applies to an in-memory state vector. It
+turns each one into a :class:`GateEvent` recording:
+
+* its wall time, including the wait for the thread pool;
+* the number of amplitudes it touches and the bytes it moves;
+* the size of the state;
+* optionally, the peak temporary memory it allocated, measured with
+  ``tracemalloc``.
+
+Each event is streamed to an optional callback, e.g. to forward it to a metrics
+system. Events are also aggregated into a :class:`ProfileReport`, per
+instruction kind, per qubit operands and per instruction index. The report is
+attached to the result of :meth:`QuantumSimulator.run`.
+
+Without a profiler, the simulator runs its usual loop. Instrumentation costs
+nothing unless it is enabled.
+"""
+
+from dataclasses import dataclass
+import time
+import tracemalloc
+import numpy as np
+from .compiler import OP_MATRIX, OP_DIAGONAL, OP_PHASES, OP_FLIP, OP_SWAP, OP_CONTROLLED, OP_MEASURE, OP_RESET
+
+# Name of each opcode of compiler.py, used as the instruction kind in reports
+OPCODE_NAMES = {
+    OP_MATRIX: "matrix",
+    OP_DIAGONAL: "diagonal",
+    OP_PHASES: "phases",
+    OP_FLIP: "flip",
+    OP_SWAP: "swap",
+    OP_CONTROLLED: "controlled",
+    OP_MEASURE: "measure",
+    OP_RESET: "reset",
+}
+
+
+@dataclass(frozen=True)
+class GateEvent:
+    """
+    Represents the cost of one instruction applied to a state.
+
+    Attributes:
+        index (int): The index of the instruction in its program.
+        kind (str): The kind of the instruction (see ``OPCODE_NAMES``).
+        qubits (tuple): The qubits of the instruction, controls included.
+        seconds (float): The wall time of the instruction.
+        amplitudes (int): The number of amplitudes read and written, over all states of a batch.
+        bytes (int): The memory traffic, counting each touched amplitude as read once and written once.
+        state_bytes (int): The size of the state (or batch of states).
+        temporary_bytes (int): The peak memory allocated on top of the state while
+            the instruction ran, or None unless the profiler traces memory.
+    """
+    index: int
+    kind: str
+    qubits: tuple
+    seconds: float
+    amplitudes: int
+    bytes: int
+    state_bytes: int
+    temporary_bytes: int = None
+
+
+class GateStats:
+    """
+    Accumulates the events of a group of instructions.
+    """
+    def __init__(self) -> None:
+        """
+        Initializes empty statistics.
+        """
+        self.count: int = 0
+        self.seconds: float = 0.0
+        self.amplitudes: int = 0
+        self.bytes: int = 0
+        self.peak_temporary_bytes: int = None  # None unless memory is traced
+
+    def add(self, event: GateEvent) -> None:
+        """
+        Adds an event to the statistics.
+
+        Args:
+            event (GateEvent): The event.
+        """
+        self.count += 1
+        self.seconds += event.seconds
+        self.amplitudes += event.amplitudes
+        self.bytes += event.bytes
+        if event.temporary_bytes is not None:
+            self.peak_temporary_bytes = max(self.peak_temporary_bytes or 0, event.temporary_bytes)
+
+    def __repr__(self) -> str:
+        return (f"GateStats(count={self.count}, seconds={self.seconds:.6f}, amplitudes={self.amplitudes}, "
+                f"bytes={self.bytes}, peak_temporary_bytes={self.peak_temporary_bytes})")
+
+
+class ProfileReport:
+    """
+    Summarizes the instructions profiled during a run.
+
+    Attributes:
+        by_kind (dict): The GateStats of each instruction kind.
+        by_qubits (dict): The GateStats of each tuple of instruction qubits, e.g.
+            (0, 5) for every two-qubit instruction on qubits 0 and 5.
+        by_index (dict): The GateStats of each instruction index. The instructions
+            re-simulated for every shot add up at their index.
+        total (GateStats): The statistics of all instructions.
+        peak_state_bytes (int): The size of the largest state (or batch of states) profiled.
+        wall_seconds (float): The wall time of the whole run, including compilation
+            and sampling; None until the run completes.
+    """
+    def __init__(self) -> None:
+        """
+        Initializes an empty report.
+        """
+        self.by_kind: dict = {}
+        self.by_qubits: dict = {}
+        self.by_index: dict = {}
+        self.total: GateStats = GateStats()
+        self.peak_state_bytes: int = 0
+        self.wall_seconds: float = None
+        self._labels: dict = {}  # Index -> "kind qubits" of the last instruction seen there
+
+    def add(self, event: GateEvent) -> None:
+        """
+        Adds an event to the report.
+
+        Args:
+            event (GateEvent): The event.
+        """
+        for table, key in ((self.by_kind, event.kind), (self.by_qubits, event.qubits), (self.by_index, event.index)):
+            stats: GateStats = table.get(key)
+            if stats is None:
+                stats = table[key] = GateStats()
+            stats.add(event)
+        self.total.add(event)
+        self._labels[event.index] = f"{event.kind} {event.qubits}"
+        self.peak_state_bytes = max(self.peak_state_bytes, event.state_bytes)
+
+    @property
+    def gate_seconds(self) -> float:
+        """The wall time spent inside instructions."""
+        return self.total.seconds
+
+    @property
+    def peak_temporary_bytes(self) -> int:
+        """The largest temporary allocation of any instruction, or None unless memory is traced."""
+        return self.total.peak_temporary_bytes
+
+    def slowest(self, count: int = 10) -> list:
+        """
+        Returns the instructions with the largest total wall time.
+
+        Args:
+            count (int): The number of instructions.
+
+        Returns:
+            list: (index, GateStats) pairs, slowest first.
+        """
+        return sorted(self.by_index.items(), key=lambda item: item[1].seconds, reverse=True)[:count]
+
+    def summary(self, count: int = 10) -> str:
+        """
+        Returns a human-readable table of the costs per kind and of the slowest instructions.
+
+        Args:
+            count (int): The number of slowest instructions listed.
+
+        Returns:
+            str: The summary.
+        """
+        wall: str = "n/a" if self.wall_seconds is None else f"{self.wall_seconds:.6f} s"
+        lines: list = [f"{self.total.count} instructions, {self.gate_seconds:.6f} s in gates, {wall} wall",
+                       f"peak state {self.peak_state_bytes} B, peak temporary {self.peak_temporary_bytes} B",
+                       f"{'kind':<12}{'count':>8}{'seconds':>12}{'share':>8}{'amplitudes':>14}{'bytes':>16}"]
+        for kind, stats in sorted(self.by_kind.items(), key=lambda item: item[1].seconds, reverse=True):
+            lines.append(f"{kind:<12}{stats.count:>8}{stats.seconds:>12.6f}{_share(stats.seconds, self.gate_seconds):>8}"
+                         f"{stats.amplitudes:>14}{stats.bytes:>16}")
+        lines.append(f"{'index':<12}{'count':>8}{'seconds':>12}{'share':>8}  kind / qubits")
+        for index, stats in self.slowest(count):
+            lines.append(f"{index:<12}{stats.count:>8}{stats.seconds:>12.6f}{_share(stats.seconds, self.gate_seconds):>8}"
+                         f"  {self._labels[index]}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"ProfileReport(instructions={self.total.count}, gate_seconds={self.gate_seconds:.6f}, wall_seconds={self.wall_seconds})"
+
+
+class Profiler:
+    """
+    Records the cost of the instructions a QuantumSimulator applies.
+    """
+    def __init__(self, callback=None, trace_memory: bool = False) -> None:
+        """
+        Initializes the profiler.
+
+        Args:
+            callback (callable, optional): Called with each GateEvent as soon as its
+                instruction completes, e.g. to stream events to a metrics system.
+            trace_memory (bool): Whether to measure the temporary memory of every
+                instruction with ``tracemalloc``, which is started if needed. Tracing
+                slows down all Python allocations, so it inflates the wall times.
+        """
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.report: ProfileReport = ProfileReport()
+        self._started: float = 0.0
+        self._base_bytes: int = 0
+
+    def reset(self) -> ProfileReport:
+        """
+        Starts a new report, e.g. before profiling another call.
+
+        Returns:
+            ProfileReport: The new, empty report.
+        """
+        self.report = ProfileReport()
+        return self.report
+
+    def begin(self) -> None:
+        """
+        Marks the start of an instruction.
+        """
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._base_bytes = tracemalloc.get_traced_memory()[0]
+        self._started = time.perf_counter()
+
+    def end(self, index: int, opcode: int, qubits: tuple, operand, state: np.ndarray) -> GateEvent:
+        """
+        Records the instruction started by the last :meth:`begin`.
+
+        Args:
+            index (int): The index of the instruction in its program.
+            opcode (int): The opcode of the instruction.
+            qubits (tuple): The qubits of the instruction.
+            operand: The operand of the instruction.
+            state (np.ndarray): The state (or batch of states) it was applied to.
+
+        Returns:
+            GateEvent: The recorded event.
+        """
+        seconds: float = time.perf_counter() - self._started
+        temporary: int = None
+        if self.trace_memory:
+            temporary = max(0, tracemalloc.get_traced_memory()[1] - self._base_bytes)
+        amplitudes: int = touched_amplitudes(opcode, qubits, operand, state.size)
+        event: GateEvent = GateEvent(index, OPCODE_NAMES[opcode], tuple(qubits), seconds, amplitudes,
+                                     2 * amplitudes * state.itemsize, state.nbytes, temporary)
+        self.report.add(event)
+        if self.callback is not None:
+            self.callback(event)
+        return event
+
+
+class ProfiledResult(tuple):
+    """
+    The (state, measurements) pair returned by :meth:`QuantumSimulator.run` when
+    profiling, which unpacks as usual and carries the run's report.
+
+    Attributes:
+        profile (ProfileReport): The report of the run.
+    """
+    def __new__(cls, state, measurements, profile: ProfileReport) -> "ProfiledResult":
+        result: ProfiledResult = super().__new__(cls, (state, measurements))
+        result.profile = profile
+        return result
+
+
+def touched_amplitudes(opcode: int, qubits: tuple, operand, size: int) -> int:
+    """
+    Returns the number of amplitudes an instruction reads and writes.
+
+    Controlled instructions only touch their control-satisfied slice, and a swap
+    only the half of it where the swapped qubits differ.
+
+    Args:
+        opcode (int): The opcode of the instruction.
+        qubits (tuple): The qubits of the instruction, controls included.
+        operand: The operand of the instruction.
+        size (int): The number of amplitudes of the state (or batch of states).
+
+    Returns:
+        int: The number of amplitudes.
+    """
+    if opcode in (OP_FLIP, OP_SWAP, OP_CONTROLLED):
+        return size >> (len(qubits) - 1)
+    if opcode == OP_PHASES and operand.phases is None:
+        return 0
+    return size
+
+
+def _share(seconds: float, total: float) -> str:
+    """Returns a time as a percentage of a total."""
+    return f"{100 * seconds / total:.1f}%" if total > 0 else "-"
@@ -2,6 +2,24 @@
 Defines the QuantumCircuit class for building and manipulating quantum circuits.
 """
 
+import mmap
+from .parameters import ParameterExpression
+from .gate_store import GateStore, PARAMETRIC_GATES, MATRIX_GATES, NOISE_GATES, dumps, loads
+
+def gate_qubits(gate: tuple) -> tuple:
+    """
+    Returns the qubits a gate tuple acts on.
+
+    Args:
+        gate (tuple): A gate as stored in QuantumCircuit.gates.
+
+    Returns:
+        tuple: The qubit indices, in operand order.
+    """
+    if gate[0] in PARAMETRIC_GATES or gate[0] in MATRIX_GATES or gate[0] in NOISE_GATES:
+        return gate[1:-1]
+    return gate[1:]
+
 class QuantumCircuit:
     """
     Represents a quantum circuit.
@@ -14,7 +32,7 @@ class QuantumCircuit:
             num_qubits (int): The number of qubits in the circuit.
         """
         self.num_qubits = num_qubits
-        self.gates = [] # Store the gates of the circuits
+        self.gates = GateStore() # Store the gates of the circuits
 
     def i(self, qubit:int) -> None:
         """Applies a Identitiy gate to the specified qubit.
@@ -219,6 +237,16 @@ class QuantumCircuit:
         """
         self.gates.append(("Rzz", qubit1, qubit2, theta))
         
+    def unitary(self, matrix, *qubits:int) -> None:
+        """
+        Applies an arbitrary unitary matrix to the specified qubits.
+
+        Args:
+            matrix (np.ndarray): The 2^k x 2^k unitary matrix, the first qubit being the most significant bit.
+            *qubits (int): The indices of the k qubits.
+        """
+        self.gates.append(("Unitary",) + tuple(qubits) + (matrix,))
+
     def measure(self, qubit:int) -> None:
         """
         Measures the specified qubit.
@@ -228,15 +256,96 @@ class QuantumCircuit:
         """
         self.gates.append(("Measure", qubit))
 
-    def get_gates(self) -> list:
+    def measure_all(self) -> None:
+        """
+        Measures every qubit of the circuit in one batched operation.
+        """
+        self.gates.append(("Measure",) + tuple(range(self.num_qubits)))
+
+    def reset(self, qubit:int) -> None:
+        """
+        Resets the specified qubit to |0>.
+
+        Args:
+            qubit (int): The index of the qubit.
+        """
+        self.gates.append(("Reset", qubit))
+
+    def depolarizing(self, qubits, probability: float) -> None:
+        """
+        Applies a depolarizing channel: with the given probability, one of the 4^k - 1
+        non-identity Pauli products on the qubits, chosen uniformly.
+
+        Args:
+            qubits (int or sequence of int): The index of the qubit, or the indices of the k qubits.
+            probability (float): The error probability, between 0 and 1.
+        """
+        _check_probability(probability)
+        qubits = tuple(qubits) if isinstance(qubits, (tuple, list, range)) else (qubits,)
+        self.gates.append(("Depolarizing",) + qubits + (probability,))
+
+    def amplitude_damping(self, qubit: int, gamma: float) -> None:
+        """
+        Applies an amplitude damping channel, which decays |1> to |0> with probability gamma.
+
+        Args:
+            qubit (int): The index of the qubit.
+            gamma (float): The decay probability, between 0 and 1.
         """
-        Returns the list of gates in the circuit.
+        _check_probability(gamma)
+        self.gates.append(("AmplitudeDamping", qubit, gamma))
+
+    def readout_error(self, qubit: int, probability: float) -> None:
+        """
+        Makes the later measurements of a qubit report the wrong bit with the given probability.
+
+        Args:
+            qubit (int): The index of the qubit.
+            probability (float): The probability of flipping an outcome, between 0 and 1.
+        """
+        _check_probability(probability)
+        self.gates.append(("ReadoutError", qubit, probability))
+
+    def get_gates(self) -> GateStore:
+        """
+        Returns the gates in the circuit.
 
         Returns:
-            list: The list of gates.
+            GateStore: The gates, a sequence of gate tuples such as ("CNOT", 0, 1)
+            rebuilt on access from compact columns (see :mod:`gate_store`).
         """
         return self.gates
 
+    def get_parameters(self) -> list:
+        """
+        Returns the symbolic parameters used by the gates, in order of first use.
+
+        Returns:
+            list: The parameters.
+        """
+        parameters = {}
+        for gate in self.gates:
+            if gate[0] in PARAMETRIC_GATES and isinstance(gate[-1], ParameterExpression):
+                parameters.update(dict.fromkeys(gate[-1].get_parameters()))
+        return list(parameters)
+
+    def bind_parameters(self, values: dict) -> "QuantumCircuit":
+        """
+        Returns a copy of the circuit with its symbolic parameters replaced by values.
+
+        Args:
+            values (dict): The value of each Parameter.
+
+        Returns:
+            QuantumCircuit: The bound circuit.
+        """
+        bound: QuantumCircuit = QuantumCircuit(self.num_qubits)
+        for gate in self.gates:
+            if gate[0] in PARAMETRIC_GATES and isinstance(gate[-1], ParameterExpression):
+                gate = gate[:-1] + (gate[-1].bind(values),)
+            bound.gates.append(gate)
+        return bound
+
     def get_num_qubits(self) -> int:
         """
         Returns the number of qubits in the circuit.
@@ -244,4 +353,60 @@ class QuantumCircuit:
         Returns:
             int: The number of qubits.
         """
-        return self.num_qubits
\ No newline at end of file
+        return self.num_qubits
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the circuit in the versioned binary format of :mod:`gate_store`.
+
+        Returns:
+            bytes: The encoded circuit; its parameters must be bound.
+        """
+        return dumps(self.num_qubits, self.gates)
+
+    @classmethod
+    def from_bytes(cls, data) -> "QuantumCircuit":
+        """
+        Deserializes a circuit encoded by :meth:`to_bytes`.
+
+        Args:
+            data (bytes-like): The encoded circuit; the gates are read from it without copying.
+
+        Returns:
+            QuantumCircuit: The circuit.
+        """
+        num_qubits, gates = loads(data)
+        circuit: QuantumCircuit = cls(num_qubits)
+        circuit.gates = gates
+        return circuit
+
+    def save(self, path: str) -> None:
+        """
+        Writes the circuit to a file in the binary format.
+
+        Args:
+            path (str): The path of the file.
+        """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "QuantumCircuit":
+        """
+        Loads a circuit written by :meth:`save`, memory-mapping the file instead of reading it.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            QuantumCircuit: The circuit, whose gate columns are views of the mapped file.
+        """
+        with open(path, "rb") as file:
+            mapped: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_bytes(mapped)
+
+
+def _check_probability(probability: float) -> None:
+    """Raises a ValueError unless the probability is between 0 and 1."""
+    if not 0 <= probability <= 1:
+        raise ValueError(f"Probability out of range: {probability}")
@@ -0,0 +1,270 @@
+"""
+Defines the QuantumDevice, an asyncio job interface to a local simulator.
+
+``QuantumSimulator.run`` blocks its caller, which stalls an event loop for the
+whole simulation. A QuantumDevice instead queues circuits as jobs and runs them
+on a pool of executor threads (or processes), so coroutines keep running while
+circuits are simulated::
+
+    async with QuantumDevice(QuantumSimulator(seed=1), max_concurrency=4) as device:
+        jobs = [await device.submit(circuit, shots=1000) for circuit in circuits]
+        ...  # Classical work overlaps the simulations
+        results = [await job for job in jobs]
+
+At most ``max_concurrency`` jobs run at once; the others wait in a FIFO queue.
+With ``max_queue``, :meth:`QuantumDevice.submit` waits for room in the queue,
+which applies backpressure to fast producers. A queued job can be cancelled.
+A running job cannot, because a simulation cannot be interrupted, so it
+completes.
+
+Each job gets a seed drawn from the simulator's generator when it is submitted,
+so a seeded device gives the same results whatever the scheduling.
+"""
+
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .quantum_simulator import QuantumSimulator
+from . import batch
+
+
+class QuantumJob:
+    """
+    Represents a circuit submitted to a QuantumDevice; awaiting it returns its result.
+    """
+    def __init__(self, job_id: int, circuit, shots: int, parameter_values: dict, seed: int, future: asyncio.Future) -> None:
+        """
+        Initializes a queued job.
+
+        Args:
+            job_id (int): The number of the job on its device.
+            circuit (QuantumCircuit or Program): The circuit to simulate.
+            shots (int): The number of shots (see :meth:`QuantumSimulator.run`).
+            parameter_values (dict): The value of each symbolic Parameter of the circuit.
+            seed (int): The measurement seed of the run.
+            future (asyncio.Future): The future receiving the result.
+        """
+        self.job_id = job_id
+        self.circuit = circuit
+        self.shots = shots
+        self.parameter_values = parameter_values
+        self.seed = seed
+        self._future = future
+        self._running: bool = False
+
+    @property
+    def status(self) -> str:
+        """The state of the job: "queued", "running", "done", "failed" or "cancelled"."""
+        if self._future.cancelled():
+            return "cancelled"
+        if self._future.done():
+            return "failed" if self._future.exception() is not None else "done"
+        return "running" if self._running else "queued"
+
+    def done(self) -> bool:
+        """
+        Returns whether the job has completed, failed or been cancelled.
+
+        Returns:
+            bool: Whether the job is finished.
+        """
+        return self._future.done()
+
+    def cancel(self) -> bool:
+        """
+        Cancels the job if it has not started running.
+
+        Returns:
+            bool: Whether the job is cancelled; False if it is running or finished.
+        """
+        if self._running and not self._future.done():
+            return False
+        self._future.cancel()
+        return self._future.cancelled()
+
+    async def result(self, timeout: float = None) -> tuple:
+        """
+        Waits for the result of the job.
+
+        Cancelling the waiting coroutine, or hitting the timeout, does not cancel the job.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait.
+
+        Returns:
+            tuple: The state and measurements returned by :meth:`QuantumSimulator.run`.
+        """
+        return await asyncio.wait_for(asyncio.shield(self._future), timeout)
+
+    def __await__(self):
+        """Waits for the result of the job, as :meth:`result` does."""
+        return self.result().__await__()
+
+    def __repr__(self) -> str:
+        return f"QuantumJob(job_id={self.job_id}, status={self.status!r})"
+
+
+class QuantumDevice:
+    """
+    Runs circuits on a local simulator as asyncio jobs with bounded concurrency.
+    """
+    def __init__(self, simulator: QuantumSimulator = None, max_concurrency: int = 1, max_queue: int = 0,
+                 processes: bool = False, return_states: bool = True) -> None:
+        """
+        Initializes the device. Its workers start with the first submitted job, in
+        the running event loop, and the device must stay in that loop.
+
+        Args:
+            simulator (QuantumSimulator, optional): The simulator whose settings and
+                seed the jobs use; a default one if None. Each worker runs its own
+                copy (see :meth:`QuantumSimulator.settings`) on one thread.
+            max_concurrency (int): The maximum number of jobs running at once.
+            max_queue (int): The maximum number of queued jobs, beyond which
+                :meth:`submit` waits; 0 means unbounded.
+            processes (bool): Whether the jobs run in worker processes instead of
+                threads (see :mod:`batch`). Processes avoid contention on the GIL
+                for many small circuits, but circuits and states cross process boundaries.
+            return_states (bool): Whether results include the final states; if not,
+                their states are None.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.simulator = simulator if simulator is not None else QuantumSimulator()
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.processes = processes
+        self.return_states = return_states
+        self._queue: asyncio.Queue = None  # Created with the workers, in the running loop
+        self._workers: list = []
+        self._executor = None
+        self._ids = itertools.count()
+        self._closed: bool = False
+
+    @property
+    def pending(self) -> int:
+        """The number of queued jobs that have not started running."""
+        return 0 if self._queue is None else self._queue.qsize()
+
+    async def submit(self, circuit, shots: int = None, parameter_values: dict = None) -> QuantumJob:
+        """
+        Queues a circuit for simulation.
+
+        Args:
+            circuit (QuantumCircuit or Program): The circuit to simulate.
+            shots (int, optional): The number of shots, as in :meth:`QuantumSimulator.run`.
+            parameter_values (dict, optional): The value of each symbolic Parameter of the circuit.
+
+        Returns:
+            QuantumJob: The job, which is awaited for its result.
+        """
+        if self._closed:
+            raise RuntimeError("The device is closed")
+        self._start()
+        seed: int = self.simulator.spawn_seed()
+        job: QuantumJob = QuantumJob(next(self._ids), circuit, shots, parameter_values, seed,
+                                     asyncio.get_running_loop().create_future())
+        await self._queue.put(job)
+        return job
+
+    async def run(self, circuit, shots: int = None, parameter_values: dict = None) -> tuple:
+        """
+        Simulates a circuit without blocking the event loop.
+
+        Args:
+            circuit (QuantumCircuit or Program): The circuit to simulate.
+            shots (int, optional): The number of shots, as in :meth:`QuantumSimulator.run`.
+            parameter_values (dict, optional): The value of each symbolic Parameter of the circuit.
+
+        Returns:
+            tuple: The state and measurements returned by :meth:`QuantumSimulator.run`.
+        """
+        return await (await self.submit(circuit, shots, parameter_values))
+
+    async def close(self, cancel_pending: bool = False) -> None:
+        """
+        Stops accepting jobs, waits for the submitted ones and shuts the workers down.
+
+        Args:
+            cancel_pending (bool): Whether the queued jobs are cancelled instead of run.
+        """
+        self._closed = True
+        if self._queue is None:
+            return
+        if cancel_pending:
+            while not self._queue.empty():
+                self._queue.get_nowait().cancel()
+                self._queue.task_done()
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def __aenter__(self) -> "QuantumDevice":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        await self.close(cancel_pending=exc_type is not None)
+
+    def _start(self) -> None:
+        """Creates the queue, the executor and the worker tasks on first use."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(self.max_queue)
+        settings: dict = self.simulator.settings()
+        if self.processes:
+            self._executor = ProcessPoolExecutor(self.max_concurrency, initializer=batch.start_worker, initargs=(settings,))
+            simulators: list = [None] * self.max_concurrency
+        else:
+            self._executor = ThreadPoolExecutor(self.max_concurrency)
+            simulators: list = [QuantumSimulator(**settings) for _ in range(self.max_concurrency)]
+        self._workers = [asyncio.ensure_future(self._work(simulator)) for simulator in simulators]
+
+    async def _work(self, simulator: QuantumSimulator) -> None:
+        """Runs queued jobs one at a time, on its own simulator in thread mode."""
+        while True:
+            job: QuantumJob = await self._queue.get()
+            try:
+                if job.done():  # Cancelled while queued
+                    continue
+                job._running = True
+                try:
+                    result: tuple = await self._evaluate(job, simulator)
+                except asyncio.CancelledError:
+                    job._future.cancel()
+                    raise
+                except Exception as error:
+                    job._future.set_exception(error)
+                else:
+                    job._future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    async def _evaluate(self, job: QuantumJob, simulator: QuantumSimulator) -> tuple:
+        """Runs a job on the executor and returns its (state, measurements)."""
+        if not self.processes:
+            future = self._executor.submit(_run_job, simulator, job.circuit, job.shots, job.parameter_values,
+                                           job.seed, self.return_states)
+            return await asyncio.wrap_future(future)
+        circuit, values = batch.encode(job.circuit, job.parameter_values)
+        future = self._executor.submit(batch.run_task, circuit, job.shots, values, job.seed, self.return_states)
+        try:
+            state, handle, measurements = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(_discard_shared)  # The worker may still return a shared state
+            raise
+        if handle is not None:
+            state = await asyncio.get_running_loop().run_in_executor(None, batch.unshare, handle)
+        return state, measurements
+
+
+def _run_job(simulator: QuantumSimulator, circuit, shots: int, parameter_values: dict, seed: int, return_states: bool) -> tuple:
+    """Runs a job on a worker thread's simulator."""
+    simulator.reseed(seed)
+    return simulator.run(circuit, shots, parameter_values, return_state=return_states)
+
+
+def _discard_shared(future) -> None:
+    """Frees the shared state of a worker process result nobody will read."""
+    if not future.cancelled() and future.exception() is None and future.result()[1] is not None:
+        batch.unshare(future.result()[1])
@@ -2,296 +2,742 @@
 Defines the QuantumSimulator class for simulating quantum circuits.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import time
 import numpy as np
-from .quantum_circuit import QuantumCircuit  # Import QuantumCircuit
+from .quantum_circuit import QuantumCircuit, gate_qubits  # Import QuantumCircuit
+from .gate_store import GateStore
+from .compiler import Program, compile_circuit, OP_MEASURE, OP_RESET, _measurement_layout
+from .gradients import adjoint_gradient
+from .observables import expectation_value
+from .stabilizer import StabilizerTableau, is_clifford
+from .mps import MatrixProductState
+from .sparse import SparseState, is_reversible
+from .decomposition import ProductState, split_circuit
+from .lightcone import light_cone
+from .noise import is_noisy, sample_trajectories
+from .profiling import Profiler, ProfileReport, ProfiledResult
+from .observables import PauliSum
+from . import kernels, parallel, batch, outofcore
 
 class QuantumSimulator:
     """
     Simulates quantum circuits.
     """
 
-    def run(self, circuit: QuantumCircuit) -> tuple[np.ndarray, dict]:
+    program_cache_size: int = 32  # Number of compiled circuits kept for reuse
+    auto_threshold: int = 24  # With backend="auto", circuits on more qubits may use the sparse or stabilizer backend
+    parallel_threshold: int = 16  # States on fewer qubits are always updated on a single thread
+    renormalize_interval: int = 256  # Single-precision states are renormalized after this many instructions
+    out_of_core_threshold: int = 24  # With out_of_core set, states on at least this many qubits are memory-mapped
+    chunk_qubits: int = 16  # Memory-mapped states are processed in blocks of 2^chunk_qubits amplitudes
+    trajectory_memory: int = 1 << 28  # Peak bytes of the state vectors evolved together when sampling noisy circuits
+
+    def __init__(self, seed=None, optimization_level: int = 0, backend: str = "auto",
+                 max_bond_dimension: int = None, truncation_error: float = 1e-12, prune: bool = True,
+                 num_threads: int = 1, precision: str = "double", out_of_core: str = None,
+                 profiler: Profiler = None) -> None:
+        """
+        Initializes the simulator.
+
+        Args:
+            seed (int or np.random.Generator, optional): Seed or generator used for all
+                measurement randomness, for reproducible runs.
+            optimization_level (int): The aggressiveness of the gate-fusion pass applied
+                when compiling circuits (see :func:`optimizer.optimize`); 0 disables it.
+            backend (str): How :meth:`run` and :meth:`sample` simulate circuits:
+                "statevector" - the dense state vector, for any circuit;
+                "stabilizer" - a stabilizer tableau (see :mod:`stabilizer`), for
+                    circuits of Clifford gates only, on thousands of qubits;
+                "mps" - a matrix product state (see :mod:`mps`), for long chains
+                    of qubits with limited entanglement;
+                "sparse" - the nonzero amplitudes only (see :mod:`sparse`), for
+                    classical-reversible circuits and other small supports;
+                "auto" - for circuits on more than ``auto_threshold`` qubits, the
+                    sparse state if they are classical-reversible, else the
+                    stabilizer tableau if they are Clifford; the state vector otherwise.
+            max_bond_dimension (int, optional): The bond dimension cap of the "mps" backend.
+            truncation_error (float): The weight the "mps" backend may discard per truncation.
+            prune (bool): Whether measurement-only and observable-only runs (:meth:`sample`,
+                :meth:`expectation` and :meth:`run` with shots and without ``return_state``)
+                first drop the gates and qubits outside the light cone of their outputs
+                (see :mod:`lightcone`).
+            num_threads (int): The number of threads sharing each state-vector gate on
+                states of at least ``parallel_threshold`` qubits (see :mod:`parallel`).
+                They are shut down by :meth:`close`, or on leaving a ``with`` block.
+            precision (str): The precision of state vectors and compiled gates: "double"
+                (complex128) or "single" (complex64), which halves memory and
+                bandwidth; single-precision states are renormalized every
+                ``renormalize_interval`` instructions to keep rounding drift in check.
+            out_of_core (str, optional): A directory, ideally on a local SSD, in which
+                state vectors of at least ``out_of_core_threshold`` qubits are stored as
+                memory-mapped files and processed block by block (see :mod:`outofcore`),
+                for registers larger than RAM. Expectation values still read the whole state.
+            profiler (Profiler, optional): Records the wall time, amplitudes touched, bytes
+                moved and memory of every instruction applied to an in-memory state
+                vector (see :mod:`profiling`); :meth:`run` then attaches the report to
+                its result. Without it, instructions are not instrumented at all.
+        """
+        if backend not in ("auto", "statevector", "stabilizer", "mps", "sparse"):
+            raise ValueError(f"Unknown backend: {backend}")
+        if precision not in ("single", "double"):
+            raise ValueError(f"Unknown precision: {precision}")
+        self.optimization_level = optimization_level
+        self.backend = backend
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_error = truncation_error
+        self.prune = prune
+        self.num_threads = num_threads
+        self.precision = precision
+        self.dtype = np.dtype(np.complex64 if precision == "single" else np.complex128)
+        self.out_of_core = out_of_core
+        self.profiler = profiler
+        self._pool = ThreadPoolExecutor(num_threads) if num_threads > 1 else None
+        self._programs = {}
+        self._rng = np.random.default_rng(seed)
+        # Dispatch table, indexed by the opcodes of compiler.py
+        self._dispatch = (
+            self._apply_matrix,
+            self._apply_diagonal,
+            self._apply_phases,
+            self._apply_flip,
+            self._apply_swap,
+            self._apply_controlled,
+            self._apply_measure,
+            self._apply_reset,
+        )
+
+    def close(self) -> None:
+        """
+        Shuts down the threads of ``num_threads``; the simulator then updates states on one thread.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "QuantumSimulator":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        pool = getattr(self, "_pool", None)  # Unset if __init__ failed
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def compile(self, circuit: QuantumCircuit) -> Program:
+        """
+        Compiles the given quantum circuit, reusing the program of an identical earlier circuit.
+
+        Args:
+            circuit (QuantumCircuit): The quantum circuit to compile.
+
+        Returns:
+            Program: The compiled program, which can be passed to :meth:`run` directly.
+        """
+        gates = circuit.get_gates()
+        if not isinstance(gates, GateStore):  # A plain list assigned to circuit.gates
+            gates = GateStore(gates)
+        key: tuple = (circuit.get_num_qubits(), self.optimization_level, self.dtype, gates.digest())
+        program: Program = self._programs.get(key)
+        if program is None:
+            program = compile_circuit(circuit, self.optimization_level, self.dtype)
+            if len(self._programs) >= self.program_cache_size:
+                del self._programs[next(iter(self._programs))]
+            self._programs[key] = program
+        return program
+
+    def run(self, circuit, shots: int = None, parameter_values: dict = None, factored: bool = False,
+            return_state: bool = True) -> tuple[np.ndarray, dict]:
         """
         Simulates the given quantum circuit.
 
         Args:
-            circuit (QuantumCircuit): The quantum circuit to simulate.
+            circuit (QuantumCircuit or Program): The quantum circuit to simulate.
+            shots (int, optional): If given, the circuit is sampled this many times
+                and the measurements are returned as counts (see :meth:`sample`).
+            parameter_values (dict, optional): The value of each symbolic Parameter of the circuit.
+            factored (bool): The state of a circuit made of independent qubit groups
+                is simulated one group at a time (see :mod:`decomposition`), and the
+                group states are multiplied out into the full state vector unless
+                ``factored=True``, which returns a ProductState.
+            return_state (bool): Whether the final state is returned; if not, the state
+                is None and a run with ``shots`` may be light-cone pruned (see ``prune``).
 
         Returns:
-            np.ndarray, dict: The final state vector of the qubits and the measurements.
+            np.ndarray, dict: The final state vector of the qubits and the measurements (see :mod:`noise`, :mod:`profiling`).
         """
-        num_qubits: int = circuit.get_num_qubits()
-        state: np.ndarray = np.zeros(2**num_qubits, dtype=complex)
-        state[0] = 1  # Initialize to |00...0>
-        
-        measurements = {}
+        if self.profiler is None:
+            return self._run(circuit, shots, parameter_values, factored, return_state)
+        report: ProfileReport = self.profiler.reset()
+        started: float = time.perf_counter()
+        state, measurements = self._run(circuit, shots, parameter_values, factored, return_state)
+        report.wall_seconds = time.perf_counter() - started
+        return ProfiledResult(state, measurements, report)
+
+    def _run(self, circuit, shots: int = None, parameter_values: dict = None, factored: bool = False,
+             return_state: bool = True) -> tuple[np.ndarray, dict]:
+        """Simulates a circuit as :meth:`run` does, without the profiling report."""
+        if not return_state:
+            if shots is not None:
+                circuit = self._prune_measured(circuit) or circuit
+            return None, self._run(circuit, shots, parameter_values, True)[1]
+        if is_noisy(circuit):
+            if shots is None:
+                raise ValueError("Circuits with noise channels have no single final state; pass shots")
+            return None, _counts(self._sample_noisy(circuit, shots, parameter_values))
+        backend: str = self._gate_backend(circuit)
+        if backend is not None:
+            return self._run_gates(backend, circuit, shots, parameter_values)
+        parts: list = self._components(circuit, factored)
+        if parts is not None:
+            state, measurements = self._run_components(circuit, parts, shots, parameter_values)
+            return (state if factored else state.to_statevector()), measurements
+        program: Program = self._as_program(circuit, parameter_values)
+        state: np.ndarray = self._initial_state(program.num_qubits)
+        if shots is not None:
+            return self._run_shots(state, program, shots)
 
-        for gate in circuit.get_gates():
-            gate_type: str = gate[0]
-            if gate_type in ("H", "X", "Y", "Z", "S", "T", "I", "Measure"):
-                qubit: int = gate[1]
-                params = None
-            elif gate_type in ("CNOT", "CZ", "SWAP", "CY", "CH", "CS", "CSWAP"):
-                control_qubit: int = gate[1]
-                target_qubit: int = gate[2]
-                params = None
-            elif gate_type in ("RX", "RY", "RZ", "Rxx", "Ryy", "Rzz"):
-                qubit: int = gate[1]
-                theta = gate[2]
-                if gate_type in ("Rxx", "Ryy", "Rzz"):
-                    qubit2 = gate[1]
-                    theta = gate[2]
-                params = theta
-            elif gate_type == "CCX":
-                control_qubit1: int = gate[1]
-                control_qubit2: int = gate[2]
-                target_qubit: int = gate[3]
-                params = None
-
-            if gate_type == "I":
-                self._apply_identity(state, qubit, num_qubits)
-            elif gate_type == "H":
-                self._apply_hadamard(state, qubit, num_qubits)
-            elif gate_type == "X":
-                self._apply_pauli_x(state, qubit, num_qubits)
-            elif gate_type == "Y":
-                self._apply_pauli_y(state, qubit, num_qubits)
-            elif gate_type == "Z":
-                self._apply_pauli_z(state, qubit, num_qubits)
-            elif gate_type == "S":
-                self._apply_s(state, qubit, num_qubits)
-            elif gate_type == "T":
-                self._apply_t(state, qubit, num_qubits)
-            elif gate_type == "CNOT":
-                self._apply_cnot(state, control_qubit, target_qubit, num_qubits)
-            elif gate_type == "RX":
-                self._apply_rx(state, qubit, num_qubits, params)
-            elif gate_type == "RY":
-                self._apply_ry(state, qubit, num_qubits, params)
-            elif gate_type == "RZ":
-                self._apply_rz(state, qubit, num_qubits, params)
-            elif gate_type == "CZ":
-                self._apply_cz(state, control_qubit, target_qubit, num_qubits)
-            elif gate_type == "SWAP":
-                self._apply_swap(state, qubit, target_qubit, num_qubits)
-            elif gate_type == "CCX":
-                self._apply_ccx(state, control_qubit1, control_qubit2, target_qubit, num_qubits)
-            elif gate_type == "CY":
-                self._apply_cy(state, control_qubit, target_qubit, num_qubits)
-            elif gate_type == "CH":
-                self._apply_ch(state, control_qubit, target_qubit, num_qubits)
-            elif gate_type == "CS":
-                self._apply_cs(state, control_qubit, target_qubit, num_qubits)
-            elif gate_type == "CSWAP":
-                self._apply_cswap(state, control_qubit, qubit, target_qubit, num_qubits)
-            elif gate_type == "Rxx":
-                self._apply_rxx(state, qubit, qubit2, num_qubits, params)
-            elif gate_type == "Ryy":
-                self._apply_ryy(state, qubit, qubit2, num_qubits, params)
-            elif gate_type == "Rzz":
-                self._apply_rzz(state, qubit, qubit2, num_qubits, params)
-            elif gate_type == "Measure":
-                measurement_outcome = self._apply_measure(state, qubit, num_qubits)
-                measurements[qubit] = measurement_outcome
+        measurements = {}
+        self.execute(program, state, measurements)
         return state, measurements
 
-    def _apply_identity(self, state: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies an Identity gate."""
-        identity_matrix: np.ndarray = np.array([[1, 0], [0, 1]])
-        self._apply_gate(state, identity_matrix, qubit, num_qubits)
-
-    def _apply_hadamard(self, state: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies a Hadamard gate."""
-        hadamard_matrix: np.ndarray = np.array([[1 / np.sqrt(2), 1 / np.sqrt(2)], [1 / np.sqrt(2), -1 / np.sqrt(2)]])
-        self._apply_gate(state, hadamard_matrix, qubit, num_qubits)
-
-    def _apply_pauli_x(self, state: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies a Pauli-X gate."""
-        pauli_x_matrix: np.ndarray = np.array([[0, 1], [1, 0]])
-        self._apply_gate(state, pauli_x_matrix, qubit, num_qubits)
-
-    def _apply_pauli_y(self, state: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies a Pauli-Y gate."""
-        pauli_y_matrix: np.ndarray = np.array([[0, -1j], [1j, 0]])
-        self._apply_gate(state, pauli_y_matrix, qubit, num_qubits)
-
-    def _apply_pauli_z(self, state: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies a Pauli-Z gate."""
-        pauli_z_matrix: np.ndarray = np.array([[1, 0], [0, -1]])
-        self._apply_gate(state, pauli_z_matrix, qubit, num_qubits)
-
-    def _apply_s(self, state: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies an S gate."""
-        s_matrix: np.ndarray = np.array([[1, 0], [0, 1j]])
-        self._apply_gate(state, s_matrix, qubit, num_qubits)
-
-    def _apply_t(self, state: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies a T gate."""
-        t_matrix: np.ndarray = np.array([[1, 0], [0, np.exp(1j * np.pi / 4)]])
-        self._apply_gate(state, t_matrix, qubit, num_qubits)
-
-    def _apply_rx(self, state: np.ndarray, qubit: int, num_qubits: int, theta: float) -> None:
-        """Applies an Rx gate."""
-        rx_matrix: np.ndarray = np.array([[np.cos(theta/2), -1j * np.sin(theta/2)], [-1j * np.sin(theta/2), np.cos(theta/2)]])
-        self._apply_gate(state, rx_matrix, qubit, num_qubits)
-
-    def _apply_ry(self, state: np.ndarray, qubit: int, num_qubits: int, theta: float) -> None:
-        """Applies an Ry gate."""
-        ry_matrix: np.ndarray = np.array([[np.cos(theta/2), -np.sin(theta/2)], [np.sin(theta/2), np.cos(theta/2)]])
-        self._apply_gate(state, ry_matrix, qubit, num_qubits)
-
-    def _apply_rz(self, state: np.ndarray, qubit: int, num_qubits: int, theta: float) -> None:
-        """Applies an Rz gate."""
-        rz_matrix: np.ndarray = np.array([[np.exp(-1j * theta/2), 0], [0, np.exp(1j * theta/2)]])
-        self._apply_gate(state, rz_matrix, qubit, num_qubits)
-
-    def _apply_cnot(self, state: np.ndarray, control_qubit: int, target_qubit: int, num_qubits: int) -> None:
-        """Applies a CNOT gate."""
-        cnot_matrix: np.ndarray = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
-        self._apply_controlled_gate(state, cnot_matrix, control_qubit, target_qubit, num_qubits)
-
-    def _apply_cz(self, state: np.ndarray, control_qubit: int, target_qubit: int, num_qubits: int) -> None:
-        """Applies a CZ gate."""
-        cz_matrix: np.ndarray = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, -1]])
-        self._apply_controlled_gate(state, cz_matrix, control_qubit, target_qubit, num_qubits)
-
-    def _apply_swap(self, state: np.ndarray, qubit1: int, qubit2: int, num_qubits: int) -> None:
-        """Applies a SWAP gate."""
-        swap_matrix: np.ndarray = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
-        self._apply_two_qubit_gate(state, swap_matrix, qubit1, qubit2, num_qubits)
-
-    def _apply_ccx(self, state: np.ndarray, control_qubit1: int, control_qubit2: int, target_qubit: int, num_qubits: int) -> None:
-        """Applies a CCX (Toffoli) gate."""
-        ccx_matrix: np.ndarray = np.array([[1, 0, 0, 0, 0, 0, 0, 0],
-                                            [0, 1, 0, 0, 0, 0, 0, 0],
-                                            [0, 0, 1, 0, 0, 0, 0, 0],
-                                            [0, 0, 0, 1, 0, 0, 0, 0],
-                                            [0, 0, 0, 0, 1, 0, 0, 0],
-                                            [0, 0, 0, 0, 0, 1, 0, 0],
-                                            [0, 0, 0, 0, 0, 0, 0, 1],
-                                            [0, 0, 0, 0, 0, 0, 1, 0]])
-        self._apply_three_qubit_gate(state, ccx_matrix, control_qubit1, control_qubit2, target_qubit, num_qubits)
-
-    def _apply_cy(self, state: np.ndarray, control_qubit: int, target_qubit: int, num_qubits: int) -> None:
-        """Applies a CY gate."""
-        cy_matrix: np.ndarray = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, -1j], [0, 0, 1j, 0]])
-        self._apply_controlled_gate(state, cy_matrix, control_qubit, target_qubit, num_qubits)
-
-    def _apply_ch(self, state: np.ndarray, control_qubit: int, target_qubit: int, num_qubits: int) -> None:
-        """Applies a CH gate."""
-        ch_matrix: np.ndarray = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1 / np.sqrt(2), 1 / np.sqrt(2)], [0, 0, 1 / np.sqrt(2), -1 / np.sqrt(2)]])
-        self._apply_controlled_gate(state, ch_matrix, control_qubit, target_qubit, num_qubits)
-
-    def _apply_cs(self, state: np.ndarray, control_qubit: int, target_qubit: int, num_qubits: int) -> None:
-        """Applies a CS gate."""
-        cs_matrix: np.ndarray = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1j]])
-        self._apply_controlled_gate(state, cs_matrix, control_qubit, target_qubit, num_qubits)
-
-    def _apply_cswap(self, state: np.ndarray, control_qubit: int, qubit1: int, qubit2: int, num_qubits: int) -> None:
-        """Applies a CSWAP (Fredkin) gate."""
-        cswap_matrix: np.ndarray = np.array([[1, 0, 0, 0, 0, 0, 0, 0],
-                                               [0, 1, 0, 0, 0, 0, 0, 0],
-                                               [0, 0, 1, 0, 0, 0, 0, 0],
-                                               [0, 0, 0, 1, 0, 0, 0, 0],
-                                               [0, 0, 0, 0, 1, 0, 0, 0],
-                                               [0, 0, 0, 0, 0, 0, 1, 0],
-                                               [0, 0, 0, 0, 0, 1, 0, 0],
-                                               [0, 0, 0, 0, 0, 0, 0, 1]])
-        self._apply_three_qubit_gate(state, cswap_matrix, control_qubit, qubit1, qubit2, num_qubits)
-
-    def _apply_rxx(self, state: np.ndarray, qubit1: int, qubit2: int, num_qubits: int, theta: float) -> None:
-        """Applies an Rxx gate."""
-        rxx_matrix: np.ndarray = np.array([[np.cos(theta / 2), 0, 0, -1j * np.sin(theta / 2)],
-                                            [0, np.cos(theta / 2), -1j * np.sin(theta / 2), 0],
-                                            [0, -1j * np.sin(theta / 2), np.cos(theta / 2), 0],
-                                            [-1j * np.sin(theta / 2), 0, 0, np.cos(theta / 2)]])
-        self._apply_two_qubit_gate(state, rxx_matrix, qubit1, qubit2, num_qubits)
-
-    def _apply_ryy(self, state: np.ndarray, qubit1: int, qubit2: int, num_qubits: int, theta: float) -> None:
-        """Applies an Ryy gate."""
-        ryy_matrix: np.ndarray = np.array([[np.cos(theta / 2), 0, 0, 1j * np.sin(theta / 2)],
-                                            [0, np.cos(theta / 2), -1j * np.sin(theta / 2), 0],
-                                            [0, -1j * np.sin(theta / 2), np.cos(theta / 2), 0],
-                                            [1j * np.sin(theta / 2), 0, 0, np.cos(theta / 2)]])
-        self._apply_two_qubit_gate(state, ryy_matrix, qubit1, qubit2, num_qubits)
-
-    def _apply_rzz(self, state: np.ndarray, qubit1: int, qubit2: int, num_qubits: int, theta: float) -> None:
-        """Applies an Rzz gate."""
-        rzz_matrix: np.ndarray = np.array([[np.exp(-1j * theta / 2), 0, 0, 0],
-                                            [0, np.exp(1j * theta / 2), 0, 0],
-                                            [0, 0, np.exp(1j * theta / 2), 0],
-                                            [0, 0, 0, np.exp(-1j * theta / 2)]])
-        self._apply_two_qubit_gate(state, rzz_matrix, qubit1, qubit2, num_qubits)
-
-    def _apply_measure(self, state: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies a measurement gate."""
-        # 1. Calculate probabilities
-        probability_0: float = 0.0
-        for i in range(2**num_qubits):
-            if (i >> (num_qubits - 1 - qubit)) & 1 == 0:  # Check if qubit is 0 in the binary representation of i
-                probability_0 += abs(state[i])**2
-        probability_1: float = 1.0 - probability_0
-
-        # 2. Generate random number
-        random_number: float = np.random.rand()
-
-        # 3. Determine measurement outcome
-        if random_number < probability_0:
-            outcome: int = 0
+    def sample(self, circuit, shots: int, parameter_values: dict = None) -> np.ndarray:
+        """
+        Samples the measurement outcomes of the given quantum circuit.
+
+        If every measurement is terminal, the state is evolved once and all shots
+        are drawn from its probability vector in one vectorized step. Otherwise
+        the circuit is evolved once up to its first measurement and re-simulated
+        from there for each shot. A circuit without measurements is sampled as if
+        every qubit were measured at the end. A circuit with noise channels is
+        sampled with one Monte-Carlo trajectory per shot (see :mod:`noise`).
+
+        Args:
+            circuit (QuantumCircuit or Program): The quantum circuit to sample.
+            shots (int): The number of shots.
+            parameter_values (dict, optional): The value of each symbolic Parameter of the circuit.
+
+        Returns:
+            np.ndarray: An array of shape (shots, number of measured qubits) with the
+            outcome bits, columns following the measured qubits in ascending order.
+        """
+        circuit = self._prune_measured(circuit) or circuit
+        if is_noisy(circuit):
+            return self._sample_noisy(circuit, shots, parameter_values)
+        backend: str = self._gate_backend(circuit)
+        if backend is not None:
+            return self._sample_gates(backend, circuit, shots, parameter_values)[1]
+        parts: list = self._components(circuit)
+        if parts is not None:
+            return self._sample_components(circuit, parts, shots, parameter_values)[1]
+        return self._sample_program(self._as_program(circuit, parameter_values), shots)[1]
+
+    def run_batch(self, circuits, shots: int = None, parameter_values: dict = None,
+                  max_workers: int = None, return_states: bool = True):
+        """
+        Simulates many independent circuits on a pool of worker processes.
+
+        Each worker runs :meth:`run` with this simulator's settings (on one thread),
+        so small circuits are simulated in parallel on every core. Circuits travel
+        in their compact binary encoding (see :meth:`QuantumCircuit.to_bytes`) and large
+        state vectors come back through shared memory (see :mod:`batch`). Each
+        circuit gets its own seed drawn from this simulator's generator, so a seeded
+        batch is reproducible whatever the scheduling.
+
+        Args:
+            circuits (iterable): The circuits (QuantumCircuit or Program) to simulate.
+            shots (int, optional): The number of shots of every run, as in :meth:`run`.
+            parameter_values (dict, optional): The value of each symbolic Parameter of the circuits.
+            max_workers (int, optional): The number of worker processes; None uses every core.
+            return_states (bool): Whether the final states are sent back; if not, the
+                yielded states are None and only the measurements are transferred.
+
+        Yields:
+            int, state, dict: The index of a circuit and its result from :meth:`run`,
+            as soon as the circuit completes (not necessarily in input order).
+        """
+        circuits = list(circuits)
+        seeds: list = self.spawn_seed(len(circuits))
+        return batch.run_batch(self.settings(), circuits, shots, parameter_values, max_workers, return_states, seeds)
+
+    def settings(self) -> dict:
+        """
+        Returns the keyword arguments that recreate this simulator in another thread or process.
+
+        The seed, the thread count and the profiler are left out: each copy runs on
+        one thread and gets its seeds from the caller.
+
+        Returns:
+            dict: The keyword arguments of a new QuantumSimulator.
+        """
+        return {"optimization_level": self.optimization_level, "backend": self.backend,
+                "max_bond_dimension": self.max_bond_dimension, "truncation_error": self.truncation_error,
+                "prune": self.prune, "precision": self.precision, "out_of_core": self.out_of_core}
+
+    @property
+    def rng(self) -> np.random.Generator:
+        """The generator drawing all measurement randomness of this simulator."""
+        return self._rng
+
+    def reseed(self, seed) -> None:
+        """
+        Restarts the measurement randomness from a new seed.
+
+        Args:
+            seed (int or np.random.Generator): The seed or generator used from now on.
+        """
+        self._rng = np.random.default_rng(seed)
+
+    def spawn_seed(self, count: int = None):
+        """
+        Draws seeds for independent runs from this simulator's generator, e.g. for
+        copies of the simulator in other threads or processes (see :meth:`reseed`).
+
+        Args:
+            count (int, optional): The number of seeds; None draws a single one.
+
+        Returns:
+            int or list: The seed, or a list of ``count`` seeds.
+        """
+        if count is None:
+            return int(self._rng.integers(2**63))
+        return self._rng.integers(2**63, size=count).tolist()
+
+    def run_sweep(self, circuit, parameter_values: dict) -> np.ndarray:
+        """
+        Simulates a parameterized circuit for a whole sweep of parameter values at once.
+
+        All parameter sets advance through each gate together as one (batch, 2^n)
+        state array, so the Python overhead of every gate is paid once per sweep.
+        Terminal measurements are ignored.
+
+        Args:
+            circuit (QuantumCircuit or Program): The parameterized quantum circuit.
+            parameter_values (dict): The values of each Parameter, as arrays of equal
+                length (scalars are shared by the whole sweep).
+
+        Returns:
+            np.ndarray: The final state vectors, of shape (batch, 2^n).
+        """
+        batch_size: int = max((np.size(value) for value in parameter_values.values()), default=1)
+        values: dict = {parameter: np.broadcast_to(value, (batch_size,)) for parameter, value in parameter_values.items()}
+        program: Program = self._as_program(circuit).bind(values)
+        if program.split is not None:
+            raise ValueError("Parameter sweeps do not support mid-circuit measurements or resets")
+        states: np.ndarray = np.zeros((batch_size, 2**program.num_qubits), dtype=self.dtype)
+        states[:, 0] = 1  # Initialize every state to |00...0>
+        self.execute(program, states, {}, skip_measurements=True)
+        return states
+
+    def expectation(self, circuit, observable, parameter_values: dict = None) -> float:
+        """
+        Computes the exact expectation value of an observable on the final state of a circuit.
+
+        Terminal measurements are ignored. On the mps backend the observable must
+        be a Pauli sum, and the value is exact up to the truncations of the state.
+
+        Args:
+            circuit (QuantumCircuit or Program): The quantum circuit.
+            observable: A PauliSum, a list of (coefficient, pauli) terms, a Hermitian
+                matrix or a diagonal (see :func:`observables.expectation_value`).
+            parameter_values (dict, optional): The value of each symbolic Parameter of the circuit.
+
+        Returns:
+            float: The expectation value.
+        """
+        if self.prune and isinstance(circuit, QuantumCircuit) and isinstance(observable, (PauliSum, list)):
+            observable = observable if isinstance(observable, PauliSum) else PauliSum(observable)
+            support: set = {qubit for _, pauli in observable.terms for qubit in pauli}
+            if support:
+                pruned, qubits = light_cone(circuit, support, measurements=False)
+                index: dict = {qubit: position for position, qubit in enumerate(qubits)}
+                observable = PauliSum([(coefficient, {index[qubit]: letter for qubit, letter in pauli.items()})
+                                       for coefficient, pauli in observable.terms])
+                circuit = pruned
+        if self._gate_backend(circuit) == "mps":
+            gates: list = self._bound_gates(circuit, parameter_values)
+            if _gate_layout(gates, circuit.get_num_qubits())[1] is not None:
+                raise ValueError("Expectation values do not support mid-circuit measurements or resets")
+            state: MatrixProductState = self._new_gate_state("mps", circuit.get_num_qubits())
+            for gate in gates:
+                if gate[0] != "Measure":
+                    state.apply(gate, {}, self._rng)
+            return state.expectation(observable)
+        parts: list = self._components(circuit)
+        if parts is not None:
+            factors: list = []
+            for qubits, part in parts:
+                program: Program = self._as_program(part, parameter_values)
+                if program.split is not None:
+                    raise ValueError("Expectation values do not support mid-circuit measurements or resets")
+                state: np.ndarray = self._initial_state(len(qubits))
+                self.execute(program, state, {}, skip_measurements=True)
+                factors.append((qubits, state))
+            return ProductState(circuit.get_num_qubits(), factors).expectation(observable)
+        program: Program = self._as_program(circuit, parameter_values)
+        if program.split is not None:
+            raise ValueError("Expectation values do not support mid-circuit measurements or resets")
+        state: np.ndarray = self._initial_state(program.num_qubits)
+        self.execute(program, state, {}, skip_measurements=True)
+        return expectation_value(observable, state, program.num_qubits)
+
+    def gradient(self, circuit, observable, parameter_values: dict) -> tuple[float, dict]:
+        """
+        Computes the expectation value of an observable and its gradient with respect to
+        every symbolic parameter, using the adjoint method (see :mod:`gradients`).
+
+        Args:
+            circuit (QuantumCircuit or Program): The parameterized quantum circuit.
+            observable: The observable (see :func:`observables.apply_observable`).
+            parameter_values (dict): The value of each Parameter.
+
+        Returns:
+            float, dict: The expectation value and the derivative with respect to each Parameter.
+        """
+        return adjoint_gradient(self, self._as_program(circuit), observable, parameter_values)
+
+    def execute(self, program: Program, state: np.ndarray, measurements: dict, start: int = 0, stop: int = None, skip_measurements: bool = False) -> None:
+        """
+        Applies the instructions of a compiled program to a state vector in place.
+
+        Args:
+            program (Program): The compiled program.
+            state (np.ndarray): The state vector.
+            measurements (dict): Receives the measurement outcomes, keyed by qubit.
+            start (int): The index of the first instruction to apply.
+            stop (int, optional): The index after the last instruction to apply.
+            skip_measurements (bool): Whether to leave out the measurement instructions.
+        """
+        if isinstance(state, np.memmap):
+            outofcore.execute(self, program, state, measurements, start, stop, skip_measurements)
+            return
+        if state.dtype != np.complex64:
+            self._execute(program, state, measurements, start, stop, skip_measurements)
+            return
+        stop = len(program) if stop is None else stop
+        for begin in range(start, stop, self.renormalize_interval):
+            self._execute(program, state, measurements, begin, min(begin + self.renormalize_interval, stop), skip_measurements)
+            kernels.renormalize(state)
+
+    def _execute(self, program: Program, state: np.ndarray, measurements: dict, start: int, stop: int, skip_measurements: bool) -> None:
+        """Applies the instructions ``start:stop`` of a program to a state vector in place."""
+        dispatch: tuple = self._dispatch
+        num_qubits: int = program.num_qubits
+        instructions = zip(program.opcodes[start:stop].tolist(), program.qubits[start:stop], program.operands[start:stop])
+        if self.profiler is not None:
+            self._execute_profiled(instructions, start, state, num_qubits, measurements, skip_measurements)
+            return
+        for opcode, qubits, operand in instructions:
+            if skip_measurements and opcode == OP_MEASURE:
+                continue
+            dispatch[opcode](state, qubits, operand, num_qubits, measurements)
+
+    def _execute_profiled(self, instructions, start: int, state: np.ndarray, num_qubits: int, measurements: dict, skip_measurements: bool) -> None:
+        """Applies instructions as :meth:`_execute` does, recording each one with the profiler."""
+        dispatch: tuple = self._dispatch
+        profiler: Profiler = self.profiler
+        for index, (opcode, qubits, operand) in enumerate(instructions, start):
+            if skip_measurements and opcode == OP_MEASURE:
+                continue
+            profiler.begin()
+            dispatch[opcode](state, qubits, operand, num_qubits, measurements)
+            profiler.end(index, opcode, qubits, operand, state)
+
+    def _gate_backend(self, circuit) -> str:
+        """Returns the backend simulating the circuit gate by gate ("stabilizer", "mps" or "sparse"), or None for the state vector."""
+        if self.backend == "statevector":
+            return None
+        if isinstance(circuit, Program):
+            if self.backend != "auto":
+                raise ValueError(f"The {self.backend} backend runs QuantumCircuits, not compiled Programs")
+            return None
+        if self.backend == "stabilizer" and not is_clifford(circuit):
+            raise ValueError("The stabilizer backend only supports circuits of Clifford gates")
+        if self.backend == "auto":
+            if circuit.get_num_qubits() <= self.auto_threshold:
+                return None
+            if is_reversible(circuit):
+                return "sparse"
+            return "stabilizer" if is_clifford(circuit) else None
+        return self.backend
+
+    def _new_gate_state(self, backend: str, num_qubits: int):
+        """Returns the |00...0> state of a gate-by-gate backend."""
+        if backend == "stabilizer":
+            return StabilizerTableau(num_qubits)
+        if backend == "sparse":
+            return SparseState(num_qubits)
+        return MatrixProductState(num_qubits, self.max_bond_dimension, self.truncation_error)
+
+    def _bound_gates(self, circuit: QuantumCircuit, parameter_values: dict = None) -> list:
+        """Returns the gates of a circuit with its symbolic parameters bound."""
+        if parameter_values is None and not circuit.get_parameters():
+            return circuit.get_gates()
+        return circuit.bind_parameters(parameter_values or {}).get_gates()
+
+    def _run_gates(self, backend: str, circuit: QuantumCircuit, shots: int = None, parameter_values: dict = None) -> tuple:
+        """Simulates a circuit gate by gate on a stabilizer, mps or sparse backend, as :meth:`run` does on a state vector."""
+        if shots is None:
+            state = self._new_gate_state(backend, circuit.get_num_qubits())
+            measurements = {}
+            for gate in self._bound_gates(circuit, parameter_values):
+                state.apply(gate, measurements, self._rng)
+            return state, measurements
+        state, outcomes = self._sample_gates(backend, circuit, shots, parameter_values)
+        return state, _counts(outcomes)
+
+    def _sample_gates(self, backend: str, circuit: QuantumCircuit, shots: int, parameter_values: dict = None) -> tuple:
+        """
+        Samples a circuit gate by gate on a stabilizer, mps or sparse backend and returns
+        the final state and the (shots, number of measured qubits) outcome array.
+
+        Terminal measurements are drawn for all shots at once from the final state;
+        otherwise each shot is re-simulated from the first measurement or reset.
+        """
+        gates: list = self._bound_gates(circuit, parameter_values)
+        num_qubits: int = circuit.get_num_qubits()
+        measured, split = _gate_layout(gates, num_qubits)
+        state = self._new_gate_state(backend, num_qubits)
+        if split is None:
+            for gate in gates:
+                if gate[0] != "Measure":
+                    state.apply(gate, {}, self._rng)
+            return state, state.sample(measured, shots, self._rng)
+        for gate in gates[:split]:
+            state.apply(gate, {}, self._rng)
+        outcomes: np.ndarray = np.zeros((shots, len(measured)), dtype=np.uint8)
+        shot_state = state
+        for shot in range(shots):
+            shot_state = state.copy()
+            measurements = {}
+            for gate in gates[split:]:
+                shot_state.apply(gate, measurements, self._rng)
+            outcomes[shot] = [measurements[qubit] for qubit in measured]
+        return shot_state, outcomes
+
+    def _sample_noisy(self, circuit: QuantumCircuit, shots: int, parameter_values: dict = None) -> np.ndarray:
+        """Samples a circuit with noise channels by batched trajectories and returns the outcome array."""
+        return sample_trajectories(self, self._bound_gates(circuit, parameter_values), circuit.get_num_qubits(), shots)[1]
+
+    def _prune_measured(self, circuit) -> QuantumCircuit:
+        """Returns a circuit cut down to the light cone of its measurements, or None if nothing can be pruned."""
+        if not self.prune or isinstance(circuit, Program):
+            return None
+        if not any(gate[0] == "Measure" for gate in circuit.get_gates()):
+            return None  # Every qubit is an output
+        pruned, qubits = light_cone(circuit)
+        if len(qubits) == circuit.get_num_qubits() and len(pruned.gates) == len(circuit.get_gates()):
+            return None
+        return pruned
+
+    def _components(self, circuit, factored: bool = True) -> list:
+        """
+        Returns the (qubits, circuit) parts of a circuit made of independent qubit groups,
+        or None if it is connected or its full state would have to be memory-mapped.
+        """
+        if isinstance(circuit, Program) or circuit.get_num_qubits() < 2:
+            return None
+        if not factored and self.out_of_core is not None and circuit.get_num_qubits() >= self.out_of_core_threshold:
+            return None  # Multiplying the parts out would build the full state in RAM
+        parts: list = split_circuit(circuit)
+        return parts if len(parts) > 1 else None
+
+    def _run_components(self, circuit: QuantumCircuit, parts: list, shots: int = None, parameter_values: dict = None) -> tuple[ProductState, dict]:
+        """Simulates each independent part of a circuit on its own state vector, as :meth:`run` does on the whole."""
+        if shots is not None:
+            state, outcomes = self._sample_components(circuit, parts, shots, parameter_values)
+            return state, _counts(outcomes)
+        factors: list = []
+        measurements = {}
+        for qubits, part in parts:
+            program: Program = self._as_program(part, parameter_values)
+            state: np.ndarray = self._initial_state(len(qubits))
+            part_measurements = {}
+            self.execute(program, state, part_measurements)
+            measurements.update((qubits[qubit], outcome) for qubit, outcome in part_measurements.items())
+            factors.append((qubits, state))
+        return ProductState(circuit.get_num_qubits(), factors), measurements
+
+    def _sample_components(self, circuit: QuantumCircuit, parts: list, shots: int, parameter_values: dict = None) -> tuple[ProductState, np.ndarray]:
+        """
+        Samples each independent part of a circuit on its own state vector and returns
+        the product state and the outcome array of the whole circuit.
+
+        The parts are uncorrelated, so the outcome columns of independently drawn
+        shots can simply be placed side by side.
+        """
+        measures_any: bool = any(gate[0] == "Measure" for gate in circuit.get_gates())
+        factors: list = []
+        columns = {}  # Outcome column of each measured qubit
+        for qubits, part in parts:
+            program: Program = self._as_program(part, parameter_values)
+            if measures_any and OP_MEASURE not in program.opcodes:
+                state: np.ndarray = self._initial_state(len(qubits))
+                self.execute(program, state, {})  # Unmeasured part: only its state is needed
+            else:
+                state, outcomes = self._sample_program(program, shots)
+                for column, qubit in enumerate(program.measured):
+                    columns[qubits[qubit]] = outcomes[:, column]
+            factors.append((qubits, state))
+        outcomes: np.ndarray = np.zeros((shots, len(columns)), dtype=np.uint8)
+        for column, qubit in enumerate(sorted(columns)):
+            outcomes[:, column] = columns[qubit]
+        return ProductState(circuit.get_num_qubits(), factors), outcomes
+
+    def _sample_program(self, program: Program, shots: int) -> tuple[np.ndarray, np.ndarray]:
+        """Samples a program as :meth:`sample` does and returns the final state and the outcome array."""
+        state: np.ndarray = self._initial_state(program.num_qubits)
+        measured: tuple = program.measured
+        if program.split is None:
+            if isinstance(state, np.memmap):
+                outcomes, hits = self._terminal_outcomes(state, program, shots)
+                indices: np.ndarray = self._rng.permutation(np.repeat(outcomes, hits))
+            else:
+                probabilities: np.ndarray = self._terminal_probabilities(state, program)
+                indices: np.ndarray = self._rng.choice(len(probabilities), size=shots, p=probabilities)
+            shifts: np.ndarray = np.arange(len(measured) - 1, -1, -1)
+            return state, ((indices[:, None] >> shifts) & 1).astype(np.uint8)
+        outcomes: np.ndarray = np.zeros((shots, len(measured)), dtype=np.uint8)
+        final_state: np.ndarray = state
+        for shot, (final_state, measurements) in enumerate(self._resimulate(state, program, shots)):
+            outcomes[shot] = [measurements[qubit] for qubit in measured]
+        return final_state, outcomes
+
+    def _as_program(self, circuit, parameter_values: dict = None) -> Program:
+        """Returns the program of a circuit, compiling it if needed, with its parameters bound if values are given."""
+        program: Program = circuit.astype(self.dtype) if isinstance(circuit, Program) else self.compile(circuit)
+        if parameter_values is None:
+            return program
+        if any(np.ndim(value) for value in parameter_values.values()):
+            raise ValueError("Parameter values must be scalars; use run_sweep for arrays of values")
+        return program.bind(parameter_values)
+
+    def _initial_state(self, num_qubits: int) -> np.ndarray:
+        """Returns the state vector of |00...0>, memory-mapped if it is large and out_of_core is set."""
+        if self.out_of_core is not None and num_qubits >= self.out_of_core_threshold:
+            state: np.ndarray = outofcore.create_state(num_qubits, self.dtype, self.out_of_core)
         else:
-            outcome: int = 1
-
-        # 4. Collapse the state vector
-        self._collapse_state(state, qubit, outcome, num_qubits)
-
-        return outcome
-
-    def _collapse_state(self, state: np.ndarray, qubit: int, outcome: int, num_qubits: int) -> None:
-        """Collapses the state vector based on the measurement outcome."""
-        for i in range(2**num_qubits):
-            if ((i >> (num_qubits - 1 - qubit)) & 1) != outcome:
-                state[i] = 0  # Set amplitude to 0 if qubit is not the measured outcome
-        # Normalize the state vector
-        norm: float = np.linalg.norm(state)
-        if norm > 0:
-            state[:] = state / norm
-
-    def _apply_gate(self, state: np.ndarray, gate_matrix: np.ndarray, qubit: int, num_qubits: int) -> None:
-        """Applies a single-qubit gate to the state vector."""
-        gate: np.ndarray = np.eye(2**num_qubits, dtype=complex)
-        for i in range(2):
-            for j in range(2):
-                gate[i::2**(qubit+1), j::2**(qubit+1)] = gate_matrix[i, j]
-        state[:] = gate @ state
-
-    def _apply_controlled_gate(self, state: np.ndarray, gate_matrix: np.ndarray, control_qubit: int, target_qubit: int, num_qubits: int) -> None:
-        """Applies a controlled gate to the state vector."""
-        control_bit: int = 1 << (num_qubits - 1 - control_qubit)
-        target_bit: int = 1 << (num_qubits - 1 - target_qubit)
-        for i in range(2**num_qubits):
-            if (i & control_bit) != 0:
-                control_state: int = (i & target_bit) >> (num_qubits - 1 - target_qubit)
-                target_state: int = (i & ~target_bit)
-                target_state = (i & target_bit) >> (num_qubits - 1 - target_qubit)
-                new_state: np.ndarray = np.zeros(4, dtype=complex)
-                for j in range(4):
-                    new_state[j] = gate_matrix[j, 2 * control_state + target_state]
-                for j in range(4):
-                    if (j & 1) == target_state:
-                        state[i & ~target_bit | ((j & 1) << (num_qubits - 1 - target_qubit))] = new_state[j]
-
-    def _apply_two_qubit_gate(self, state: np.ndarray, gate_matrix: np.ndarray, qubit1: int, qubit2: int, num_qubits: int) -> None:
-        """Applies a two-qubit gate to the state vector."""
-        gate: np.ndarray = np.eye(2**num_qubits, dtype=complex)
-        for i in range(4):
-            for j in range(4):
-                gate[i::2**(min(qubit1, qubit2)+1), j::2**(min(qubit1, qubit2)+1)] = gate_matrix[i, j]
-        state[:] = gate @ state
-
-    def _apply_three_qubit_gate(self, state: np.ndarray, gate_matrix: np.ndarray, qubit1: int, qubit2: int, qubit3: int, num_qubits: int) -> None:
-        """Applies a three-qubit gate to the state vector."""
-        gate: np.ndarray = np.eye(2**num_qubits, dtype=complex)
-        for i in range(8):
-            for j in range(8):
-                gate[i::2**(min(qubit1, qubit2, qubit3)+1), j::2**(min(qubit1, qubit2, qubit3)+1)] = gate_matrix[i, j]
-        state[:] = gate @ state
\ No newline at end of file
+            state: np.ndarray = np.zeros(2**num_qubits, dtype=self.dtype)
+        state[0] = 1  # Initialize to |00...0>
+        return state
+
+    def _run_shots(self, state: np.ndarray, program: Program, shots: int) -> tuple[np.ndarray, dict]:
+        """Samples the program ``shots`` times and returns the state and the bitstring counts."""
+        measured: tuple = program.measured
+        counts = {}
+        if program.split is None:
+            for index, count in zip(*self._terminal_outcomes(state, program, shots)):
+                counts[format(index, f"0{len(measured)}b")] = int(count)
+            return state, counts
+        final_state: np.ndarray = state
+        for final_state, measurements in self._resimulate(state, program, shots):
+            bitstring: str = "".join(str(measurements[qubit]) for qubit in measured)
+            counts[bitstring] = counts.get(bitstring, 0) + 1
+        return final_state, counts
+
+    def _terminal_probabilities(self, state: np.ndarray, program: Program) -> np.ndarray:
+        """Evolves a program with terminal measurements and returns the outcome distribution of its measured qubits."""
+        self.execute(program, state, {}, skip_measurements=True)
+        probabilities: np.ndarray = kernels.marginal_probabilities(state, program.measured, program.num_qubits).astype(float)
+        return probabilities / probabilities.sum()
+
+    def _terminal_outcomes(self, state: np.ndarray, program: Program, shots: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evolves a program with terminal measurements and draws ``shots`` outcomes of its
+        measured qubits, returned as the distinct outcome indices and their counts.
+
+        Memory-mapped states are sampled chunk by chunk (see :func:`outofcore.sample`),
+        without building the 2^k outcome distribution.
+        """
+        if isinstance(state, np.memmap):
+            self.execute(program, state, {}, skip_measurements=True)
+            return outofcore.sample(state, program.measured, program.num_qubits, self.chunk_qubits, shots, self._rng)
+        counts: np.ndarray = self._rng.multinomial(shots, self._terminal_probabilities(state, program))
+        outcomes: np.ndarray = np.flatnonzero(counts)
+        return outcomes, counts[outcomes]
+
+    def _resimulate(self, state: np.ndarray, program: Program, shots: int):
+        """
+        Evolves the state up to the program's split point once, then yields the
+        final state and the measurements of each shot simulated from there.
+        """
+        self.execute(program, state, {}, stop=program.split)
+        for _ in range(shots):
+            if isinstance(state, np.memmap):
+                shot_state: np.ndarray = outofcore.copy_state(state, self.chunk_qubits, self.out_of_core)
+            else:
+                shot_state: np.ndarray = state.copy()
+            measurements = {}
+            self.execute(program, shot_state, measurements, start=program.split)
+            yield shot_state, measurements
+
+    def _apply_blocks(self, state: np.ndarray, qubits: tuple, num_qubits: int, kernel) -> None:
+        """
+        Calls ``kernel(state, qubits, num_qubits)``, split over the thread pool into
+        independent blocks of the state when it is large enough.
+        """
+        if self._pool is None or state.ndim != 1 or num_qubits < self.parallel_threshold:
+            kernel(state, qubits, num_qubits)
+            return
+        blocks: list = parallel.split_blocks(state, qubits, num_qubits, self.num_threads)
+        if blocks is None:
+            kernel(state, qubits, num_qubits)
+            return
+        for future in [self._pool.submit(kernel, *block) for block in blocks]:
+            future.result()
+
+    def _apply_matrix(self, state: np.ndarray, qubits: tuple, matrix: np.ndarray, num_qubits: int, measurements: dict) -> None:
+        """Applies a gate given by its full matrix."""
+        self._apply_blocks(state, qubits, num_qubits, lambda psi, qubits, n: kernels.apply_matrix(psi, matrix, qubits, n))
+
+    def _apply_diagonal(self, state: np.ndarray, qubits: tuple, diagonal: np.ndarray, num_qubits: int, measurements: dict) -> None:
+        """Applies a diagonal gate."""
+        self._apply_blocks(state, qubits, num_qubits, lambda psi, qubits, n: kernels.apply_diagonal(psi, diagonal, qubits, n))
+
+    def _apply_phases(self, state: np.ndarray, qubits: tuple, phases: kernels.PhaseAccumulator, num_qubits: int, measurements: dict) -> None:
+        """Applies a run of diagonal gates folded at compile time."""
+        if self._pool is None or state.ndim != 1 or num_qubits < self.parallel_threshold or phases.phases is None:
+            phases.apply(state)
+            return
+        blocks: list = parallel.split_phases(state, phases.phases, num_qubits, self.num_threads)
+        for future in [self._pool.submit(np.multiply, block, factor, out=block) for block, factor in blocks]:
+            future.result()
+
+    def _apply_flip(self, state: np.ndarray, qubits: tuple, operand, num_qubits: int, measurements: dict) -> None:
+        """Applies an X, CNOT or CCX gate."""
+        self._apply_blocks(state, qubits, num_qubits, lambda psi, qubits, n: kernels.apply_controlled_x(psi, qubits[:-1], qubits[-1], n))
+
+    def _apply_swap(self, state: np.ndarray, qubits: tuple, operand, num_qubits: int, measurements: dict) -> None:
+        """Applies a SWAP or CSWAP gate."""
+        self._apply_blocks(state, qubits, num_qubits, lambda psi, qubits, n: kernels.apply_swap(psi, qubits[-2], qubits[-1], n, controls=qubits[:-2]))
+
+    def _apply_controlled(self, state: np.ndarray, qubits: tuple, matrix: np.ndarray, num_qubits: int, measurements: dict) -> None:
+        """Applies a controlled gate, given the matrix acting on its target."""
+        self._apply_blocks(state, qubits, num_qubits, lambda psi, qubits, n: kernels.apply_controlled(psi, matrix, qubits[:-1], qubits[-1:], n))
+
+    def _apply_measure(self, state: np.ndarray, qubits: tuple, operand, num_qubits: int, measurements: dict) -> None:
+        """Measures the given qubits jointly and records the outcomes."""
+        measurements.update(zip(qubits, kernels.measure(state, qubits, num_qubits, self._rng)))
+
+    def _apply_reset(self, state: np.ndarray, qubits: tuple, operand, num_qubits: int, measurements: dict) -> None:
+        """Resets a qubit to |0> by measuring it and flipping it back if it was |1>."""
+        if kernels.measure(state, qubits, num_qubits, self._rng)[0]:
+            kernels.apply_controlled_x(state, (), qubits[0], num_qubits)
+
+
+def _gate_layout(gates: list, num_qubits: int) -> tuple[tuple, int]:
+    """Returns the measured qubits and the split point of a gate list, as compiler._measurement_layout does for a program."""
+    opcodes: list = [OP_MEASURE if gate[0] == "Measure" else OP_RESET if gate[0] == "Reset" else -1 for gate in gates]
+    return _measurement_layout(opcodes, [gate_qubits(gate) for gate in gates], num_qubits)
+
+
+def _counts(outcomes: np.ndarray) -> dict:
+    """Returns the counts of the distinct rows of a (shots, bits) outcome array, keyed by bitstring."""
+    counts = {}
+    if len(outcomes):
+        rows, row_counts = np.unique(outcomes, axis=0, return_counts=True)
+        for row, count in zip(rows, row_counts):
+            counts["".join(map(str, row))] = int(count)
+    return counts
@@ -0,0 +1,259 @@
+"""
+Defines the sparse backend, which simulates circuits whose state has few nonzero amplitudes.
+
+The state is stored as parallel arrays of basis indices and amplitudes. Bit
+flips and swaps, the gates of classical-reversible circuits, only rewrite the
+index array with vectorized bit operations, so a basis state passes through
+them in O(1) work per gate whatever the number of qubits. Gates that are a
+permutation with phases (Y, Z, S, CZ, ...) also keep the support; branching
+gates such as H spread each amplitude over several indices. Once the support
+is large enough that a dense vector is cheaper, the state switches to one.
+"""
+
+import numpy as np
+from .quantum_circuit import gate_qubits
+from .gates import GATE_KINDS, gate_unitary
+from . import kernels
+
+# Gates that permute basis states; circuits of only these gates keep a single nonzero amplitude
+PERMUTATION_GATES = ("I", "X", "CNOT", "CCX", "SWAP", "CSWAP")
+
+
+def is_reversible(circuit) -> bool:
+    """
+    Returns whether a circuit is classical-reversible: permutation gates and measurements only.
+
+    Args:
+        circuit (QuantumCircuit): The quantum circuit.
+
+    Returns:
+        bool: True if every gate is in PERMUTATION_GATES, Measure or Reset.
+    """
+    return all(gate[0] in PERMUTATION_GATES or gate[0] in ("Measure", "Reset") for gate in circuit.get_gates())
+
+
+class SparseState:
+    """
+    Represents an n-qubit state by its nonzero amplitudes, falling back to a dense vector.
+
+    Attributes:
+        indices (np.ndarray): The basis indices with a nonzero amplitude (qubit 0
+            being the most significant bit), or None once the state is dense.
+        amplitudes (np.ndarray): The amplitude of each index, or the dense state vector.
+    """
+
+    tolerance: float = 1e-12  # Amplitudes smaller than this after a branching gate are dropped
+    dense_fraction: float = 1 / 16  # Switch to a dense vector once this fraction of the 2^n amplitudes is nonzero
+
+    def __init__(self, num_qubits: int) -> None:
+        """
+        Initializes the sparse state |00...0>.
+
+        Args:
+            num_qubits (int): The number of qubits, at most 63.
+        """
+        if num_qubits > 63:
+            raise ValueError("The sparse backend supports at most 63 qubits")
+        self.num_qubits = num_qubits
+        self.indices = np.zeros(1, dtype=np.int64)
+        self.amplitudes = np.ones(1, dtype=complex)
+
+    def copy(self) -> "SparseState":
+        """
+        Returns an independent copy of the state.
+
+        Returns:
+            SparseState: The copy.
+        """
+        state: SparseState = SparseState.__new__(SparseState)
+        state.num_qubits = self.num_qubits
+        state.indices = None if self.indices is None else self.indices.copy()
+        state.amplitudes = self.amplitudes.copy()
+        return state
+
+    def is_dense(self) -> bool:
+        """
+        Returns whether the state has switched to a dense vector.
+
+        Returns:
+            bool: True once the state is stored densely.
+        """
+        return self.indices is None
+
+    def __len__(self) -> int:
+        """Returns the number of stored amplitudes."""
+        return len(self.amplitudes)
+
+    def _bit(self, qubit: int) -> int:
+        """Returns the mask of a qubit's bit in a basis index."""
+        return 1 << (self.num_qubits - 1 - qubit)
+
+    def apply(self, gate: tuple, measurements: dict, rng: np.random.Generator) -> None:
+        """
+        Applies a gate tuple, as stored in QuantumCircuit.gates.
+
+        Args:
+            gate (tuple): The gate; symbolic parameters must be bound.
+            measurements (dict): Receives the measurement outcomes, keyed by qubit.
+            rng (np.random.Generator): The source of measurement randomness.
+        """
+        gate_type: str = gate[0]
+        qubits: tuple = tuple(gate_qubits(gate))
+        if gate_type == "Measure":
+            for qubit in qubits:
+                measurements[qubit] = self.measure(qubit, rng)
+            return
+        if gate_type == "Reset":
+            if self.measure(qubits[0], rng):
+                self.flip((), qubits[0])
+            return
+        kind, num_controls = GATE_KINDS[gate_type]
+        if kind == "flip":
+            self.flip(qubits[:num_controls], qubits[-1])
+        elif kind == "swap":
+            self.swap(qubits[:num_controls], qubits[-2], qubits[-1])
+        elif gate_type != "I":
+            self.apply_matrix(gate_unitary(gate), qubits)
+
+    def flip(self, controls: tuple, target: int) -> None:
+        """
+        Applies a (multi-)controlled bit flip by rewriting the indices.
+
+        Args:
+            controls (tuple): The control qubits.
+            target (int): The target qubit.
+        """
+        if self.is_dense():
+            kernels.apply_controlled_x(self.amplitudes, controls, target, self.num_qubits)
+            return
+        control_mask: int = sum(self._bit(control) for control in controls)
+        active: np.ndarray = (self.indices & control_mask) == control_mask
+        self.indices ^= active * self._bit(target)
+
+    def swap(self, controls: tuple, qubit1: int, qubit2: int) -> None:
+        """
+        Applies a (controlled) swap by rewriting the indices.
+
+        Args:
+            controls (tuple): The control qubits.
+            qubit1 (int): The first swapped qubit.
+            qubit2 (int): The second swapped qubit.
+        """
+        if self.is_dense():
+            kernels.apply_swap(self.amplitudes, qubit1, qubit2, self.num_qubits, controls=controls)
+            return
+        control_mask: int = sum(self._bit(control) for control in controls)
+        bit1, bit2 = self._bit(qubit1), self._bit(qubit2)
+        active: np.ndarray = ((self.indices & control_mask) == control_mask) & (((self.indices & bit1) == 0) != ((self.indices & bit2) == 0))
+        self.indices ^= active * (bit1 | bit2)
+
+    def apply_matrix(self, matrix: np.ndarray, qubits: tuple) -> None:
+        """
+        Applies a k-qubit matrix to the given qubits.
+
+        A matrix with one nonzero entry per column only relabels and rephases the
+        stored amplitudes; any other matrix maps each amplitude to up to 2^k new
+        ones, which are then merged by index.
+
+        Args:
+            matrix (np.ndarray): The 2^k x 2^k gate matrix, ``qubits[0]`` being the
+                most significant bit.
+            qubits (tuple): The indices of the qubits.
+        """
+        if self.is_dense():
+            kernels.apply_matrix(self.amplitudes, matrix, qubits, self.num_qubits)
+            return
+        matrix = np.asarray(matrix)
+        k: int = len(qubits)
+        bits: list = [self._bit(qubit) for qubit in qubits]
+        # patterns[j] is the index bits of local basis state j, qubits[0] being its most significant bit
+        patterns: np.ndarray = np.array([sum(bit for position, bit in enumerate(bits) if (j >> (k - 1 - position)) & 1) for j in range(2**k)], dtype=np.int64)
+        local: np.ndarray = np.zeros(len(self.indices), dtype=np.int64)
+        for bit in bits:
+            local = (local << 1) | ((self.indices & bit) != 0)
+        base: np.ndarray = self.indices & ~int(patterns[-1])
+        nonzero: np.ndarray = matrix != 0
+        if np.all(nonzero.sum(axis=0) == 1):
+            rows: np.ndarray = np.argmax(nonzero, axis=0)
+            self.amplitudes = self.amplitudes * matrix[rows, np.arange(2**k)][local]
+            self.indices = base | patterns[rows[local]]
+            return
+        indices: np.ndarray = (base[:, None] | patterns[None, :]).ravel()
+        amplitudes: np.ndarray = (matrix[:, local].T * self.amplitudes[:, None]).ravel()
+        keep: np.ndarray = np.abs(amplitudes) > self.tolerance
+        indices, inverse = np.unique(indices[keep], return_inverse=True)
+        merged: np.ndarray = np.zeros(len(indices), dtype=complex)
+        np.add.at(merged, inverse.ravel(), amplitudes[keep])
+        keep = np.abs(merged) > self.tolerance
+        self.indices, self.amplitudes = indices[keep], merged[keep]
+        if len(self.indices) > self.dense_fraction * 2**self.num_qubits:
+            self.amplitudes = self.to_statevector()
+            self.indices = None
+
+    def measure(self, qubit: int, rng: np.random.Generator) -> int:
+        """
+        Measures a qubit in the computational basis and collapses the state.
+
+        Args:
+            qubit (int): The index of the qubit.
+            rng (np.random.Generator): The source of randomness.
+
+        Returns:
+            int: The outcome bit.
+        """
+        if self.is_dense():
+            return kernels.measure(self.amplitudes, (qubit,), self.num_qubits, rng)[0]
+        probabilities: np.ndarray = np.abs(self.amplitudes)**2
+        ones: np.ndarray = (self.indices & self._bit(qubit)) != 0
+        total: float = probabilities.sum()
+        outcome: int = int(rng.random() * total < probabilities[ones].sum())
+        kept: np.ndarray = ones if outcome else ~ones
+        self.indices = self.indices[kept]
+        self.amplitudes = self.amplitudes[kept] / np.sqrt(probabilities[kept].sum())
+        return outcome
+
+    def sample(self, qubits, shots: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Samples terminal measurements of the given qubits without collapsing the state.
+
+        Args:
+            qubits (sequence of int): The measured qubits, one column each.
+            shots (int): The number of shots.
+            rng (np.random.Generator): The source of randomness.
+
+        Returns:
+            np.ndarray: An array of shape (shots, len(qubits)) with the outcome bits.
+        """
+        probabilities: np.ndarray = np.abs(self.amplitudes)**2
+        drawn: np.ndarray = rng.choice(len(probabilities), size=shots, p=probabilities / probabilities.sum())
+        indices: np.ndarray = drawn if self.is_dense() else self.indices[drawn]
+        shifts: np.ndarray = np.array([self.num_qubits - 1 - qubit for qubit in qubits], dtype=np.int64)
+        return ((indices[:, None] >> shifts) & 1).astype(np.uint8)
+
+    def amplitude(self, bits) -> complex:
+        """
+        Returns the amplitude of a computational basis state.
+
+        Args:
+            bits (str or sequence of int): The bit of each qubit, qubit 0 first (e.g. "0110").
+
+        Returns:
+            complex: The amplitude.
+        """
+        index: int = int("".join(str(int(bit)) for bit in bits), 2)
+        if self.is_dense():
+            return complex(self.amplitudes[index])
+        return complex(self.amplitudes[self.indices == index].sum())
+
+    def to_statevector(self) -> np.ndarray:
+        """
+        Returns the dense state vector; only feasible for few qubits.
+
+        Returns:
+            np.ndarray: The 2^n amplitudes, qubit 0 being the most significant bit.
+        """
+        if self.is_dense():
+            return self.amplitudes.copy()
+        state: np.ndarray = np.zeros(2**self.num_qubits, dtype=complex)
+        np.add.at(state, self.indices, self.amplitudes)
+        return state
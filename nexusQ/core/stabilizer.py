@@ -0,0 +1,302 @@
+"""
+Defines the stabilizer-tableau backend, which simulates Clifford circuits in polynomial time.
+
+An n-qubit stabilizer state is stored as the Aaronson-Gottesman tableau of its
+n destabilizer and n stabilizer generators. Each generator is a Pauli string
+kept as two bit rows (its X and Z parts) packed eight qubits per byte, plus a
+sign bit. A gate updates one or two bit columns of every row at once, and a
+measurement multiplies whole packed rows together, so memory is O(n^2) bits
+and a gate costs O(n).
+"""
+
+import numpy as np
+
+# Gates the tableau can apply; a circuit made only of these is simulated without a state vector
+CLIFFORD_GATES = ("I", "H", "X", "Y", "Z", "S", "CNOT", "CZ", "CY", "SWAP", "Measure", "Reset")
+
+# Tableau method applying each unitary Clifford gate
+_GATE_METHODS = {"H": "h", "X": "x_gate", "Y": "y_gate", "Z": "z_gate", "S": "s",
+                 "CNOT": "cnot", "CZ": "cz", "CY": "cy", "SWAP": "swap"}
+
+_POPCOUNT: np.ndarray = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+_SAMPLE_CHUNK: int = 1 << 22  # Outcome bits drawn per vectorized step of StabilizerTableau.sample
+
+
+def is_clifford(circuit) -> bool:
+    """
+    Returns whether a circuit only uses gates of the stabilizer backend.
+
+    Args:
+        circuit (QuantumCircuit): The quantum circuit.
+
+    Returns:
+        bool: True if every gate is in CLIFFORD_GATES.
+    """
+    return all(gate[0] in CLIFFORD_GATES for gate in circuit.get_gates())
+
+
+class StabilizerTableau:
+    """
+    Represents an n-qubit stabilizer state as a bit-packed Aaronson-Gottesman tableau.
+
+    Rows 0..n-1 are the destabilizers and rows n..2n-1 the stabilizers. A Pauli
+    letter is encoded by its (x, z) bits: I = (0, 0), X = (1, 0), Z = (0, 1) and
+    Y = (1, 1).
+    """
+    def __init__(self, num_qubits: int) -> None:
+        """
+        Initializes the tableau of |00...0>.
+
+        Args:
+            num_qubits (int): The number of qubits.
+        """
+        self.num_qubits = num_qubits
+        num_bytes: int = (num_qubits + 7) // 8
+        self.x = np.zeros((2 * num_qubits, num_bytes), dtype=np.uint8)
+        self.z = np.zeros((2 * num_qubits, num_bytes), dtype=np.uint8)
+        self.r = np.zeros(2 * num_qubits, dtype=np.uint8)  # Sign bits, 1 meaning -1
+        for qubit in range(num_qubits):
+            self.x[qubit, qubit >> 3] = 1 << (qubit & 7)  # Destabilizer X_q
+            self.z[num_qubits + qubit, qubit >> 3] = 1 << (qubit & 7)  # Stabilizer Z_q
+
+    def copy(self) -> "StabilizerTableau":
+        """
+        Returns an independent copy of the tableau.
+
+        Returns:
+            StabilizerTableau: The copy.
+        """
+        tableau: StabilizerTableau = StabilizerTableau.__new__(StabilizerTableau)
+        tableau.num_qubits = self.num_qubits
+        tableau.x, tableau.z, tableau.r = self.x.copy(), self.z.copy(), self.r.copy()
+        return tableau
+
+    def apply(self, gate: tuple, measurements: dict, rng: np.random.Generator) -> None:
+        """
+        Applies a gate tuple, as stored in QuantumCircuit.gates.
+
+        Args:
+            gate (tuple): The gate; its type must be in CLIFFORD_GATES.
+            measurements (dict): Receives the measurement outcomes, keyed by qubit.
+            rng (np.random.Generator): The source of measurement randomness.
+        """
+        gate_type: str = gate[0]
+        if gate_type == "Measure":
+            for qubit in gate[1:]:
+                measurements[qubit] = self.measure(qubit, rng)
+        elif gate_type == "Reset":
+            self.reset(gate[1], rng)
+        elif gate_type in _GATE_METHODS:
+            getattr(self, _GATE_METHODS[gate_type])(*gate[1:])
+        elif gate_type != "I":
+            raise ValueError(f"Gate {gate_type} is not a Clifford gate supported by the stabilizer backend")
+
+    def _column(self, table: np.ndarray, qubit: int) -> np.ndarray:
+        """Returns the bit of every row of ``table`` for the given qubit."""
+        return (table[:, qubit >> 3] >> (qubit & 7)) & 1
+
+    def _flip(self, table: np.ndarray, qubit: int, bits: np.ndarray) -> None:
+        """Flips the bit of the given qubit in the rows of ``table`` where ``bits`` is 1."""
+        table[:, qubit >> 3] ^= bits << (qubit & 7)
+
+    def h(self, qubit: int) -> None:
+        """Applies a Hadamard gate: X <-> Z."""
+        x: np.ndarray = self._column(self.x, qubit)
+        z: np.ndarray = self._column(self.z, qubit)
+        self.r ^= x & z
+        self._flip(self.x, qubit, x ^ z)
+        self._flip(self.z, qubit, x ^ z)
+
+    def s(self, qubit: int) -> None:
+        """Applies a Phase gate: X -> Y."""
+        x: np.ndarray = self._column(self.x, qubit)
+        self.r ^= x & self._column(self.z, qubit)
+        self._flip(self.z, qubit, x)
+
+    def x_gate(self, qubit: int) -> None:
+        """Applies a Pauli-X gate, negating the generators with Z or Y on the qubit."""
+        self.r ^= self._column(self.z, qubit)
+
+    def y_gate(self, qubit: int) -> None:
+        """Applies a Pauli-Y gate, negating the generators with X or Z on the qubit."""
+        self.r ^= self._column(self.x, qubit) ^ self._column(self.z, qubit)
+
+    def z_gate(self, qubit: int) -> None:
+        """Applies a Pauli-Z gate, negating the generators with X or Y on the qubit."""
+        self.r ^= self._column(self.x, qubit)
+
+    def cnot(self, control: int, target: int) -> None:
+        """Applies a CNOT gate: X_c -> X_c X_t and Z_t -> Z_c Z_t."""
+        x_control: np.ndarray = self._column(self.x, control)
+        z_control: np.ndarray = self._column(self.z, control)
+        x_target: np.ndarray = self._column(self.x, target)
+        z_target: np.ndarray = self._column(self.z, target)
+        self.r ^= x_control & z_target & (x_target ^ z_control ^ 1)
+        self._flip(self.x, target, x_control)
+        self._flip(self.z, control, z_target)
+
+    def cz(self, control: int, target: int) -> None:
+        """Applies a CZ gate, as H CNOT H on the target."""
+        self.h(target)
+        self.cnot(control, target)
+        self.h(target)
+
+    def cy(self, control: int, target: int) -> None:
+        """Applies a CY gate, as S CNOT S^dagger on the target."""
+        self.z_gate(target)
+        self.s(target)
+        self.cnot(control, target)
+        self.s(target)
+
+    def swap(self, qubit1: int, qubit2: int) -> None:
+        """Applies a SWAP gate by exchanging the two qubit columns."""
+        for table in (self.x, self.z):
+            difference: np.ndarray = self._column(table, qubit1) ^ self._column(table, qubit2)
+            self._flip(table, qubit1, difference)
+            self._flip(table, qubit2, difference)
+
+    def measure(self, qubit: int, rng: np.random.Generator) -> int:
+        """
+        Measures a qubit in the computational basis and collapses the tableau.
+
+        Args:
+            qubit (int): The index of the qubit.
+            rng (np.random.Generator): The source of randomness for a random outcome.
+
+        Returns:
+            int: The outcome bit.
+        """
+        num_qubits: int = self.num_qubits
+        x: np.ndarray = self._column(self.x, qubit)
+        anticommuting: np.ndarray = np.flatnonzero(x[num_qubits:])
+        if anticommuting.size == 0:
+            # Deterministic: Z_q is the product of the stabilizers paired with the destabilizers that anticommute with it
+            rows: np.ndarray = num_qubits + np.flatnonzero(x[:num_qubits])
+            return int(_product(self.x[rows], self.z[rows], self.r[rows])[2])
+
+        # Random: every other generator anticommuting with Z_q is multiplied by stabilizer p to commute with it
+        pivot: int = num_qubits + int(anticommuting[0])
+        rows: np.ndarray = np.flatnonzero(x)
+        rows = rows[rows != pivot]
+        self.x[rows], self.z[rows], self.r[rows] = _multiply(self.x[pivot], self.z[pivot], self.r[pivot],
+                                                             self.x[rows], self.z[rows], self.r[rows])
+        destabilizer: int = pivot - num_qubits
+        self.x[destabilizer], self.z[destabilizer], self.r[destabilizer] = self.x[pivot], self.z[pivot], self.r[pivot]
+        outcome: int = int(rng.integers(2))
+        self.x[pivot] = 0
+        self.z[pivot] = 0
+        self.z[pivot, qubit >> 3] = 1 << (qubit & 7)
+        self.r[pivot] = outcome
+        return outcome
+
+    def reset(self, qubit: int, rng: np.random.Generator) -> None:
+        """
+        Resets a qubit to |0> by measuring it and flipping it back if it was |1>.
+
+        Args:
+            qubit (int): The index of the qubit.
+            rng (np.random.Generator): The source of randomness for the measurement.
+        """
+        if self.measure(qubit, rng):
+            self.x_gate(qubit)
+
+    def sample(self, qubits, shots: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Samples terminal measurements of the given qubits without collapsing the tableau.
+
+        The Z-basis outcomes of a stabilizer state are uniform over an affine space:
+        one reference outcome plus the span of the X parts of the stabilizers. The
+        reference is measured once on a copy of the tableau, after which every shot
+        costs a single product of random coins with that basis.
+
+        Args:
+            qubits (sequence of int): The measured qubits, one column each.
+            shots (int): The number of shots.
+            rng (np.random.Generator): The source of randomness.
+
+        Returns:
+            np.ndarray: An array of shape (shots, len(qubits)) with the outcome bits.
+        """
+        reference_tableau: StabilizerTableau = self.copy()
+        reference: np.ndarray = np.array([reference_tableau.measure(qubit, rng) for qubit in qubits], dtype=np.uint8)
+        basis: np.ndarray = np.stack([self._column(self.x, qubit)[self.num_qubits:] for qubit in qubits], axis=1) if len(qubits) else np.zeros((0, 0), dtype=np.uint8)
+        basis = _row_basis(basis)
+        outcomes: np.ndarray = np.empty((shots, len(qubits)), dtype=np.uint8)
+        outcomes[...] = reference
+        if len(basis):
+            basis = basis.astype(np.float32)
+            chunk: int = max(1, _SAMPLE_CHUNK // max(1, len(qubits)))
+            for start in range(0, shots, chunk):
+                coins: np.ndarray = rng.integers(2, size=(min(chunk, shots - start), len(basis))).astype(np.float32)
+                outcomes[start:start + chunk] ^= ((coins @ basis).astype(np.int32) & 1).astype(np.uint8)
+        return outcomes
+
+    def stabilizers(self) -> list:
+        """
+        Returns the stabilizer generators of the state.
+
+        Returns:
+            list: One signed Pauli string per generator, qubit 0 first (e.g. "+XXI").
+        """
+        num_qubits: int = self.num_qubits
+        x: np.ndarray = np.unpackbits(self.x[num_qubits:], axis=1, bitorder="little")[:, :num_qubits]
+        z: np.ndarray = np.unpackbits(self.z[num_qubits:], axis=1, bitorder="little")[:, :num_qubits]
+        letters: np.ndarray = np.array(list("IXZY"))[x + 2 * z]
+        return [("-" if sign else "+") + "".join(row) for sign, row in zip(self.r[num_qubits:], letters)]
+
+
+def _multiply(x1: np.ndarray, z1: np.ndarray, r1, x2: np.ndarray, z2: np.ndarray, r2) -> tuple:
+    """
+    Returns the products P1 * P2 of packed Pauli rows (broadcast against each other) as (x, z, r).
+
+    Writing each Pauli as i^(x.z) X^x Z^z, the product picks up the power of i
+    x1.z1 + x2.z2 - x3.z3 + 2 z1.x2 (plus twice the two sign bits), which only
+    takes four popcounts per row instead of a per-qubit case analysis.
+    """
+    x: np.ndarray = x1 ^ x2
+    z: np.ndarray = z1 ^ z2
+    phase: np.ndarray = _popcount(x1 & z1) + _popcount(x2 & z2) - _popcount(x & z) + 2 * _popcount(z1 & x2)
+    phase = phase + 2 * (np.asarray(r1, dtype=np.int64) + r2)
+    return x, z, ((phase % 4) >> 1).astype(np.uint8)
+
+
+def _popcount(bits: np.ndarray) -> np.ndarray:
+    """Returns the number of set bits of each packed row."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT[bits].sum(axis=-1, dtype=np.int64)
+
+
+def _product(x: np.ndarray, z: np.ndarray, r: np.ndarray) -> tuple:
+    """
+    Returns the product of commuting packed Pauli rows as (x, z, r).
+
+    Since the rows commute, they are multiplied pairwise in a balanced tree, so
+    only O(log k) vectorized steps are needed for k rows.
+    """
+    if len(x) == 0:
+        return np.zeros(x.shape[1:], dtype=np.uint8), np.zeros(z.shape[1:], dtype=np.uint8), np.uint8(0)
+    while len(x) > 1:
+        pairs: int = len(x) // 2
+        product = _multiply(x[0:2 * pairs:2], z[0:2 * pairs:2], r[0:2 * pairs:2],
+                            x[1:2 * pairs:2], z[1:2 * pairs:2], r[1:2 * pairs:2])
+        x, z, r = (np.concatenate((part, rest[2 * pairs:])) for part, rest in zip(product, (x, z, r)))
+    return x[0], z[0], r[0]
+
+
+def _row_basis(matrix: np.ndarray) -> np.ndarray:
+    """Returns linearly independent rows (over GF(2)) spanning the rows of a 0/1 matrix."""
+    matrix = matrix.copy()
+    rank: int = 0
+    for column in range(matrix.shape[1]):
+        pivots: np.ndarray = rank + np.flatnonzero(matrix[rank:, column])
+        if pivots.size == 0:
+            continue
+        matrix[[rank, pivots[0]]] = matrix[[pivots[0], rank]]
+        others: np.ndarray = np.flatnonzero(matrix[:, column])
+        others = others[others != rank]
+        matrix[others] ^= matrix[rank]
+        rank += 1
+        if rank == len(matrix):
+            break
+    return matrix[:rank]
@@ -0,0 +1,135 @@
+"""
+Shared helpers of the test suite: a dense reference simulator and random circuits.
+
+The reference applies every gate as a full 2^n x 2^n operator built with
+Kronecker products from its own gate matrices, independently of the
+simulator's kernels, so every optimized path can be checked against it.
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from nexusQ.core import QuantumCircuit
+
+# Gates drawn by random_circuit: (gate type, number of qubits, whether it takes an angle)
+GATE_SET = (("H", 1, False), ("X", 1, False), ("Y", 1, False), ("Z", 1, False), ("S", 1, False), ("T", 1, False),
+            ("RX", 1, True), ("RY", 1, True), ("RZ", 1, True), ("CNOT", 2, False), ("CZ", 2, False),
+            ("SWAP", 2, False), ("CY", 2, False), ("CH", 2, False), ("CS", 2, False), ("Rxx", 2, True),
+            ("Ryy", 2, True), ("Rzz", 2, True), ("CCX", 3, False), ("CSWAP", 3, False))
+
+_PAULIS = {"I": np.eye(2), "X": np.array([[0, 1], [1, 0]]), "Y": np.array([[0, -1j], [1j, 0]]), "Z": np.diag([1, -1])}
+_FIXED = {"H": np.array([[1, 1], [1, -1]]) / np.sqrt(2), "S": np.diag([1, 1j]), "T": np.diag([1, np.exp(1j * np.pi / 4)]),
+          "SWAP": np.eye(4)[[0, 2, 1, 3]], **_PAULIS}
+_CONTROLLED = {"CNOT": ("X", 1), "CZ": ("Z", 1), "CY": ("Y", 1), "CH": ("H", 1), "CS": ("S", 1), "CCX": ("X", 2),
+               "CSWAP": ("SWAP", 1)}
+_ROTATIONS = {"RX": "X", "RY": "Y", "RZ": "Z", "Rxx": "XX", "Ryy": "YY", "Rzz": "ZZ"}
+
+
+def gate_matrix(gate: tuple) -> np.ndarray:
+    """
+    Returns the matrix of a unitary gate tuple on all of its qubits.
+
+    Args:
+        gate (tuple): The gate, with bound parameters; a "Unitary" tuple holds its own matrix.
+
+    Returns:
+        np.ndarray: The 2^k x 2^k matrix, the first qubit operand being the most significant bit.
+    """
+    name: str = gate[0]
+    if name == "Unitary":
+        return np.asarray(gate[-1], dtype=complex)
+    if name in _ROTATIONS:
+        generator: np.ndarray = np.ones((1, 1))
+        for letter in _ROTATIONS[name]:
+            generator = np.kron(generator, _PAULIS[letter])
+        return np.cos(gate[-1] / 2) * np.eye(len(generator)) - 1j * np.sin(gate[-1] / 2) * generator
+    if name in _CONTROLLED:
+        base, controls = _CONTROLLED[name]
+        matrix: np.ndarray = np.eye(len(_FIXED[base]) << controls, dtype=complex)
+        matrix[-len(_FIXED[base]):, -len(_FIXED[base]):] = _FIXED[base]
+        return matrix
+    return np.asarray(_FIXED[name], dtype=complex)
+
+
+def gate_qubits(gate: tuple) -> list:
+    """Returns the qubit operands of a gate tuple, leaving out its angle or matrix."""
+    return list(gate[1:-1] if gate[0] in _ROTATIONS or gate[0] == "Unitary" else gate[1:])
+
+
+def operator(gate: tuple, num_qubits: int) -> np.ndarray:
+    """
+    Returns the full 2^n x 2^n operator of a unitary gate tuple.
+
+    Args:
+        gate (tuple): The gate, with bound parameters.
+        num_qubits (int): The number of qubits of the circuit.
+
+    Returns:
+        np.ndarray: The operator, qubit 0 being the most significant bit.
+    """
+    qubits: list = gate_qubits(gate)
+    others: list = [qubit for qubit in range(num_qubits) if qubit not in qubits]
+    full: np.ndarray = np.kron(gate_matrix(gate), np.eye(2**len(others)))
+    # full acts on the qubit order qubits + others; permute it back to 0..n-1
+    order: list = qubits + others
+    tensor: np.ndarray = full.reshape((2,) * (2 * num_qubits))
+    inverse: list = [order.index(qubit) for qubit in range(num_qubits)]
+    tensor = tensor.transpose(inverse + [num_qubits + position for position in inverse])
+    return tensor.reshape(2**num_qubits, 2**num_qubits)
+
+
+def reference_state(circuit: QuantumCircuit) -> np.ndarray:
+    """
+    Returns the final state of a unitary circuit, computed with full operators.
+
+    Args:
+        circuit (QuantumCircuit): The circuit, with bound parameters and no
+            measurements, resets or noise.
+
+    Returns:
+        np.ndarray: The state vector.
+    """
+    num_qubits: int = circuit.get_num_qubits()
+    state: np.ndarray = np.zeros(2**num_qubits, dtype=complex)
+    state[0] = 1
+    for gate in circuit.get_gates():
+        state = operator(gate, num_qubits) @ state
+    return state
+
+
+def random_unitary(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Returns a Haar-random unitary matrix."""
+    matrix: np.ndarray = rng.normal(size=(size, size)) + 1j * rng.normal(size=(size, size))
+    q, r = np.linalg.qr(matrix)
+    return q * (np.diag(r) / np.abs(np.diag(r)))
+
+
+def random_circuit(num_qubits: int, num_gates: int, seed: int = 0, gate_set=GATE_SET, unitaries: bool = True) -> QuantumCircuit:
+    """
+    Returns a circuit of random gates on random qubits.
+
+    Args:
+        num_qubits (int): The number of qubits.
+        num_gates (int): The number of gates.
+        seed (int): The seed.
+        gate_set (tuple): The (gate type, number of qubits, takes an angle) gates to draw from.
+        unitaries (bool): Whether random "Unitary" gates are drawn too.
+
+    Returns:
+        QuantumCircuit: The circuit.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    circuit: QuantumCircuit = QuantumCircuit(num_qubits)
+    choices: list = [gate for gate in gate_set if gate[1] <= num_qubits]
+    for _ in range(num_gates):
+        if unitaries and rng.random() < 0.1:
+            size: int = int(rng.integers(1, min(2, num_qubits) + 1))
+            circuit.unitary(random_unitary(2**size, rng), *rng.choice(num_qubits, size, replace=False).tolist())
+            continue
+        name, size, angle = choices[rng.integers(len(choices))]
+        qubits: tuple = tuple(rng.choice(num_qubits, size, replace=False).tolist())
+        circuit.gates.append((name,) + qubits + ((float(rng.uniform(-np.pi, np.pi)),) if angle else ()))
+    return circuit
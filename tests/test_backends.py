@@ -0,0 +1,171 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, PauliSum, StabilizerTableau
+
+SHOTS = 20000
+CLIFFORD_SET = (("H", 1, False), ("X", 1, False), ("Y", 1, False), ("Z", 1, False), ("S", 1, False),
+                ("CNOT", 2, False), ("CZ", 2, False), ("CY", 2, False), ("SWAP", 2, False))
+
+
+def _distribution(outcomes):
+    """Returns the frequency of each outcome index of a (shots, bits) outcome array."""
+    indices = outcomes.astype(int) @ (1 << np.arange(outcomes.shape[1] - 1, -1, -1))
+    return np.bincount(indices, minlength=2**outcomes.shape[1]) / len(outcomes)
+
+
+def _measured(circuit):
+    measured = QuantumCircuit(circuit.get_num_qubits())
+    measured.gates += circuit.get_gates()
+    measured.measure_all()
+    return measured
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_stabilizers_stabilize_the_reference_state(seed):
+    circuit = random_circuit(5, 40, seed, gate_set=CLIFFORD_SET, unitaries=False)
+    state, _ = QuantumSimulator(backend="stabilizer").run(circuit)
+    assert isinstance(state, StabilizerTableau)
+    expected = reference_state(circuit)
+    for generator in state.stabilizers():
+        sign = 1 if generator[0] == "+" else -1
+        assert np.isclose(PauliSum([(sign, generator[1:])]).expectation(expected, 5), 1)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_stabilizer_samples_match_statevector(seed):
+    circuit = random_circuit(5, 40, seed, gate_set=CLIFFORD_SET, unitaries=False)
+    expected = np.abs(reference_state(circuit)) ** 2
+    sampled = _distribution(QuantumSimulator(seed=seed, backend="stabilizer").sample(_measured(circuit), SHOTS))
+    assert np.array_equal(sampled > 0, expected > 1e-9)
+    assert np.abs(sampled - expected).max() < 0.02
+
+
+def test_stabilizer_mid_circuit_measurement_and_reset():
+    circuit = QuantumCircuit(3)
+    circuit.h(0)
+    circuit.cnot(0, 1)
+    circuit.measure(0)
+    circuit.reset(0)
+    circuit.h(2)
+    circuit.cz(1, 2)
+    circuit.h(2)
+    circuit.measure_all()
+    sampled = QuantumSimulator(seed=1, backend="stabilizer").sample(circuit, 4000)
+    expected = QuantumSimulator(seed=2, backend="statevector").sample(circuit, 4000)
+    assert np.abs(_distribution(sampled) - _distribution(expected)).max() < 0.04
+    assert np.array_equal(sampled[:, 1], sampled[:, 2])
+
+
+def test_stabilizer_scales_to_many_qubits():
+    circuit = QuantumCircuit(500)
+    circuit.h(0)
+    for qubit in range(499):
+        circuit.cnot(qubit, qubit + 1)
+    circuit.measure_all()
+    outcomes = QuantumSimulator(seed=0).sample(circuit, 200)  # "auto" picks the tableau
+    assert outcomes.shape == (200, 500)
+    assert np.all(outcomes == outcomes[:, :1])
+    assert 0 < outcomes[:, 0].mean() < 1
+
+
+def test_stabilizer_rejects_non_clifford_gates():
+    circuit = QuantumCircuit(1)
+    circuit.gates.append(("T", 0))
+    with pytest.raises(ValueError):
+        QuantumSimulator(backend="stabilizer").run(circuit)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_mps_matches_statevector(seed):
+    circuit = random_circuit(6, 60, seed)
+    state, _ = QuantumSimulator(backend="mps").run(circuit)
+    expected = reference_state(circuit)
+    assert np.allclose(state.to_statevector(), expected)
+    assert np.isclose(state.amplitude("101100"), expected[0b101100])
+    assert state.discarded_weight < 1e-10
+
+
+def test_mps_expectation_and_samples():
+    circuit = random_circuit(6, 40, 11)
+    observable = PauliSum([(0.8, {0: "Z", 5: "X"}), (-0.5, "IYYZII"), (0.3, {3: "X"})])
+    expected = reference_state(circuit)
+    simulator = QuantumSimulator(seed=0, backend="mps")
+    assert np.isclose(simulator.expectation(circuit, observable), observable.expectation(expected, 6))
+    sampled = _distribution(simulator.sample(_measured(circuit), SHOTS))
+    assert np.abs(sampled - np.abs(expected) ** 2).max() < 0.02
+
+
+def test_mps_truncation_bounds_the_bond_dimension():
+    circuit = random_circuit(8, 150, 4, unitaries=False)
+    state, _ = QuantumSimulator(backend="mps", max_bond_dimension=4).run(circuit)
+    assert max(state.bond_dimensions()) <= 4
+    assert state.discarded_weight > 0
+    exact = reference_state(circuit)
+    assert abs(np.vdot(exact, state.to_statevector())) ** 2 <= 1 + 1e-9
+
+
+def test_mps_low_entanglement_chain():
+    circuit = QuantumCircuit(60)
+    for qubit in range(60):
+        circuit.ry(qubit, 0.02 * qubit)
+    for qubit in range(59):
+        circuit.cnot(qubit, qubit + 1)
+    state, _ = QuantumSimulator(backend="mps").run(circuit)
+    assert max(state.bond_dimensions()) <= 2
+    # The CNOT chain maps |0...0> to itself, so its amplitude is that of the RY layer
+    expected = np.prod([np.cos(0.01 * qubit) for qubit in range(60)])
+    assert np.isclose(state.amplitude("0" * 60), expected, rtol=1e-9, atol=0)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sparse_matches_statevector(seed):
+    circuit = random_circuit(6, 60, seed)
+    state, _ = QuantumSimulator(backend="sparse").run(circuit)
+    expected = reference_state(circuit)
+    assert np.allclose(state.to_statevector(), expected)
+    assert np.isclose(state.amplitude("011010"), expected[0b011010])
+
+
+def test_sparse_keeps_a_single_amplitude_for_reversible_circuits():
+    permutations = (("X", 1, False), ("CNOT", 2, False), ("CCX", 3, False), ("SWAP", 2, False), ("CSWAP", 3, False))
+    circuit = QuantumCircuit(40)
+    for qubit in range(0, 40, 3):
+        circuit.x(qubit)
+    circuit.gates += random_circuit(40, 300, 5, gate_set=permutations, unitaries=False).get_gates()
+    bits = [0] * 40  # Classical simulation of the permutation
+    for gate in circuit.get_gates():
+        if gate[0] in ("X", "CNOT", "CCX"):
+            bits[gate[-1]] ^= all(bits[control] for control in gate[1:-1])
+        elif gate[0] == "SWAP" or bits[gate[1]]:
+            bits[gate[-2]], bits[gate[-1]] = bits[gate[-1]], bits[gate[-2]]
+    state, _ = QuantumSimulator().run(circuit)  # "auto" picks the sparse backend
+    assert len(state) == 1 and not state.is_dense()
+    assert int(state.indices[0]) == int("".join(map(str, bits)), 2)
+    circuit.measure_all()
+    outcomes = QuantumSimulator().sample(circuit, 5)
+    assert np.all(outcomes == outcomes[0])
+
+
+def test_sparse_switches_to_dense():
+    circuit = QuantumCircuit(8)
+    for qubit in range(8):
+        circuit.h(qubit)
+    state, _ = QuantumSimulator(backend="sparse").run(circuit)
+    assert state.is_dense()
+    assert np.allclose(state.to_statevector(), np.full(256, 1 / 16))
+
+
+def test_sparse_mid_circuit_measurement():
+    circuit = QuantumCircuit(3)
+    circuit.h(0)
+    circuit.cnot(0, 1)
+    circuit.measure(1)
+    circuit.cnot(1, 2)
+    circuit.reset(0)
+    circuit.measure_all()
+    outcomes = QuantumSimulator(seed=3, backend="sparse").sample(circuit, 2000)
+    assert not outcomes[:, 0].any()
+    assert np.array_equal(outcomes[:, 1], outcomes[:, 2])
+    assert abs(outcomes[:, 1].mean() - 0.5) < 0.05
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, Parameter
+
+
+def test_reseed_and_spawn_seed_are_reproducible():
+    simulator = QuantumSimulator(seed=5)
+    seeds = simulator.spawn_seed(3)
+    assert len(seeds) == 3 and len(set(seeds)) == 3
+    assert QuantumSimulator(seed=5).spawn_seed(3) == seeds
+    assert isinstance(simulator.spawn_seed(), int)
+    circuit = random_circuit(3, 20, 0)
+    circuit.measure_all()
+    simulator.reseed(11)
+    first = simulator.sample(circuit, 50)
+    simulator.reseed(11)
+    assert np.array_equal(simulator.sample(circuit, 50), first)
+    assert simulator.rng is simulator.rng
+
+
+def test_batch_states_match_reference():
+    circuits = [random_circuit(4, 40, seed) for seed in range(6)]
+    results = dict((index, state) for index, state, _ in QuantumSimulator().run_batch(circuits, max_workers=2))
+    assert sorted(results) == list(range(len(circuits)))
+    for index, circuit in enumerate(circuits):
+        assert np.allclose(results[index], reference_state(circuit))
+
+
+def test_large_states_come_back_through_shared_memory():
+    circuit = random_circuit(13, 60, 6, unitaries=False)
+    ((_, state, _),) = QuantumSimulator().run_batch([circuit], max_workers=1)
+    assert np.allclose(state, QuantumSimulator().run(circuit)[0])
+
+
+def test_batch_binds_parameters():
+    theta = Parameter("theta")
+    circuit = QuantumCircuit(2)
+    circuit.ry(0, theta)
+    circuit.cnot(0, 1)
+    ((_, state, _),) = QuantumSimulator().run_batch([circuit], parameter_values={theta: 0.8}, max_workers=1)
+    assert np.allclose(state, reference_state(circuit.bind_parameters({theta: 0.8})))
+
+
+def test_seeded_batches_are_reproducible():
+    circuits = []
+    for seed in range(4):
+        circuit = random_circuit(4, 30, seed)
+        circuit.measure_all()
+        circuits.append(circuit)
+    runs = []
+    for max_workers in (1, 3):
+        results = QuantumSimulator(seed=2).run_batch(circuits, shots=200, max_workers=max_workers, return_states=False)
+        runs.append(sorted((index, state, sorted(counts.items())) for index, state, counts in results))
+    assert runs[0] == runs[1]
+    assert all(state is None and sum(count for _, count in counts) == 200 for _, state, counts in runs[0])
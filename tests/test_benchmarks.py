@@ -0,0 +1,69 @@
+import importlib.util
+import json
+import os
+import numpy as np
+import pytest
+
+from conftest import reference_state
+
+_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "run_benchmarks.py")
+_SPEC = importlib.util.spec_from_file_location("run_benchmarks", _PATH)
+benchmarks = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(benchmarks)
+
+
+def _results(**timings):
+    return {"format": benchmarks.FORMAT_VERSION, "metadata": {"settings": {}},
+            "results": {name: {"min": seconds, "peak_bytes": peak} for name, (seconds, peak) in timings.items()}}
+
+
+def test_circuit_builders():
+    ghz = reference_state(benchmarks.ghz_circuit(4))
+    assert np.allclose(ghz[[0, 15]], [2**-0.5, 2**-0.5]) and np.isclose(np.linalg.norm(ghz), 1)
+    num_qubits = 4
+    state = reference_state(benchmarks.qft_circuit(num_qubits))
+    basis = int("".join("1" if qubit % 2 == 0 else "0" for qubit in range(num_qubits)), 2)
+    size = 2**num_qubits
+    expected = np.exp(2j * np.pi * basis * np.arange(size) / size) / np.sqrt(size)
+    assert np.isclose(abs(np.vdot(expected, state)), 1)  # Equal up to a global phase
+    for circuit in (benchmarks.random_circuit(5, 4, seed=1), benchmarks.qaoa_circuit(5, 2, seed=1)):
+        assert np.isclose(np.linalg.norm(reference_state(circuit)), 1)
+
+
+def test_compare_flags_regressions():
+    baseline = _results(fast=(1.0, 100), slow=(1.0, 100), fat=(1.0, 100), gone=(1.0, 100))
+    current = _results(fast=(0.5, 100), slow=(1.5, 100), fat=(1.0, 200), new=(1.0, 100))
+    lines, regressions = benchmarks.compare(current, baseline, tolerance=0.2, memory_tolerance=0.1)
+    assert sorted(regressions) == ["fat", "gone", "slow"]
+    assert any("missing in current" in line for line in lines)
+    assert any("missing in baseline" in line for line in lines)
+
+
+def test_compare_refuses_incomparable_results():
+    baseline = _results(**{"gates/h": (1.0, 100), "circuits/ghz": (1.0, 100)})
+    current = _results(**{"gates/h": (1.0, 100)})
+    current["metadata"]["filter"] = "gates"
+    assert benchmarks.compare(current, baseline)[1] == []
+    with pytest.raises(ValueError):
+        benchmarks.compare(_results(other=(1.0, 100)), baseline)
+    for key, value in (("quick", True), ("shots", 64), ("settings", {"precision": "single"})):
+        current = _results(**{"gates/h": (1.0, 100), "circuits/ghz": (1.0, 100)})
+        current["metadata"][key] = value
+        with pytest.raises(ValueError):
+            benchmarks.compare(current, baseline)
+
+
+def test_quick_suite_and_command_line(tmp_path):
+    results = benchmarks.run_suite(quick=True, repeats=1, shots=64, pattern="circuits/ghz", log=lambda line: None)
+    assert results["results"] and all(name.startswith("circuits/ghz") for name in results["results"])
+    for result in results["results"].values():
+        assert 0 < result["min"] <= result["median"] and result["peak_bytes"] > 0
+    current, baseline = tmp_path / "current.json", tmp_path / "baseline.json"
+    current.write_text(json.dumps(results))
+    baseline.write_text(json.dumps(results))
+    assert benchmarks.main(["--input", str(current), "--baseline", str(baseline)]) == 0
+    slower = json.loads(json.dumps(results))
+    for result in slower["results"].values():
+        result["min"] *= 2
+    current.write_text(json.dumps(slower))
+    assert benchmarks.main(["--input", str(current), "--baseline", str(baseline)]) == 1
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, random_unitary, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, Parameter
+
+
+@pytest.mark.parametrize("level", [0, 1, 2, 3])
+@pytest.mark.parametrize("seed", range(4))
+def test_compiled_program_matches_reference(level, seed):
+    circuit = random_circuit(5, 60, seed)
+    simulator = QuantumSimulator(optimization_level=level)
+    state, _ = simulator.run(simulator.compile(circuit))
+    assert np.allclose(np.asarray(state), reference_state(circuit))
+
+
+def test_identical_circuits_share_a_program():
+    simulator = QuantumSimulator()
+    assert simulator.compile(random_circuit(4, 40, 1)) is simulator.compile(random_circuit(4, 40, 1))
+    assert simulator.compile(random_circuit(4, 40, 1)) is not simulator.compile(random_circuit(4, 40, 2))
+
+
+def test_cache_key_tells_apart_angles_and_matrices():
+    simulator = QuantumSimulator()
+    programs = []
+    for angle in (0.3, 0.30000001):
+        circuit = QuantumCircuit(2)
+        circuit.rx(0, angle)
+        programs.append(simulator.compile(circuit))
+    rng = np.random.default_rng(0)
+    for matrix in (random_unitary(4, rng), random_unitary(4, rng)):
+        circuit = QuantumCircuit(2)
+        circuit.gates.append(("Unitary", 0, 1, matrix))
+        programs.append(simulator.compile(circuit))
+        assert np.allclose(np.asarray(simulator.run(circuit)[0]), reference_state(circuit))
+    assert len({id(program) for program in programs}) == 4
+    assert len(simulator._programs) == 4
+
+
+def test_cache_key_tells_apart_parameters():
+    simulator = QuantumSimulator()
+    circuits = []
+    for name in ("a", "a"):
+        circuit = QuantumCircuit(1)
+        circuit.rx(0, Parameter(name))
+        circuits.append(circuit)
+    assert simulator.compile(circuits[0]) is simulator.compile(circuits[0])
+    assert simulator.compile(circuits[0]) is not simulator.compile(circuits[1])
+    parameter = next(iter(circuits[1].get_gates()))[-1]
+    state, _ = simulator.run(circuits[1], parameter_values={parameter: 0.4})
+    assert np.allclose(np.asarray(state), [np.cos(0.2), -1j * np.sin(0.2)])
+
+
+def test_cache_key_does_not_hold_gate_tuples():
+    circuit = random_circuit(6, 5000, 3, unitaries=False)
+    simulator = QuantumSimulator()
+    simulator.compile(circuit)
+    (key,) = simulator._programs
+    num_qubits, level, dtype, digest = key
+    assert digest == (circuit.get_gates().digest()[0],)
+    assert len(digest[0]) == 16
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, ProductState, PauliSum
+from nexusQ.core.decomposition import connected_components, split_circuit
+from nexusQ.core.quantum_circuit import gate_qubits
+
+
+def _registers(seed):
+    """Returns a 7-qubit circuit made of the independent registers (0, 3, 5), (1, 6), (2,) and (4,)."""
+    circuit = QuantumCircuit(7)
+    for qubits, gates, offset in (((0, 3, 5), 30, 0), ((1, 6), 20, 1)):
+        for gate in random_circuit(len(qubits), gates, seed + offset, unitaries=False).get_gates():
+            size = len(gate_qubits(gate))
+            circuit.gates.append((gate[0], *(qubits[qubit] for qubit in gate[1:1 + size]), *gate[1 + size:]))
+    circuit.h(2)
+    circuit.rx(4, 0.3)
+    return circuit
+
+
+def test_connected_components():
+    assert connected_components(_registers(0)) == [(0, 3, 5), (1, 6), (2,), (4,)]
+    parts = split_circuit(_registers(0))
+    assert [qubits for qubits, _ in parts] == [(0, 3, 5), (1, 6), (2,), (4,)]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_run_returns_full_state_vector(seed):
+    circuit = _registers(seed)
+    state, _ = QuantumSimulator().run(circuit)
+    assert isinstance(state, np.ndarray) and state.shape == (2**7,)
+    assert np.allclose(state, reference_state(circuit))
+
+
+def test_idle_qubit_returns_state_vector():
+    circuit = QuantumCircuit(3)
+    circuit.h(0)
+    circuit.cnot(0, 1)
+    state, _ = QuantumSimulator().run(circuit)
+    assert isinstance(state, np.ndarray)
+    assert np.allclose(state[[0, 6]], [2**-0.5, 2**-0.5])
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_factored_state_matches_reference(seed):
+    circuit = _registers(seed)
+    state, _ = QuantumSimulator().run(circuit, factored=True)
+    expected = reference_state(circuit)
+    assert isinstance(state, ProductState)
+    assert np.allclose(state.to_statevector(), expected)
+    assert np.allclose(np.asarray(state), expected)
+    assert np.isclose(state.amplitude("0110101"), expected[0b0110101])
+
+
+def test_factored_expectation_matches_reference():
+    circuit = _registers(3)
+    observable = PauliSum([(0.5, {0: "Z", 6: "X"}), (-1.2, {3: "Y", 1: "Z", 2: "X"}), (0.4, {4: "Z"})])
+    state, _ = QuantumSimulator().run(circuit, factored=True)
+    expected = observable.expectation(reference_state(circuit), 7)
+    assert np.isclose(state.expectation(observable), expected)
+    assert np.isclose(QuantumSimulator().expectation(circuit, observable), expected)
+
+
+def test_sampled_registers_match_marginals():
+    circuit = _registers(5)
+    circuit.measure_all()
+    probabilities = np.abs(reference_state(_registers(5)).reshape((2,) * 7)) ** 2
+    outcomes = QuantumSimulator(seed=0).sample(circuit, 20000)
+    for qubit in range(7):
+        marginal = probabilities.sum(axis=tuple(other for other in range(7) if other != qubit))[1]
+        assert abs(outcomes[:, qubit].mean() - marginal) < 0.02
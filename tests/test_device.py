@@ -0,0 +1,92 @@
+import asyncio
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, QuantumDevice
+
+
+def _measured(seed):
+    circuit = random_circuit(4, 30, seed)
+    circuit.measure_all()
+    return circuit
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_jobs_match_reference(processes):
+    circuits = [random_circuit(4, 40, seed) for seed in range(5)]
+
+    async def main():
+        async with QuantumDevice(QuantumSimulator(seed=1), max_concurrency=2, processes=processes) as device:
+            jobs = [await device.submit(circuit) for circuit in circuits]
+            return [await job for job in jobs]
+
+    for circuit, (state, measurements) in zip(circuits, asyncio.run(main())):
+        assert np.allclose(state, reference_state(circuit))
+        assert measurements == {}
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 3])
+def test_seeded_results_do_not_depend_on_scheduling(max_concurrency):
+    async def main():
+        async with QuantumDevice(QuantumSimulator(seed=4), max_concurrency=max_concurrency) as device:
+            return await asyncio.gather(*(device.run(_measured(seed), shots=300) for seed in range(6)))
+
+    results = asyncio.run(main())
+    parent = QuantumSimulator(seed=4)
+    for seed, (state, counts) in enumerate(results):
+        expected = QuantumSimulator(seed=parent.spawn_seed()).run(_measured(seed), shots=300)
+        assert np.allclose(state, expected[0])
+        assert counts == expected[1]
+
+
+def test_without_states_only_counts_come_back():
+    async def main():
+        async with QuantumDevice(return_states=False) as device:
+            return await device.run(_measured(0), shots=100)
+
+    state, counts = asyncio.run(main())
+    assert state is None and sum(counts.values()) == 100
+
+
+def test_queued_jobs_can_be_cancelled():
+    async def main():
+        async with QuantumDevice(max_concurrency=1) as device:
+            jobs = [await device.submit(random_circuit(10, 200, seed)) for seed in range(4)]
+            assert jobs[-1].status == "queued"
+            assert jobs[-1].cancel()
+            results = [await job for job in jobs[:-1]]
+            with pytest.raises(asyncio.CancelledError):
+                await jobs[-1]
+            return jobs, results
+
+    jobs, results = asyncio.run(main())
+    assert [job.status for job in jobs] == ["done", "done", "done", "cancelled"]
+    assert len(results) == 3
+
+
+def test_failures_are_reported_per_job():
+    async def main():
+        async with QuantumDevice() as device:
+            noisy = QuantumCircuit(1)
+            noisy.gates.append(("Depolarizing", 0, 0.1))
+            failed = await device.submit(noisy)  # Noise channels need shots
+            succeeded = await device.submit(random_circuit(2, 10, 0))
+            with pytest.raises(ValueError):
+                await failed
+            await succeeded
+            return failed, succeeded
+
+    failed, succeeded = asyncio.run(main())
+    assert failed.status == "failed" and succeeded.status == "done"
+
+
+def test_closed_device_rejects_jobs():
+    async def main():
+        device = QuantumDevice()
+        await device.run(random_circuit(2, 10, 0))
+        await device.close()
+        with pytest.raises(RuntimeError):
+            await device.submit(random_circuit(2, 10, 0))
+
+    asyncio.run(main())
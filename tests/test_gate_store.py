@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, random_unitary, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, Parameter, optimize
+from nexusQ.core.gate_store import GateStore, dumps, loads
+
+
+def _noisy_circuit(seed):
+    circuit = random_circuit(4, 60, seed)
+    circuit.measure(2)
+    circuit.reset(2)
+    circuit.gates += [("Depolarizing", 0, 0.1), ("AmplitudeDamping", 1, 0.2), ("ReadoutError", 3, 0.05)]
+    return circuit
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_store_behaves_as_a_list(seed):
+    gates = list(random_circuit(4, 60, seed).get_gates())
+    store = GateStore(gates)
+    assert len(store) == len(gates)
+    assert all(left[0] == right[0] and left[1:-1] == right[1:-1] for left, right in zip(store, gates))
+    assert [gate[0] for gate in reversed(store)] == [gate[0] for gate in reversed(gates)]
+    assert [gate[0] for gate in store[5:10]] == [gate[0] for gate in gates[5:10]]
+    assert store[-1][0] == gates[-1][0]
+    with pytest.raises(IndexError):
+        store[len(gates)]
+
+
+@pytest.mark.parametrize("loaded", [False, True])
+def test_store_mutates_as_a_list(loaded):
+    circuit = _noisy_circuit(5)
+    store = loads(circuit.to_bytes())[1] if loaded else circuit.get_gates()
+    gates = list(circuit.get_gates())
+    matrix = random_unitary(4, np.random.default_rng(1))
+    for mutate in (lambda target: target.__setitem__(2, ("CZ", 0, 2)),
+                   lambda target: target.__setitem__(-1, ("Unitary", 2, 3, matrix)),
+                   lambda target: target.__setitem__(slice(4, 9), [("X", 1), ("RY", 2, 0.25)]),
+                   lambda target: target.__setitem__(slice(None, 20, 3), [("H", 3)] * 7),
+                   lambda target: target.__delitem__(7),
+                   lambda target: target.__delitem__(slice(-10, -4, 2)),
+                   lambda target: target.insert(0, ("Unitary", 1, 0, matrix)),
+                   lambda target: target.insert(-3, ("Measure", 1)),
+                   lambda target: target.insert(1000, ("S", 0)),
+                   lambda target: target.remove(("CZ", 0, 2))):
+        mutate(store)
+        mutate(gates)
+        assert store == gates
+    store.remove(("Unitary", 1, 0, matrix.copy()))  # The first gate, found by its entries
+    del gates[0]
+    assert store == gates
+    assert store.pop() == ("S", 0) and gates.pop() == ("S", 0)
+    assert store.pop(0) == gates.pop(0)
+    assert store == gates
+    assert loads(dumps(4, store))[1] == gates
+    with pytest.raises(ValueError):
+        store.remove(("CCX", 0, 1, 2))
+    with pytest.raises(ValueError):
+        store[0] = ("Bogus", 0)
+    assert store == gates
+    with pytest.raises(IndexError):
+        del store[len(gates)]
+    store.clear()
+    assert len(store) == 0 and store.nbytes() == 8
+    store.append(("RX", 0, 1))
+    assert store[0] == ("RX", 0, 1.0)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_binary_round_trip(seed):
+    circuit = _noisy_circuit(seed)
+    loaded = QuantumCircuit.from_bytes(circuit.to_bytes())
+    assert loaded.get_num_qubits() == 4
+    assert loaded.get_gates() == circuit.get_gates()
+    assert loaded.to_bytes() == circuit.to_bytes()
+
+
+def test_file_round_trip_simulates_identically(tmp_path):
+    circuit = random_circuit(5, 80, 9)
+    circuit.save(str(tmp_path / "circuit.nxq"))
+    loaded = QuantumCircuit.load(str(tmp_path / "circuit.nxq"))
+    assert loaded.get_gates() == circuit.get_gates()
+    assert np.allclose(QuantumSimulator().run(loaded)[0], reference_state(circuit))
+    loaded.h(0)  # Appending copies the columns out of the file
+    assert len(loaded.get_gates()) == len(circuit.get_gates()) + 1
+
+
+def test_equality_with_matrices():
+    rng = np.random.default_rng(0)
+    matrix = random_unitary(4, rng)
+    store = GateStore([("H", 0), ("Unitary", 0, 1, matrix)])
+    assert store == GateStore([("H", 0), ("Unitary", 0, 1, matrix.copy())])
+    assert store == [("H", 0), ("Unitary", 0, 1, matrix)]
+    assert store != GateStore([("H", 0), ("Unitary", 0, 1, random_unitary(4, rng))])
+    assert store != GateStore([("H", 0), ("Unitary", 1, 0, matrix)])
+    assert store != GateStore([("H", 0)])
+    assert store != [("Bogus", 0)]
+
+
+def test_optimized_circuits_compare():
+    circuit = random_circuit(4, 60, 3)
+    optimized = optimize(circuit, 3)
+    assert any(gate[0] == "Unitary" for gate in optimized.get_gates())
+    assert optimized.get_gates() == optimize(circuit, 3).get_gates()
+    assert optimized.get_gates() != circuit.get_gates()
+
+
+def test_parameters_compare_by_identity():
+    theta = Parameter("theta")
+    assert GateStore([("RX", 0, theta)]) == GateStore([("RX", 0, theta)])
+    assert GateStore([("RX", 0, theta)]) != GateStore([("RX", 0, Parameter("theta"))])
+    assert GateStore([("RX", 0, 0.5)]) != GateStore([("RX", 0, 0.25)])
+
+
+def test_unbound_parameters_cannot_be_serialized():
+    circuit = QuantumCircuit(1)
+    circuit.rx(0, Parameter("theta"))
+    with pytest.raises(ValueError):
+        circuit.to_bytes()
+
+
+def test_rejects_foreign_and_newer_files():
+    data = bytearray(dumps(2, GateStore([("CNOT", 0, 1)])))
+    assert loads(bytes(data))[0] == 2
+    data[4] = 99  # Format version
+    with pytest.raises(ValueError):
+        loads(bytes(data))
+    with pytest.raises(ValueError):
+        loads(b"XXXX" + bytes(data[4:]))
+
+
+def test_columns_are_compact():
+    circuit = random_circuit(10, 10000, 1, unitaries=False)
+    assert circuit.get_gates().nbytes() < 40 * len(circuit.get_gates())
@@ -0,0 +1,166 @@
+import itertools
+import numpy as np
+import pytest
+
+from conftest import GATE_SET, operator, random_unitary, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, compile_circuit
+from nexusQ.core.compiler import OP_PHASES
+from nexusQ.core import compiler, kernels
+
+
+def _random_states(num_qubits, rng, batch=()):
+    states = rng.normal(size=batch + (2**num_qubits,)) + 1j * rng.normal(size=batch + (2**num_qubits,))
+    return states / np.linalg.norm(states, axis=-1, keepdims=True)
+
+
+def _dense(matrix, qubits, num_qubits):
+    return operator(("Unitary", *qubits, matrix), num_qubits)
+
+
+@pytest.mark.parametrize("qubits", [(0,), (3,), (4,), (1, 3), (4, 0), (2, 0, 3)])
+def test_apply_matrix_matches_dense_operator(qubits):
+    rng = np.random.default_rng(len(qubits))
+    matrix = random_unitary(2**len(qubits), rng)
+    state = _random_states(5, rng)
+    expected = _dense(matrix, qubits, 5) @ state
+    kernels.apply_matrix(state, matrix, qubits, 5)
+    assert np.allclose(state, expected)
+
+
+@pytest.mark.parametrize("qubits", [(2,), (0, 4)])
+def test_apply_matrix_to_a_batch(qubits):
+    rng = np.random.default_rng(7)
+    states = _random_states(5, rng, (3,))
+    shared = random_unitary(2**len(qubits), rng)
+    expected = states @ _dense(shared, qubits, 5).T
+    kernels.apply_matrix(states, shared, qubits, 5)
+    assert np.allclose(states, expected)
+    stack = np.stack([random_unitary(2**len(qubits), rng) for _ in range(3)])
+    expected = np.stack([_dense(matrix, qubits, 5) @ state for matrix, state in zip(stack, states)])
+    kernels.apply_matrix(states, stack, qubits, 5)
+    assert np.allclose(states, expected)
+
+
+@pytest.mark.parametrize("gate_type,size,angle", GATE_SET)
+def test_every_gate_matches_reference(gate_type, size, angle):
+    for qubits in itertools.permutations(range(4), size):
+        circuit = QuantumCircuit(4)
+        for qubit in range(4):
+            circuit.h(qubit)
+            circuit.rz(qubit, 0.3 * (qubit + 1))
+        circuit.gates.append((gate_type, *qubits) + ((0.7,) if angle else ()))
+        state, _ = QuantumSimulator().run(circuit)
+        assert np.allclose(state, reference_state(circuit)), qubits
+
+
+def test_kernels_do_not_allocate_dense_operators():
+    state = np.zeros(2**20, dtype=complex)
+    state[0] = 1
+    kernels.apply_matrix(state, random_unitary(4, np.random.default_rng(0)), (3, 17), 20)
+    assert np.isclose(np.linalg.norm(state), 1)
+
+
+@pytest.mark.parametrize("controls,targets", [((0,), (3,)), ((4,), (1,)), ((2, 0), (4,)), ((1,), (0, 3)), ((3, 4), (2, 0))])
+def test_apply_controlled_matches_dense_operator(controls, targets):
+    rng = np.random.default_rng(sum(controls + targets))
+    matrix = random_unitary(2**len(targets), rng)
+    full = np.eye(2**(len(controls) + len(targets)), dtype=complex)
+    full[-matrix.shape[0]:, -matrix.shape[0]:] = matrix
+    state = _random_states(5, rng)
+    expected = _dense(full, controls + targets, 5) @ state
+    kernels.apply_controlled(state, matrix, controls, targets, 5)
+    assert np.allclose(state, expected)
+
+
+@pytest.mark.parametrize("controls,target", [((), 2), ((0,), 4), ((4,), 0), ((1, 3), 2), ((3, 0), 1)])
+def test_apply_controlled_x_matches_dense_operator(controls, target):
+    rng = np.random.default_rng(target)
+    x = np.array([[0, 1], [1, 0]])
+    full = np.eye(2**(len(controls) + 1), dtype=complex)
+    full[-2:, -2:] = x
+    states = _random_states(5, rng, (2,))
+    expected = states @ _dense(full, controls + (target,), 5).T
+    kernels.apply_controlled_x(states, controls, target, 5)
+    assert np.allclose(states, expected)
+
+
+@pytest.mark.parametrize("controls,qubits", [((), (0, 4)), ((), (3, 1)), ((2,), (0, 4)), ((0, 4), (3, 1))])
+def test_apply_swap_matches_dense_operator(controls, qubits):
+    rng = np.random.default_rng(len(controls))
+    swap = np.eye(4)[[0, 2, 1, 3]]
+    full = np.eye(2**(len(controls) + 2), dtype=complex)
+    full[-4:, -4:] = swap
+    state = _random_states(5, rng)
+    expected = _dense(full, controls + qubits, 5) @ state
+    kernels.apply_swap(state, *qubits, 5, controls=controls)
+    assert np.allclose(state, expected)
+
+
+@pytest.mark.parametrize("qubits", [(1,), (4,), (3, 0), (0, 2, 4)])
+def test_apply_diagonal_matches_dense_operator(qubits):
+    rng = np.random.default_rng(len(qubits))
+    diagonal = np.exp(1j * rng.uniform(0, 2 * np.pi, 2**len(qubits)))
+    states = _random_states(5, rng, (2,))
+    expected = states @ _dense(np.diag(diagonal), qubits, 5).T
+    kernels.apply_diagonal(states, diagonal, qubits, 5)
+    assert np.allclose(states, expected)
+
+
+def test_phase_accumulator_folds_diagonals():
+    rng = np.random.default_rng(3)
+    state = _random_states(4, rng)
+    original = state.copy()
+    expected = state.copy()
+    phases = kernels.PhaseAccumulator(4)
+    for qubits in ((0,), (2, 1), (3, 0), (1,)):
+        diagonal = np.exp(1j * rng.uniform(0, 2 * np.pi, 2**len(qubits)))
+        phases.add(diagonal, qubits)
+        expected = _dense(np.diag(diagonal), qubits, 4) @ expected
+    phases.apply(state)
+    assert np.allclose(state, expected)
+    phases.apply(state, inverse=True)
+    assert np.allclose(state, original)
+    phases.clear()
+    phases.apply(state)
+    assert np.allclose(state, original)
+
+
+def test_diagonal_runs_compile_to_one_instruction():
+    circuit = QuantumCircuit(4)
+    for qubit in range(4):
+        circuit.h(qubit)
+    circuit.rz(0, 0.3)
+    circuit.cz(1, 2)
+    circuit.rzz(3, 0, 0.8)
+    circuit.gates += [("T", 1), ("S", 3), ("Z", 2)]
+    circuit.cs(0, 3)
+    circuit.h(2)
+    program = compile_circuit(circuit)
+    assert program.opcodes.tolist().count(OP_PHASES) == 1
+    assert len(program) == 6
+    assert np.allclose(QuantumSimulator().run(circuit)[0], reference_state(circuit))
+
+
+def test_diagonal_runs_are_split_to_bounded_phases(monkeypatch):
+    circuit = QuantumCircuit(24)
+    for qubit in range(24):
+        circuit.rz(qubit, 0.1 * qubit)
+    for qubit in range(23):
+        circuit.rzz(qubit, qubit + 1, 0.2)
+    program = compile_circuit(circuit)
+    phases = [operand.phases for opcode, operand in zip(program.opcodes, program.operands) if opcode == OP_PHASES]
+    assert len(phases) > 1
+    assert max(tensor.size for tensor in phases) <= 2**compiler.MAX_PHASE_QUBITS
+
+    monkeypatch.setattr(compiler, "MAX_PHASE_QUBITS", 3)
+    circuit = QuantumCircuit(6)
+    for qubit in range(6):
+        circuit.h(qubit)
+        circuit.rz(qubit, 0.3 * qubit)
+    for qubit in range(5):
+        circuit.rzz(qubit, qubit + 1, 0.7)
+    circuit.unitary(np.diag(np.exp(1j * np.arange(4.0))), 0, 3)
+    program = compile_circuit(circuit)
+    assert all(len(qubits) <= 3 for opcode, qubits in zip(program.opcodes, program.qubits) if opcode == OP_PHASES)
+    assert all(operand.phases.size <= 2**3 for opcode, operand in zip(program.opcodes, program.operands) if opcode == OP_PHASES)
+    assert np.allclose(QuantumSimulator().run(circuit)[0], reference_state(circuit))
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, PauliSum
+from nexusQ.core.lightcone import light_cone
+
+
+def _partly_measured(seed):
+    """Returns a 6-qubit random circuit measuring qubits 1 and 4, followed by gates outside their light cone."""
+    circuit = random_circuit(6, 50, seed, unitaries=False)
+    circuit.measure(1)
+    circuit.measure(4)
+    circuit.h(0)
+    circuit.cnot(0, 2)
+    return circuit
+
+
+def _marginal(circuit, qubits):
+    """Returns the outcome distribution of the given qubits on the final state of a circuit without measurements."""
+    unmeasured = QuantumCircuit(circuit.get_num_qubits())
+    unmeasured.gates += [gate for gate in circuit.get_gates() if gate[0] != "Measure"]
+    probabilities = np.abs(reference_state(unmeasured).reshape((2,) * circuit.get_num_qubits())) ** 2
+    others = tuple(qubit for qubit in range(circuit.get_num_qubits()) if qubit not in qubits)
+    return probabilities.sum(axis=others).reshape(-1)
+
+
+def test_light_cone_drops_trailing_gates():
+    circuit = QuantumCircuit(4)
+    circuit.h(0)
+    circuit.cnot(0, 1)
+    circuit.x(3)
+    circuit.measure(1)
+    circuit.h(2)
+    pruned, qubits = light_cone(circuit)
+    assert qubits == (0, 1)
+    assert list(pruned.get_gates()) == [("H", 0), ("CNOT", 0, 1), ("Measure", 1)]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_run_with_shots_keeps_the_state(seed):
+    circuit = _partly_measured(seed)
+    state, counts = QuantumSimulator(seed=seed).run(circuit, shots=100)
+    expected, _ = QuantumSimulator(seed=seed, prune=False).run(circuit, shots=100)
+    assert isinstance(state, np.ndarray) and state.shape == (2**6,)
+    assert np.allclose(state, expected)
+    assert sum(counts.values()) == 100
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_pruned_counts_match_marginals(seed):
+    circuit = _partly_measured(seed)
+    state, counts = QuantumSimulator(seed=seed).run(circuit, shots=20000, return_state=False)
+    assert state is None
+    frequencies = np.zeros(4)
+    for bits, count in counts.items():
+        frequencies[int(bits, 2)] = count / 20000
+    assert np.abs(frequencies - _marginal(circuit, (1, 4))).max() < 0.02
+
+
+def test_sample_matches_unpruned():
+    circuit = _partly_measured(7)
+    pruned = QuantumSimulator(seed=1).sample(circuit, 20000).mean(axis=0)
+    unpruned = QuantumSimulator(seed=2, prune=False).sample(circuit, 20000).mean(axis=0)
+    assert np.allclose(pruned, unpruned, atol=0.02)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_pruned_expectation_matches_reference(seed):
+    circuit = random_circuit(6, 40, seed)
+    observable = PauliSum([(0.6, {1: "Z"}), (-0.3, {2: "X", 5: "Y"})])
+    expected = observable.expectation(reference_state(circuit), 6)
+    assert np.isclose(QuantumSimulator().expectation(circuit, observable), expected)
+    assert np.isclose(QuantumSimulator(prune=False).expectation(circuit, observable), expected)
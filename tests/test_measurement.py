@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator
+from nexusQ.core import kernels
+
+
+def _random_state(num_qubits, seed):
+    rng = np.random.default_rng(seed)
+    state = rng.normal(size=2**num_qubits) + 1j * rng.normal(size=2**num_qubits)
+    return state / np.linalg.norm(state)
+
+
+@pytest.mark.parametrize("qubits", [(0,), (3,), (2, 0), (1, 3, 2)])
+def test_marginal_probabilities(qubits):
+    state = _random_state(4, len(qubits))
+    probabilities = np.abs(state.reshape((2,) * 4)) ** 2
+    expected = np.zeros(2**len(qubits))
+    for index, probability in np.ndenumerate(probabilities):
+        expected[int("".join(str(index[qubit]) for qubit in qubits), 2)] += probability
+    assert np.allclose(kernels.marginal_probabilities(state, qubits, 4), expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_measure_collapses_onto_the_outcome(seed):
+    state = _random_state(4, seed)
+    original = state.copy()
+    bits = kernels.measure(state, (3, 1), 4, np.random.default_rng(seed))
+    mask = np.array([(index >> 0) & 1 == bits[0] and (index >> 2) & 1 == bits[1] for index in range(16)])
+    expected = np.where(mask, original, 0)
+    assert np.allclose(state, expected / np.linalg.norm(expected))
+
+
+def test_measure_statistics():
+    state = _random_state(3, 9)
+    expected = kernels.marginal_probabilities(state, (1,), 3)[1]
+    rng = np.random.default_rng(0)
+    ones = sum(kernels.measure(state.copy(), (1,), 3, rng)[0] for _ in range(5000))
+    assert abs(ones / 5000 - expected) < 0.025
+
+
+def test_collapse_zero_probability_outcome():
+    state = np.zeros(4, dtype=complex)
+    state[0] = 1
+    kernels.collapse(state, (0,), (1,), 2)
+    assert not state.any()
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_run_state_agrees_with_measurements(seed):
+    circuit = random_circuit(4, 30, seed)
+    expected = reference_state(circuit).reshape((2,) * 4)
+    circuit.measure(2)
+    circuit.measure(0)
+    state, measurements = QuantumSimulator(seed=seed).run(circuit)
+    assert set(measurements) == {0, 2}
+    projected = np.zeros_like(expected)
+    projected[measurements[0], :, measurements[2]] = expected[measurements[0], :, measurements[2]]
+    assert np.allclose(state, projected.reshape(-1) / np.linalg.norm(projected))
+
+
+def test_measure_all_and_reset():
+    circuit = random_circuit(3, 20, 1)
+    circuit.measure_all()
+    state, measurements = QuantumSimulator(seed=5).run(circuit)
+    index = int("".join(str(measurements[qubit]) for qubit in range(3)), 2)
+    assert np.isclose(abs(state[index]), 1)
+    circuit = random_circuit(3, 20, 2)
+    for qubit in range(3):
+        circuit.reset(qubit)
+    state, measurements = QuantumSimulator(seed=5).run(circuit)
+    assert measurements == {} and np.isclose(abs(state[0]), 1)
@@ -0,0 +1,119 @@
+import tracemalloc
+import numpy as np
+import pytest
+
+from conftest import operator, random_circuit
+from nexusQ.core import QuantumCircuit, QuantumSimulator, NoiseModel
+
+SHOTS = 20000
+PAULIS = (np.eye(2), np.array([[0, 1], [1, 0]]), np.array([[0, -1j], [1j, 0]]), np.diag([1, -1]))
+
+
+def _frequency_of_ones(circuit, seed=0):
+    return QuantumSimulator(seed=seed).sample(circuit, SHOTS).mean(axis=0)
+
+
+def test_channels_take_qubits_first():
+    circuit = QuantumCircuit(3)
+    circuit.depolarizing(2, 0.1)
+    circuit.depolarizing((0, 1), 0.2)
+    circuit.amplitude_damping(1, 0.3)
+    circuit.readout_error(0, 0.4)
+    assert list(circuit.get_gates()) == [("Depolarizing", 2, 0.1), ("Depolarizing", 0, 1, 0.2),
+                                         ("AmplitudeDamping", 1, 0.3), ("ReadoutError", 0, 0.4)]
+    for method in (circuit.depolarizing, circuit.amplitude_damping, circuit.readout_error):
+        with pytest.raises(ValueError):
+            method(0, 1.5)
+
+
+def test_noise_needs_shots():
+    circuit = QuantumCircuit(1)
+    circuit.depolarizing(0, 0.1)
+    with pytest.raises(ValueError):
+        QuantumSimulator().run(circuit)
+
+
+@pytest.mark.parametrize("probability", [0.1, 0.6])
+def test_depolarizing_flip_rate(probability):
+    circuit = QuantumCircuit(1)
+    circuit.depolarizing(0, probability)
+    circuit.measure(0)
+    assert abs(_frequency_of_ones(circuit)[0] - 2 * probability / 3) < 0.015
+
+
+def test_two_qubit_depolarizing_flip_rate():
+    circuit = QuantumCircuit(2)
+    circuit.depolarizing((0, 1), 0.5)
+    circuit.measure_all()
+    outcomes = QuantumSimulator(seed=1).sample(circuit, SHOTS)
+    assert abs(outcomes.any(axis=1).mean() - 0.5 * 12 / 15) < 0.015
+
+
+@pytest.mark.parametrize("gamma", [0.2, 0.7])
+def test_amplitude_damping_decay(gamma):
+    circuit = QuantumCircuit(1)
+    circuit.x(0)
+    circuit.amplitude_damping(0, gamma)
+    circuit.measure(0)
+    assert abs(_frequency_of_ones(circuit)[0] - (1 - gamma)) < 0.015
+
+
+def test_readout_error_flips_outcomes():
+    circuit = QuantumCircuit(2)
+    circuit.readout_error(0, 0.25)
+    circuit.x(1)
+    circuit.readout_error(1, 0.1)
+    circuit.measure_all()
+    assert np.allclose(_frequency_of_ones(circuit), [0.25, 0.9], atol=0.015)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_density_matrix(seed):
+    circuit = random_circuit(3, 20, seed)
+    rho = np.zeros((8, 8), dtype=complex)
+    rho[0, 0] = 1
+    for gate in circuit.get_gates():
+        rho = operator(gate, 3) @ rho @ operator(gate, 3).conj().T
+    circuit.depolarizing(1, 0.3)
+    depolarized = 0.7 * rho
+    for pauli in PAULIS[1:]:
+        full = np.kron(np.kron(np.eye(2), pauli), np.eye(2))
+        depolarized += 0.1 * full @ rho @ full.conj().T
+    circuit.measure_all()
+    expected = np.real(np.diag(depolarized)).reshape(2, 2, 2)
+    marginals = [expected.sum(axis=tuple(other for other in range(3) if other != qubit))[1] for qubit in range(3)]
+    assert np.allclose(_frequency_of_ones(circuit, seed), marginals, atol=0.015)
+
+
+def test_noise_model_inserts_channels():
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    circuit.cnot(0, 1)
+    circuit.measure_all()
+    model = NoiseModel()
+    model.add_gate_noise("CNOT", "depolarizing", 0.01)
+    model.add_qubit_noise(1, "amplitude_damping", 0.002)
+    model.add_readout_error(0, 0.02)
+    assert [gate for gate in model.apply(circuit).get_gates()] == [
+        ("ReadoutError", 0, 0.02), ("H", 0), ("CNOT", 0, 1), ("Depolarizing", 0, 1, 0.01),
+        ("AmplitudeDamping", 1, 0.002), ("Measure", 0, 1)]
+
+
+def test_unmeasured_sampling_stays_within_trajectory_memory():
+    num_qubits = 10
+    circuit = QuantumCircuit(num_qubits)
+    for qubit in range(num_qubits):
+        circuit.rx(qubit, 0.3 * (qubit + 1))
+    circuit.depolarizing(0, 0.3)
+    simulator = QuantumSimulator(seed=0)
+    simulator.trajectory_memory = 1 << 22
+    tracemalloc.start()
+    try:
+        bits = simulator.sample(circuit, 4000)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < simulator.trajectory_memory
+    expected = np.sin(0.15 * np.arange(1, num_qubits + 1)) ** 2
+    expected[0] = 0.8 * expected[0] + 0.2 * (1 - expected[0])
+    assert np.allclose(bits.mean(axis=0), expected, atol=0.025)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumSimulator, PauliSum
+from nexusQ.core.observables import apply_observable, expectation_value
+
+PAULI_MATRICES = {"I": np.eye(2), "X": np.array([[0, 1], [1, 0]]), "Y": np.array([[0, -1j], [1j, 0]]),
+                  "Z": np.diag([1, -1])}
+
+
+def _dense(observable, num_qubits):
+    total = np.zeros((2**num_qubits, 2**num_qubits), dtype=complex)
+    for coefficient, pauli in observable.terms:
+        term = np.ones((1, 1))
+        for qubit in range(num_qubits):
+            term = np.kron(term, PAULI_MATRICES[pauli.get(qubit, "I")])
+        total += coefficient * term
+    return total
+
+
+def _random_pauli_sum(num_qubits, num_terms, seed):
+    rng = np.random.default_rng(seed)
+    return PauliSum([(rng.normal(), "".join(rng.choice(list("IXYZ"), num_qubits))) for _ in range(num_terms)])
+
+
+def _random_state(num_qubits, seed):
+    rng = np.random.default_rng(seed)
+    state = rng.normal(size=2**num_qubits) + 1j * rng.normal(size=2**num_qubits)
+    return state / np.linalg.norm(state)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pauli_sum_matches_dense_matrix(seed):
+    observable = _random_pauli_sum(4, 12, seed)
+    state = _random_state(4, seed)
+    dense = _dense(observable, 4)
+    assert np.isclose(observable.expectation(state, 4), np.vdot(state, dense @ state).real)
+    assert np.allclose(observable.apply(state, 4), dense @ state)
+
+
+def test_pauli_sum_accepts_strings_and_dicts():
+    state = _random_state(3, 0)
+    as_strings = PauliSum([(0.5, "XIZ"), (-1.5, "IYY")])
+    as_dicts = PauliSum([(0.5, {0: "X", 2: "z"}), (-1.5, {1: "Y", 2: "Y"})])
+    assert np.isclose(as_strings.expectation(state, 3), as_dicts.expectation(state, 3))
+    with pytest.raises(ValueError):
+        PauliSum([(1.0, "XQ")])
+
+
+def test_matrix_and_diagonal_observables():
+    rng = np.random.default_rng(2)
+    state = _random_state(3, 2)
+    matrix = rng.normal(size=(8, 8))
+    matrix = matrix + matrix.T
+    diagonal = rng.normal(size=8)
+    assert np.isclose(expectation_value(matrix, state, 3), np.vdot(state, matrix @ state).real)
+    assert np.isclose(expectation_value(diagonal, state, 3), np.dot(np.abs(state) ** 2, diagonal))
+    assert np.allclose(apply_observable(diagonal, state, 3), diagonal * state)
+    terms = [(0.3, "ZZI"), (0.2, "XIX")]
+    assert np.isclose(expectation_value(terms, state, 3), PauliSum(terms).expectation(state, 3))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_simulator_expectation_matches_reference(seed):
+    circuit = random_circuit(5, 50, seed)
+    observable = _random_pauli_sum(5, 10, seed)
+    expected = np.vdot(reference_state(circuit), _dense(observable, 5) @ reference_state(circuit)).real
+    circuit.measure_all()  # Terminal measurements are ignored
+    assert np.isclose(QuantumSimulator().expectation(circuit, observable), expected)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, optimize
+
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+@pytest.mark.parametrize("seed", range(8))
+def test_levels_match_unoptimized(level, seed):
+    circuit = random_circuit(4, 60, seed)
+    assert np.allclose(reference_state(optimize(circuit, level)), reference_state(circuit))
+
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+def test_levels_shorten_circuits(level):
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    circuit.h(0)
+    circuit.rx(1, 0.3)
+    circuit.rx(1, 0.4)
+    circuit.gates += [("T", 0), ("S", 0)]
+    circuit.cnot(0, 1)
+    assert len(optimize(circuit, level).get_gates()) < len(circuit.get_gates())
+
+
+def _barrier_circuits():
+    for barrier in ("measure", "reset"):
+        circuit = QuantumCircuit(2)
+        circuit.h(0)
+        getattr(circuit, barrier)(0)
+        circuit.cnot(0, 1)
+        circuit.ry(1, 0.7)
+        yield barrier, circuit
+
+
+@pytest.mark.parametrize("barrier,circuit", list(_barrier_circuits()))
+def test_level3_keeps_barriers(barrier, circuit):
+    optimized = optimize(circuit, 3)
+    assert [gate[0] for gate in optimized.get_gates()].count(barrier.capitalize()) == 1
+    for seed in range(6):
+        expected, expected_measurements = QuantumSimulator(seed=seed, backend="statevector").run(circuit)
+        state, measurements = QuantumSimulator(seed=seed, optimization_level=3, backend="statevector").run(circuit)
+        assert np.allclose(np.asarray(state), np.asarray(expected))
+        assert measurements == expected_measurements
+
+
+def test_level3_keeps_noise_channels():
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    circuit.depolarizing(0, 0.1)
+    circuit.cnot(0, 1)
+    optimized = optimize(circuit, 3)
+    assert [gate[0] for gate in optimized.get_gates()] == ["H", "Depolarizing", "CNOT"]
+
+
+def test_level3_counts_match_level0_with_mid_circuit_measurement():
+    circuit = QuantumCircuit(3)
+    circuit.h(0)
+    circuit.measure(0)
+    circuit.cnot(0, 1)
+    circuit.h(2)
+    circuit.cnot(2, 1)
+    circuit.measure_all()
+    expected = QuantumSimulator(seed=3).sample(circuit, 4000).mean(axis=0)
+    sampled = QuantumSimulator(seed=4, optimization_level=3).sample(circuit, 4000).mean(axis=0)
+    assert np.allclose(sampled, expected, atol=0.05)
@@ -0,0 +1,149 @@
+import tracemalloc
+import numpy as np
+import pytest
+
+from conftest import operator, random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator
+from nexusQ.core import compiler, outofcore
+
+
+def _simulator(tmp_path, seed=0, chunk_qubits=3, **settings):
+    """Returns a simulator that memory-maps every state, in small chunks to exercise many blocks."""
+    simulator = QuantumSimulator(seed=seed, backend="statevector", out_of_core=str(tmp_path), **settings)
+    simulator.out_of_core_threshold = 0
+    simulator.chunk_qubits = chunk_qubits
+    return simulator
+
+
+def _connected_circuit(num_qubits, num_gates, seed):
+    circuit = QuantumCircuit(num_qubits)
+    for qubit in range(num_qubits - 1):
+        circuit.cnot(qubit, qubit + 1)
+    circuit.gates += random_circuit(num_qubits, num_gates, seed).get_gates()
+    return circuit
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_state_matches_reference(tmp_path, seed):
+    circuit = _connected_circuit(8, 80, seed)
+    state, _ = _simulator(tmp_path).run(circuit)
+    assert isinstance(state, np.memmap)
+    assert np.allclose(np.asarray(state), reference_state(circuit))
+
+
+def test_independent_groups_are_simulated_whole(tmp_path):
+    circuit = QuantumCircuit(8)
+    for qubit in range(3):
+        circuit.h(qubit)
+        circuit.cnot(qubit, qubit + 1)
+    circuit.x(6)
+    state, _ = _simulator(tmp_path).run(circuit)
+    assert isinstance(state, np.memmap)
+    assert np.allclose(np.asarray(state), reference_state(circuit))
+
+
+def test_single_precision_state(tmp_path):
+    circuit = _connected_circuit(7, 60, 5)
+    state, _ = _simulator(tmp_path, precision="single").run(circuit)
+    assert state.dtype == np.complex64
+    assert np.allclose(np.asarray(state), reference_state(circuit), atol=1e-5)
+
+
+@pytest.mark.parametrize("measured", [(0, 1, 2, 3, 4, 5, 6, 7), (6, 1), (0,), (7, 3, 5)])
+def test_sampling_statistics(tmp_path, measured):
+    circuit = _connected_circuit(8, 40, 11)
+    expected = np.abs(reference_state(circuit).reshape((2,) * 8)) ** 2
+    others = tuple(qubit for qubit in range(8) if qubit not in measured)
+    marginal = expected.sum(axis=others).transpose(np.argsort(np.argsort(measured))).reshape(-1)
+    outcomes, counts = outofcore.sample(_simulator(tmp_path).run(circuit)[0], measured, 8, 3, 20000,
+                                        np.random.default_rng(1))
+    frequencies = np.zeros(len(marginal))
+    frequencies[outcomes] = counts / 20000
+    assert counts.sum() == 20000
+    assert np.abs(frequencies - marginal).max() < 0.02
+
+
+def test_sample_matches_in_memory_distribution(tmp_path):
+    circuit = _connected_circuit(6, 30, 2)
+    circuit.measure_all()
+    expected = QuantumSimulator(seed=1).sample(circuit, 20000).mean(axis=0)
+    sampled = _simulator(tmp_path, seed=2).sample(circuit, 20000).mean(axis=0)
+    assert np.allclose(sampled, expected, atol=0.02)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_mid_circuit_measurement_collapses(tmp_path, seed):
+    prefix = _connected_circuit(7, 30, seed)
+    suffix = random_circuit(7, 20, seed + 100, unitaries=False)
+    circuit = QuantumCircuit(7)
+    circuit.gates += prefix.get_gates()
+    circuit.measure(1)
+    circuit.measure(6)
+    circuit.gates += suffix.get_gates()
+    state, measurements = _simulator(tmp_path, seed=seed).run(circuit)
+    expected = reference_state(prefix).reshape((2,) * 7)
+    projector = np.zeros_like(expected)
+    index = [slice(None)] * 7
+    index[1], index[6] = measurements[1], measurements[6]
+    projector[tuple(index)] = expected[tuple(index)]
+    expected = projector.reshape(-1) / np.linalg.norm(projector)
+    for gate in suffix.get_gates():
+        expected = operator(gate, 7) @ expected
+    assert np.allclose(np.asarray(state), expected)
+
+
+def test_reset(tmp_path):
+    circuit = QuantumCircuit(5)
+    circuit.h(0)
+    circuit.cnot(0, 4)
+    circuit.reset(4)
+    circuit.reset(0)
+    state, _ = _simulator(tmp_path, chunk_qubits=2).run(circuit)
+    expected = np.zeros(32)
+    expected[0] = 1
+    assert np.allclose(np.abs(np.asarray(state)), expected)
+
+
+def test_measuring_every_qubit_stays_out_of_core(tmp_path):
+    num_qubits, chunk_qubits = 16, 8
+    state = outofcore.create_state(num_qubits, np.complex128, str(tmp_path))
+    state[:] = 1 / np.sqrt(len(state))
+    tracemalloc.start()
+    try:
+        outcomes, counts = outofcore.sample(state, tuple(range(num_qubits)), num_qubits, chunk_qubits, 1000,
+                                            np.random.default_rng(0))
+        bits = outofcore._measure(state, tuple(range(num_qubits)), num_qubits, chunk_qubits, np.random.default_rng(1))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert counts.sum() == 1000
+    assert peak < state.nbytes / 4
+    index = int("".join(map(str, bits)), 2)
+    assert np.isclose(abs(state[index]), 1) and np.isclose(np.linalg.norm(np.asarray(state)), 1)
+
+
+def test_phase_layer_over_every_qubit_stays_out_of_core(tmp_path, monkeypatch):
+    num_qubits = 18
+    monkeypatch.setattr(compiler, "MAX_PHASE_QUBITS", num_qubits)  # One phase instruction wider than a block
+    circuit = QuantumCircuit(num_qubits)
+    for qubit in range(num_qubits):
+        circuit.h(qubit)
+        circuit.rz(qubit, 0.1 * qubit)
+    for qubit in range(num_qubits - 1):
+        circuit.rzz(qubit, qubit + 1, 0.3)
+    circuit.gates.append(("Unitary", 0, num_qubits - 1, np.diag(np.exp(1j * np.arange(4.0)))))
+    for qubit in range(num_qubits):
+        circuit.rx(qubit, 0.2)
+    simulator = _simulator(tmp_path, chunk_qubits=8)
+    program = simulator.compile(circuit)
+    state = outofcore.create_state(num_qubits, np.complex128, str(tmp_path))
+    state[0] = 1
+    tracemalloc.start()
+    try:
+        outofcore.execute(simulator, program, state, {})
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < state.nbytes / 4
+    expected, _ = QuantumSimulator().run(circuit)
+    assert np.allclose(np.asarray(state), expected)
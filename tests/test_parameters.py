@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from conftest import reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, Parameter, PauliSum
+
+
+def _ansatz(num_qubits: int, layers: int = 2):
+    """Returns a hardware-efficient ansatz with one symbolic angle per rotation."""
+    circuit = QuantumCircuit(num_qubits)
+    parameters = []
+    for layer in range(layers):
+        for qubit in range(num_qubits):
+            theta = Parameter(f"t{layer}_{qubit}")
+            parameters.append(theta)
+            (circuit.ry if (layer + qubit) % 2 else circuit.rx)(qubit, theta)
+        for qubit in range(num_qubits - 1):
+            circuit.cnot(qubit, qubit + 1)
+        circuit.rzz(0, num_qubits - 1, 0.5 * parameters[-1] + 0.1)
+    return circuit, parameters
+
+
+OBSERVABLE = PauliSum([(0.7, "ZZI"), (-0.4, {1: "X"}), (0.3, {0: "Y", 2: "Y"})])
+
+
+@pytest.mark.parametrize("level", [0, 1, 2, 3])
+def test_sweep_matches_bound_reference(level):
+    circuit, parameters = _ansatz(3)
+    rng = np.random.default_rng(level)
+    values = {parameter: rng.uniform(-np.pi, np.pi, size=5) for parameter in parameters}
+    states = QuantumSimulator(optimization_level=level).run_sweep(circuit, values)
+    for index in range(5):
+        bound = circuit.bind_parameters({parameter: value[index] for parameter, value in values.items()})
+        assert np.allclose(states[index], reference_state(bound))
+
+
+@pytest.mark.parametrize("level", [0, 1, 2, 3])
+def test_run_with_parameter_values(level):
+    circuit, parameters = _ansatz(3)
+    values = {parameter: 0.1 * (index + 1) for index, parameter in enumerate(parameters)}
+    state, _ = QuantumSimulator(optimization_level=level).run(circuit, parameter_values=values)
+    assert np.allclose(np.asarray(state), reference_state(circuit.bind_parameters(values)))
+
+
+@pytest.mark.parametrize("level", [0, 3])
+def test_gradient_matches_finite_differences(level):
+    circuit, parameters = _ansatz(3)
+    simulator = QuantumSimulator(optimization_level=level)
+    values = {parameter: 0.2 * index - 0.5 for index, parameter in enumerate(parameters)}
+    value, gradient = simulator.gradient(circuit, OBSERVABLE, values)
+    assert np.isclose(value, simulator.expectation(circuit, OBSERVABLE, values))
+    step = 1e-6
+    for parameter in parameters:
+        plus = simulator.expectation(circuit, OBSERVABLE, {**values, parameter: values[parameter] + step})
+        minus = simulator.expectation(circuit, OBSERVABLE, {**values, parameter: values[parameter] - step})
+        assert np.isclose(gradient[parameter], (plus - minus) / (2 * step), atol=1e-6)
+
+
+def _every_rotation():
+    """Returns a circuit using each parametric gate type, with shared parameters and affine expressions."""
+    a, b, c = Parameter("a"), Parameter("b"), Parameter("c")
+    circuit = QuantumCircuit(3)
+    circuit.h(0)
+    circuit.cy(0, 2)
+    circuit.rx(0, a)
+    circuit.ry(1, 2 * b - 0.3)
+    circuit.rz(2, a + c)
+    circuit.ch(1, 0)
+    circuit.rxx(0, 2, b)
+    circuit.ryy(1, 2, 0.5 * c)
+    circuit.rzz(0, 1, a - b)
+    circuit.rx(2, -c)
+    return circuit, (a, b, c)
+
+
+@pytest.mark.parametrize("observable", ["pauli", "matrix", "diagonal"])
+def test_gradient_of_every_rotation(observable):
+    circuit, parameters = _every_rotation()
+    rng = np.random.default_rng(4)
+    if observable == "pauli":
+        observable = OBSERVABLE
+    elif observable == "matrix":
+        matrix = rng.normal(size=(8, 8)) + 1j * rng.normal(size=(8, 8))
+        observable = matrix + matrix.conj().T
+    else:
+        observable = rng.normal(size=8)
+    values = {parameter: value for parameter, value in zip(parameters, (0.4, -1.1, 2.3))}
+    simulator = QuantumSimulator()
+    value, gradient = simulator.gradient(circuit, observable, values)
+    assert set(gradient) == set(parameters)
+    step = 1e-6
+    for parameter in parameters:
+        plus = simulator.expectation(circuit, observable, {**values, parameter: values[parameter] + step})
+        minus = simulator.expectation(circuit, observable, {**values, parameter: values[parameter] - step})
+        assert np.isclose(gradient[parameter], (plus - minus) / (2 * step), atol=1e-5)
+
+
+def test_gradient_rejects_mid_circuit_measurements():
+    circuit, parameters = _every_rotation()
+    circuit.measure(0)
+    circuit.h(0)
+    with pytest.raises(ValueError):
+        QuantumSimulator().gradient(circuit, OBSERVABLE, dict.fromkeys(parameters, 0.1))
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, Parameter, PauliSum, compile_circuit
+
+
+@pytest.mark.parametrize("level", [0, 3])
+@pytest.mark.parametrize("seed", range(3))
+def test_single_precision_state_matches_reference(level, seed):
+    circuit = random_circuit(6, 80, seed)
+    state, _ = QuantumSimulator(precision="single", optimization_level=level).run(circuit)
+    assert state.dtype == np.complex64
+    assert np.allclose(state, reference_state(circuit), atol=1e-5)
+
+
+def test_programs_are_cast_once():
+    circuit = random_circuit(4, 30, 1)
+    program = QuantumSimulator(precision="single").compile(circuit)
+    assert program.dtype == np.complex64
+    assert program.astype(np.complex128).dtype == np.complex128
+    assert compile_circuit(circuit).astype(np.complex64).dtype == np.complex64
+    state, _ = QuantumSimulator(precision="single").run(compile_circuit(circuit))
+    assert state.dtype == np.complex64
+
+
+def test_long_circuits_stay_normalized():
+    circuit = QuantumCircuit(4)
+    for layer in range(3000):
+        circuit.rx(layer % 4, 0.1 + 1e-3 * layer)
+        circuit.cnot(layer % 4, (layer + 1) % 4)
+    simulator = QuantumSimulator(precision="single")
+    simulator.renormalize_interval = 64
+    state, _ = simulator.run(circuit)
+    assert abs(np.linalg.norm(state) - 1) < 1e-6
+
+
+def test_single_precision_sweep_expectation_and_samples():
+    theta = Parameter("theta")
+    circuit = QuantumCircuit(3)
+    circuit.ry(0, theta)
+    circuit.cnot(0, 1)
+    circuit.rx(2, 2 * theta)
+    simulator = QuantumSimulator(seed=0, precision="single")
+    values = np.linspace(0, np.pi, 5)
+    states = simulator.run_sweep(circuit, {theta: values})
+    assert states.dtype == np.complex64
+    for state, value in zip(states, values):
+        assert np.allclose(state, reference_state(circuit.bind_parameters({theta: value})), atol=1e-6)
+    observable = PauliSum([(1.0, "ZZI"), (0.5, {2: "Z"})])
+    assert np.isclose(simulator.expectation(circuit, observable, {theta: 0.4}), 1 + 0.5 * np.cos(0.8), atol=1e-6)
+    circuit.measure_all()
+    outcomes = simulator.sample(circuit, 20000, {theta: 0.4})
+    assert abs(outcomes[:, 0].mean() - np.sin(0.2) ** 2) < 0.015
+
+
+def test_batch_workers_keep_the_precision():
+    circuit = random_circuit(4, 30, 2)
+    ((_, state, _),) = QuantumSimulator(precision="single").run_batch([circuit], max_workers=1)
+    assert state.dtype == np.complex64
+    assert np.allclose(state, reference_state(circuit), atol=1e-5)
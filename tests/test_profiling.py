@@ -0,0 +1,60 @@
+import numpy as np
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator, Profiler, compile_circuit
+
+
+def test_profiled_run_returns_the_same_state():
+    circuit = random_circuit(6, 50, 0)
+    events = []
+    simulator = QuantumSimulator(profiler=Profiler(callback=events.append))
+    result = simulator.run(circuit)
+    state, measurements = result
+    assert np.allclose(state, reference_state(circuit)) and measurements == {}
+    report = result.profile
+    program = compile_circuit(circuit)
+    assert report.total.count == len(program) == len(events)
+    assert [event.index for event in events] == list(range(len(program)))
+    assert sum(stats.count for stats in report.by_kind.values()) == len(program)
+    assert report.wall_seconds >= report.gate_seconds > 0
+    assert report.peak_state_bytes == state.nbytes
+
+
+def test_events_count_touched_amplitudes():
+    circuit = QuantumCircuit(4)
+    circuit.h(0)
+    circuit.cnot(1, 2)
+    circuit.gates.append(("CCX", 0, 1, 3))
+    events = []
+    QuantumSimulator(profiler=Profiler(callback=events.append)).run(circuit)
+    assert [event.kind for event in events] == ["matrix", "flip", "flip"]
+    assert [event.amplitudes for event in events] == [16, 8, 4]
+    assert all(event.bytes == 2 * event.amplitudes * 16 for event in events)
+    assert all(event.temporary_bytes is None for event in events)
+
+
+def test_resimulated_shots_add_up_per_index():
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    circuit.measure(0)
+    circuit.cnot(0, 1)
+    circuit.measure(1)
+    report = QuantumSimulator(seed=0, profiler=Profiler()).run(circuit, shots=10).profile
+    assert report.by_index[0].count == 1
+    assert report.by_index[2].count == 10
+
+
+def test_memory_tracing_and_summary():
+    report = QuantumSimulator(profiler=Profiler(trace_memory=True)).run(random_circuit(8, 30, 1)).profile
+    assert report.peak_temporary_bytes is not None and report.peak_temporary_bytes >= 0
+    summary = report.summary(count=3)
+    assert summary.splitlines()[0].startswith(f"{report.total.count} instructions")
+    assert len(report.slowest(3)) == 3
+
+
+def test_profiler_resets_between_runs():
+    simulator = QuantumSimulator(profiler=Profiler())
+    first = simulator.run(random_circuit(3, 10, 2)).profile
+    second = simulator.run(random_circuit(3, 20, 3)).profile
+    assert first is not second
+    assert second.total.count == len(compile_circuit(random_circuit(3, 20, 3)))
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from conftest import random_circuit, reference_state
+from nexusQ.core import QuantumCircuit, QuantumSimulator
+
+SHOTS = 20000
+
+
+def _marginal(state, qubits, num_qubits):
+    probabilities = np.abs(state.reshape((2,) * num_qubits)) ** 2
+    others = tuple(qubit for qubit in range(num_qubits) if qubit not in qubits)
+    return probabilities.sum(axis=others).reshape(-1)
+
+
+def _frequencies(counts, num_bits):
+    frequencies = np.zeros(2**num_bits)
+    for bits, count in counts.items():
+        assert len(bits) == num_bits
+        frequencies[int(bits, 2)] = count
+    return frequencies / frequencies.sum()
+
+
+@pytest.mark.parametrize("measured", [(0, 1, 2, 3, 4), (3, 1), (4,)])
+def test_counts_match_probabilities(measured):
+    circuit = random_circuit(5, 50, len(measured))
+    expected = reference_state(circuit)
+    for qubit in measured:
+        circuit.measure(qubit)
+    state, counts = QuantumSimulator(seed=0).run(circuit, shots=SHOTS)
+    assert sum(counts.values()) == SHOTS
+    assert np.allclose(state, expected)  # The pre-measurement state
+    assert np.abs(_frequencies(counts, len(measured)) - _marginal(expected, sorted(measured), 5)).max() < 0.015
+
+
+def test_unmeasured_circuits_sample_every_qubit():
+    circuit = random_circuit(4, 30, 9)
+    _, counts = QuantumSimulator(seed=1).run(circuit, shots=SHOTS)
+    assert np.abs(_frequencies(counts, 4) - np.abs(reference_state(circuit)) ** 2).max() < 0.015
+    outcomes = QuantumSimulator(seed=1).sample(circuit, 10)
+    assert outcomes.shape == (10, 4) and outcomes.dtype == np.uint8
+
+
+def test_bitstrings_follow_ascending_qubits():
+    circuit = QuantumCircuit(3)
+    circuit.x(2)
+    circuit.measure(2)
+    circuit.measure(0)
+    _, counts = QuantumSimulator().run(circuit, shots=50)
+    assert counts == {"01": 50}
+    assert QuantumSimulator().sample(circuit, 3).tolist() == [[0, 1]] * 3
+
+
+def test_seeded_runs_are_reproducible():
+    circuit = random_circuit(4, 30, 2)
+    circuit.measure_all()
+    assert QuantumSimulator(seed=8).run(circuit, shots=500)[1] == QuantumSimulator(seed=8).run(circuit, shots=500)[1]
+    assert np.array_equal(QuantumSimulator(seed=8).sample(circuit, 500), QuantumSimulator(seed=8).sample(circuit, 500))
+
+
+def test_mid_circuit_measurements_are_resimulated():
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    circuit.measure(0)
+    circuit.cnot(0, 1)
+    circuit.h(0)
+    circuit.measure_all()
+    outcomes = QuantumSimulator(seed=2).sample(circuit, SHOTS)
+    assert abs(outcomes[:, 1].mean() - 0.5) < 0.015
+    assert abs(outcomes[:, 0].mean() - 0.5) < 0.015
+    assert abs(np.corrcoef(outcomes[:, 0], outcomes[:, 1])[0, 1]) < 0.03
+    _, counts = QuantumSimulator(seed=3).run(circuit, shots=1000)
+    assert sum(counts.values()) == 1000
+
+
+def test_mid_circuit_outcomes_condition_later_gates():
+    circuit = QuantumCircuit(3)
+    circuit.h(0)
+    circuit.measure(0)
+    circuit.cnot(0, 1)
+    circuit.reset(0)
+    circuit.cnot(1, 2)
+    circuit.measure_all()
+    outcomes = QuantumSimulator(seed=4).sample(circuit, 2000)
+    assert not outcomes[:, 0].any()
+    assert np.array_equal(outcomes[:, 1], outcomes[:, 2])
+    assert abs(outcomes[:, 1].mean() - 0.5) < 0.05
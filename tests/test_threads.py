@@ -0,0 +1,51 @@
+import threading
+import numpy as np
+import pytest
+
+from conftest import random_circuit
+from nexusQ.core import QuantumCircuit, QuantumSimulator, parallel
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_threaded_state_matches_single_thread(seed):
+    circuit = random_circuit(12, 150, seed)
+    expected, _ = QuantumSimulator().run(circuit)
+    with QuantumSimulator(num_threads=4) as simulator:
+        simulator.parallel_threshold = 4
+        state, _ = simulator.run(circuit)
+    assert np.allclose(state, expected)
+
+
+@pytest.mark.parametrize("qubits", [(0,), (9,), (2, 5), (0, 9), (3, 4, 8)])
+def test_blocks_cover_the_state(qubits):
+    state = np.arange(2**10, dtype=complex)
+    blocks = parallel.split_blocks(state, qubits, 10, 4)
+    if blocks is None:
+        assert min(qubits) == 0 and max(qubits) == 9
+        return
+    for block, local, local_qubits in blocks:
+        block[...] = 0
+    assert not state.any()
+
+
+def test_close_stops_the_threads():
+    before = threading.active_count()
+    simulators = [QuantumSimulator(num_threads=3) for _ in range(5)]
+    circuit = random_circuit(6, 30, 0)
+    for simulator in simulators:
+        simulator.parallel_threshold = 2
+        simulator.run(circuit)
+    assert threading.active_count() > before
+    for simulator in simulators:
+        simulator.close()
+    assert threading.active_count() == before
+    state, _ = simulators[0].run(circuit)  # A closed simulator keeps working on one thread
+    assert np.allclose(state, QuantumSimulator().run(circuit)[0])
+
+
+def test_context_manager_closes():
+    before = threading.active_count()
+    with QuantumSimulator(num_threads=2) as simulator:
+        simulator.parallel_threshold = 1
+        simulator.run(random_circuit(4, 10, 1))
+    assert threading.active_count() == before